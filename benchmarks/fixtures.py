@@ -0,0 +1,101 @@
+# benchmarks/fixtures.py
+#
+# Schema reset and seed data shared by the benchmarks that drive the real app
+# (queue_recalc, staff_batch, concurrent_joins, dinner_rush, seat_rush). Import it
+# after setting DATABASE_URL: database.py builds its engine at import time.
+#
+# reset_schema() drops every table, so it refuses to run unless the database
+# is a throwaway one: in-memory SQLite, or a database whose name (a file path
+# for SQLite) contains "bench", like the scratch files in benchmarks/ or
+# postgresql://.../queuemate_bench.
+
+from datetime import datetime
+from typing import List, Tuple
+from sqlalchemy.engine import URL
+from sqlalchemy.orm import Session
+from database import engine, SessionLocal
+from migrations import run_migrations
+from models.base import Base
+from models.user import UserModel
+from models.venue import VenueModel
+from models.waitlistEntry import WaitlistEntryModel
+
+
+def is_benchmark_database(url: URL) -> bool:
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return True
+    return "bench" in (url.database or "").lower()
+
+
+def reset_schema():
+    if not is_benchmark_database(engine.url):
+        raise SystemExit(
+            f"Refusing to wipe {engine.url.render_as_string(hide_password=True)}: "
+            "benchmarks only run against a database whose name contains 'bench'"
+        )
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+
+
+def add_venue(db: Session, name: str = "Bench", staff_name: str = "bench_staff") -> Tuple[UserModel, VenueModel]:
+    # A staff user and the venue they own, flushed so both have ids
+    staff = UserModel(username=staff_name, email=f"{staff_name}@example.com", role="staff")
+    db.add(staff)
+    db.flush()
+    venue = VenueModel(name=name, location="Bench", max_capacity=50, avg_service_time=10, owner_id=staff.id)
+    db.add(venue)
+    db.flush()
+    return staff, venue
+
+
+def add_users(db: Session, count: int, role: str = "customer", prefix: str = "bench") -> List[UserModel]:
+    users = [
+        UserModel(username=f"{prefix}_{i}", email=f"{prefix}_{i}@example.com", role=role)
+        for i in range(count)
+    ]
+    db.add_all(users)
+    db.flush()
+    return users
+
+
+def build_venue(customers: int) -> Tuple[int, List[str]]:
+    # A fresh schema holding one venue and customers who have not joined yet;
+    # returns the venue id and the customers' tokens
+    reset_schema()
+
+    db = SessionLocal()
+    _, venue = add_venue(db)
+    users = add_users(db, customers)
+    db.commit()
+
+    result = (venue.id, [u.generate_token() for u in users])
+    db.close()
+    return result
+
+
+def build_queue(size: int, status: str = "pending") -> Tuple[str, int, List[int]]:
+    # A fresh schema holding one venue with `size` entries at positions 1..size;
+    # returns the staff token, the venue id and the entry ids in queue order
+    reset_schema()
+
+    db = SessionLocal()
+    staff, venue = add_venue(db)
+    customers = add_users(db, size)
+
+    now = datetime.utcnow()
+    entries = []
+    for i, c in enumerate(customers, start=1):
+        entry = WaitlistEntryModel(user_id=c.id, venue_id=venue.id, status=status, position=i, timestamp=now)
+        if status == "waiting":
+            entry.estimated_wait_time = (i - 1) * 10
+            entry.approved_at = now
+            entry.approved_position = i
+        entries.append(entry)
+    db.add_all(entries)
+    db.commit()
+
+    result = (staff.generate_token(), venue.id, [e.id for e in entries])
+    db.close()
+    return result
@@ -1,12 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi import APIRouter, Depends, HTTPException, Body, Query
+from sqlalchemy import case, func, select
 from sqlalchemy.orm import Session
+from datetime import timedelta
 from models.user import UserModel
 from models.venue import VenueModel
+from models.waitlistHourlyStats import WaitlistHourlyStatsModel
 from serializers.user import UserResponseSchema
 from serializers.venue import VenueSchema
 from typing import List
 from database import get_db
 from dependencies.get_current_user import get_current_user
+from dependencies.pagination import PageParams, paginate_columns
+from services.user_cache import user_cache
+from services.venue_catalog import venue_catalog
+from services.throughput import current_hour
 
 router = APIRouter()
 
@@ -19,8 +26,8 @@ def admin_required(current_user: UserModel = Depends(get_current_user)):
 
 
 @router.get("/users", response_model=List[UserResponseSchema])
-def get_all_users(db: Session = Depends(get_db), admin: UserModel = Depends(admin_required)):
-    return db.query(UserModel).all()
+def get_all_users(page: PageParams = Depends(), db: Session = Depends(get_db), admin: UserModel = Depends(admin_required)):
+    return paginate_columns(db.query(UserModel), UserModel, [UserModel.id], page, UserResponseSchema)
 
 
 @router.delete("/users/{user_id}")
@@ -30,20 +37,47 @@ def delete_user(user_id: int, db: Session = Depends(get_db), admin: UserModel =
         raise HTTPException(status_code=404, detail="User not found")
     db.delete(user)
     db.commit()
+    # Drop it again after commit so a concurrent request cannot re-cache the old row
+    user_cache.invalidate(str(user_id))
     return {"message": f"User {user.username} deleted successfully"}
 
 @router.get("/admin/analytics")
-def get_admin_analytics(db: Session = Depends(get_db), admin: UserModel = Depends(admin_required)):
-    total_users = db.query(UserModel).count()
-    total_staff = db.query(UserModel).filter(UserModel.role == "staff").count()
-    total_customers = db.query(UserModel).filter(UserModel.role == "customer").count()
-    total_venues = db.query(VenueModel).count()
+def get_admin_analytics(
+    hours: int = Query(24, ge=1, le=24 * 31),
+    db: Session = Depends(get_db),
+    admin: UserModel = Depends(admin_required)
+):
+    # All user and venue totals in one statement
+    total_users, total_staff, total_customers, total_venues = db.query(
+        func.count(UserModel.id),
+        func.count(case((UserModel.role == "staff", 1))),
+        func.count(case((UserModel.role == "customer", 1))),
+        select(func.count(VenueModel.id)).scalar_subquery()
+    ).one()
+
+    # Waitlist throughput comes from the hourly rollup, never from waitlist_entries
+    since = current_hour() - timedelta(hours=hours - 1)
+    throughput = db.query(WaitlistHourlyStatsModel).filter(
+        WaitlistHourlyStatsModel.hour >= since
+    ).order_by(WaitlistHourlyStatsModel.venue_id, WaitlistHourlyStatsModel.hour).all()
 
     return {
         "total_users": total_users,
         "total_staff": total_staff,
         "total_customers": total_customers,
-        "total_venues": total_venues
+        "total_venues": total_venues,
+        "waitlist_throughput": [
+            {
+                "venue_id": row.venue_id,
+                "hour": row.hour,
+                "joins": row.joins,
+                "approvals": row.approvals,
+                "seats": row.seats,
+                "cancels": row.cancels,
+                "rejects": row.rejects
+            }
+            for row in throughput
+        ]
     }
 
 @router.delete("/venues/{venue_id}")
@@ -53,4 +87,5 @@ def delete_any_venue(venue_id: int, db: Session = Depends(get_db), admin: UserMo
         raise HTTPException(status_code=404, detail="Venue not found")
     db.delete(venue)
     db.commit()
+    venue_catalog.invalidate()
     return {"message": f"Venue {venue.name} deleted successfully"}
@@ -0,0 +1,54 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from services.metrics import request_metrics
+from services.archive import archive_mover
+from services.broker import broker
+from services.notification_worker import notification_worker
+from services.passwords import login_admission, registration_admission
+from services.rate_limit import load_shedder, rate_limiter
+from services.recompute import recompute_scheduler
+from services.service_time import service_time_estimator
+from services.throughput import throughput_rollup
+from services.user_cache import user_cache
+from services.venue_catalog import venue_catalog
+from services.venue_search import venue_search
+
+router = APIRouter()
+
+# counters names each source's cumulative keys; the rest are point-in-time gauges
+request_metrics.register_source("archive_mover", archive_mover.stats, counters=("moved", "runs", "failed_runs"))
+request_metrics.register_source("broker", broker.stats, counters=("published", "dropped", "send_failed"))
+request_metrics.register_source(
+    "notification_worker", notification_worker.stats,
+    counters=("enqueued", "dropped", "coalesced", "written", "batches", "failed_batches", "retried", "discarded")
+)
+request_metrics.register_source("load_shed", load_shedder.stats, counters=("shed",))
+request_metrics.register_source("login_admission", login_admission.stats, counters=("admitted", "rejected"))
+request_metrics.register_source(
+    "rate_limit", rate_limiter.stats,
+    counters=(
+        "allowed", "limited", "backend_errors", "evicted", "purged",
+        *[f"limited_{rule}" for rule in rate_limiter.limited_by_rule]
+    )
+)
+request_metrics.register_source(
+    "recompute", recompute_scheduler.stats,
+    counters=("requested", "coalesced", "executed", "inline", "failed")
+)
+request_metrics.register_source("registration_admission", registration_admission.stats, counters=("admitted", "rejected"))
+request_metrics.register_source("service_time", service_time_estimator.stats, counters=("observed", "persisted"))
+request_metrics.register_source(
+    "throughput_rollup", throughput_rollup.stats,
+    counters=("recorded", "flushes", "failed_flushes")
+)
+request_metrics.register_source("user_cache", user_cache.stats, counters=("hits", "misses"))
+request_metrics.register_source("venue_catalog", venue_catalog.stats, counters=("hits", "version_checks", "reloads"))
+request_metrics.register_source(
+    "venue_search", venue_search.stats,
+    counters=("sql_searches", "index_searches", "index_builds")
+)
+
+# Prometheus scrape target, served outside /api
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def get_metrics():
+    return PlainTextResponse(request_metrics.render(), media_type="text/plain; version=0.0.4")
@@ -1,23 +1,74 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import func, select, update
 from sqlalchemy.orm import Session
-from typing import List
-from database import get_db
+from typing import List, Optional
+from database import get_db, get_read_db, ReadSessionLocal
 from models.user import UserModel
 from models.notification import NotificationModel
 from dependencies.get_current_user import get_current_user
-from serializers.notification import NotificationResponseSchema
+from serializers.notification import (
+    NotificationResponseSchema, NotificationUnreadCountSchema, NotificationMarkReadSchema, NotificationMarkReadResultSchema
+)
+from dependencies.pagination import PageParams, paginate, stream_ndjson
 
 router = APIRouter()
 
+# The badge shows "99+" past this, so counting further is wasted index reads
+UNREAD_COUNT_CAP = 99
+
 @router.get("/notifications", response_model=List[NotificationResponseSchema])
 def get_notifications(
-    db: Session = Depends(get_db),
+    response: Response,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_read_db),
     current_user: UserModel = Depends(get_current_user)
 ):
-    notifications = db.query(NotificationModel).filter(
+    query = db.query(NotificationModel).filter(
         NotificationModel.user_id == current_user.id
-    ).order_by(NotificationModel.created_at.desc()).all()
-    return notifications
+    )
+    # Newest first
+    keys = [NotificationModel.timestamp, NotificationModel.id]
+    if page.stream:
+        return stream_ndjson(
+            query, keys, page, NotificationResponseSchema, descending=True, session_factory=ReadSessionLocal
+        )
+    return paginate(query, keys, page, response, descending=True)
+
+@router.get("/notifications/unread-count", response_model=NotificationUnreadCountSchema)
+def get_unread_count(
+    # Primary, not the replica: the badge is re-read right after a mark-read
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user)
+):
+    # Bounded scan of the partial unread index, whatever the user's history
+    unread = select(NotificationModel.id).where(
+        NotificationModel.user_id == current_user.id,
+        ~NotificationModel.read
+    ).limit(UNREAD_COUNT_CAP + 1).subquery()
+    count = db.execute(select(func.count()).select_from(unread)).scalar()
+    return {"unread": min(count, UNREAD_COUNT_CAP), "capped": count > UNREAD_COUNT_CAP}
+
+@router.put("/notifications/read", response_model=NotificationMarkReadResultSchema)
+def mark_notifications_as_read(
+    body: Optional[NotificationMarkReadSchema] = None,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user)
+):
+    # One UPDATE for all, up to an id, or a list of ids; rows already read are skipped
+    statement = update(NotificationModel).where(
+        NotificationModel.user_id == current_user.id,
+        ~NotificationModel.read
+    )
+    if body is not None and body.up_to_id is not None:
+        statement = statement.where(NotificationModel.id <= body.up_to_id)
+    elif body is not None and body.ids is not None:
+        statement = statement.where(NotificationModel.id.in_(body.ids))
+
+    updated = db.execute(
+        statement.values(read=True).execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return {"updated": updated}
 
 @router.put("/notifications/{notification_id}/read", response_model=NotificationResponseSchema)
 def mark_notification_as_read(
@@ -0,0 +1,56 @@
+# Async versions of the routes in controllers/notifications.py, mounted
+# instead of them when USE_ASYNC_DB is set (see controllers/venue_async.py).
+
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from database import get_async_db, get_async_read_db
+from models.user import UserModel
+from dependencies.get_current_user import get_current_user_async
+from serializers.notification import (
+    NotificationResponseSchema, NotificationUnreadCountSchema, NotificationMarkReadSchema, NotificationMarkReadResultSchema
+)
+from dependencies.pagination import PageParams
+from controllers import notifications
+
+router = APIRouter()
+
+@router.get("/notifications", response_model=List[NotificationResponseSchema])
+async def get_notifications(
+    response: Response,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: UserModel = Depends(get_current_user_async)
+):
+    return await db.run_sync(lambda session: notifications.get_notifications(
+        response=response, page=page, db=session, current_user=current_user
+    ))
+
+@router.get("/notifications/unread-count", response_model=NotificationUnreadCountSchema)
+async def get_unread_count(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user_async)
+):
+    return await db.run_sync(lambda session: notifications.get_unread_count(
+        db=session, current_user=current_user
+    ))
+
+@router.put("/notifications/read", response_model=NotificationMarkReadResultSchema)
+async def mark_notifications_as_read(
+    body: Optional[NotificationMarkReadSchema] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user_async)
+):
+    return await db.run_sync(lambda session: notifications.mark_notifications_as_read(
+        body=body, db=session, current_user=current_user
+    ))
+
+@router.put("/notifications/{notification_id}/read", response_model=NotificationResponseSchema)
+async def mark_notification_as_read(
+    notification_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user_async)
+):
+    return await db.run_sync(lambda session: notifications.mark_notification_as_read(
+        notification_id=notification_id, db=session, current_user=current_user
+    ))
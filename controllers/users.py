@@ -1,60 +1,71 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from models.user import UserModel
 from serializers.user import UserSchema, UserLogin, UserToken, UserResponseSchema
 from dependencies.get_current_user import get_current_user
 from database import get_db
+from services.passwords import hash_password, verify_password, login_admission, registration_admission
+from services.rate_limit import login_rate_limit, register_rate_limit
 
 router = APIRouter()
 
-@router.post("/register", response_model=UserResponseSchema)
-def create_user(user: UserSchema, db: Session = Depends(get_db)):
-    existing_user = db.query(UserModel).filter(
+# These routes are async so that bcrypt runs on the password process pool
+# (services/passwords.py); the short database calls go to the threadpool.
+
+def find_existing_user(db: Session, user: UserSchema):
+    return db.query(UserModel).filter(
         (UserModel.username == user.username) | (UserModel.email == user.email)
     ).first()
 
-    if existing_user:
-        raise HTTPException(status_code=400, detail="Username or email already exists")
-
-    new_user = UserModel(username=user.username, email=user.email, role="customer")
-    # Use the set_password method to hash the password
-    new_user.set_password(user.password)
-
+def save_user(db: Session, new_user: UserModel):
     db.add(new_user)
     db.commit()
     db.refresh(new_user)
-
     return new_user
 
+@router.post("/register", response_model=UserResponseSchema, dependencies=[Depends(register_rate_limit)])
+async def create_user(user: UserSchema, db: Session = Depends(get_db)):
+    async with registration_admission.admit():
+        existing_user = await run_in_threadpool(find_existing_user, db, user)
+
+        if existing_user:
+            raise HTTPException(status_code=400, detail="Username or email already exists")
+
+        new_user = UserModel(username=user.username, email=user.email, role="customer")
+        # Hash the password on the process pool
+        new_user.password_hash = await hash_password(user.password)
+
+        return await run_in_threadpool(save_user, db, new_user)
+
 @router.post("/register/staff", response_model=UserResponseSchema)
-def create_staff(user: UserSchema, db: Session = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
+async def create_staff(user: UserSchema, db: Session = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Only admin can create staff members")
 
-    existing_user = db.query(UserModel).filter(
-        (UserModel.username == user.username) | (UserModel.email == user.email)
-    ).first()
+    async with registration_admission.admit():
+        existing_user = await run_in_threadpool(find_existing_user, db, user)
 
-    if existing_user:
-        raise HTTPException(status_code=400, detail="Username or email already exists")
+        if existing_user:
+            raise HTTPException(status_code=400, detail="Username or email already exists")
 
-    new_staff = UserModel(username=user.username, email=user.email, role="staff")
-    new_staff.set_password(user.password)
+        new_staff = UserModel(username=user.username, email=user.email, role="staff")
+        new_staff.password_hash = await hash_password(user.password)
 
-    db.add(new_staff)
-    db.commit()
-    db.refresh(new_staff)
-    return new_staff
+        return await run_in_threadpool(save_user, db, new_staff)
 
-@router.post("/login", response_model=UserToken)
-def login(user: UserLogin, db: Session = Depends(get_db)):
+@router.post("/login", response_model=UserToken, dependencies=[Depends(login_rate_limit)])
+async def login(user: UserLogin, db: Session = Depends(get_db)):
+    async with login_admission.admit():
 
-    # Find the user by username
-    db_user = db.query(UserModel).filter(UserModel.username == user.username).first()
+        # Find the user by username
+        db_user = await run_in_threadpool(
+            lambda: db.query(UserModel).filter(UserModel.username == user.username).first()
+        )
 
-    # Check if the user exists and if the password is correct
-    if not db_user or not db_user.verify_password(user.password):
-        raise HTTPException(status_code=400, detail="Invalid username or password")
+        # Check if the user exists and if the password is correct
+        if not db_user or not await verify_password(user.password, db_user.password_hash):
+            raise HTTPException(status_code=400, detail="Invalid username or password")
 
     # Generate JWT token
     token = db_user.generate_token()
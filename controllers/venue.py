@@ -1,17 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from models.venue import VenueModel
 from models.user import UserModel
-from serializers.venue import VenueSchema, VenueResponse, VenueCreateSchema
+from serializers.venue import VenueSchema, VenueResponse, VenueCreateSchema, VenueSearchResultSchema
 from typing import List
-from database import get_db
+from database import get_db, get_read_db
 from dependencies.get_current_user import get_current_user
+from dependencies.pagination import NEXT_CURSOR_HEADER, PageParams, decode_cursor, encode_cursor
+from services.venue_catalog import venue_catalog
+from services.venue_search import venue_search
 
 router = APIRouter()
 
 @router.get("/venue", response_model=List[VenueSchema])
-def get_venues(db: Session = Depends(get_db)):
-    return db.query(VenueModel).all()
+def get_venues(request: Request, page: PageParams = Depends(), db: Session = Depends(get_read_db)):
+    # Served from the in-process catalog, with the same keyset pages as paginate()
+    catalog = venue_catalog.get(db)
+    etag = catalog.etag("list", page.limit, page.cursor, page.format)
+    headers = catalog.headers(etag)
+    if catalog.not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    after_id = decode_cursor(page.cursor, [VenueModel.id])[0] if page.cursor else None
+    if page.stream:
+        rows = catalog.page_after(after_id, len(catalog.venues))
+        lines = (json.dumps(row, separators=(",", ":")) + "\n" for row in rows)
+        return StreamingResponse(lines, media_type="application/x-ndjson", headers=headers)
+
+    rows = catalog.page_after(after_id, page.limit + 1)
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor([rows[-1]["id"]])
+    return JSONResponse(rows, headers=headers)
 
 @router.get("/venue/my", response_model=List[VenueSchema])
 def get_my_venues(
@@ -27,12 +49,31 @@ def get_my_venues(
 
     return venues
 
+@router.get("/venue/search", response_model=List[VenueSearchResultSchema])
+def search_venues(
+    q: str = Query(..., min_length=1, max_length=100),
+    order: str = Query("relevance", pattern="^(relevance|waiting)$"),
+    page: PageParams = Depends(),
+    db: Session = Depends(get_read_db)
+):
+    rows, next_cursor = venue_search.search(db, q, order, page)
+    if page.stream:
+        lines = (json.dumps(row, separators=(",", ":")) + "\n" for row in rows)
+        return StreamingResponse(lines, media_type="application/x-ndjson")
+    return JSONResponse(rows, headers={NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None)
+
 @router.get("/venue/{venue_id}", response_model=VenueSchema)
-def get_single_venue(venue_id: int, db: Session = Depends(get_db)):
-    venue = db.query(VenueModel).filter(VenueModel.id == venue_id).first()
+def get_single_venue(venue_id: int, request: Request, db: Session = Depends(get_read_db)):
+    catalog = venue_catalog.get(db)
+    venue = catalog.by_id.get(venue_id)
     if not venue:
         raise HTTPException(status_code=404, detail="Venue not found")
-    return venue
+
+    etag = catalog.etag("venue", venue_id)
+    headers = catalog.headers(etag)
+    if catalog.not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(venue, headers=headers)
 
 @router.post("/venue", response_model=VenueResponse)
 def create_venue(venue: VenueCreateSchema, db: Session = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
@@ -43,6 +84,7 @@ def create_venue(venue: VenueCreateSchema, db: Session = Depends(get_db), curren
     new_venue = VenueModel(**venue.dict(), owner_id=current_user.id)
     db.add(new_venue)
     db.commit()
+    venue_catalog.invalidate()
     db.refresh(new_venue)
     return new_venue
 
@@ -60,6 +102,7 @@ def update_venue(venue_id: int, venue: VenueCreateSchema, db: Session = Depends(
         setattr(db_venue, key, value)
 
     db.commit()
+    venue_catalog.invalidate()
     db.refresh(db_venue)
     return db_venue
 
@@ -74,4 +117,5 @@ def delete_venue(venue_id: int, db: Session = Depends(get_db), current_user: Use
 
     db.delete(db_venue)
     db.commit()
+    venue_catalog.invalidate()
     return {"message": f"Venue with ID {venue_id} has been deleted"}
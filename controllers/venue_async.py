@@ -0,0 +1,52 @@
+# Async versions of the routes in controllers/venue.py, mounted instead of
+# them when USE_ASYNC_DB is set. Each handler body runs on the async
+# connection through AsyncSession.run_sync, so no threadpool thread is held
+# while the request waits on Postgres.
+
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.user import UserModel
+from serializers.venue import VenueSchema, VenueResponse, VenueCreateSchema, VenueSearchResultSchema
+from typing import List
+from database import get_async_db, get_async_read_db
+from dependencies.get_current_user import get_current_user_async
+from dependencies.pagination import PageParams
+from controllers import venue
+
+router = APIRouter()
+
+@router.get("/venue", response_model=List[VenueSchema])
+async def get_venues(request: Request, page: PageParams = Depends(), db: AsyncSession = Depends(get_async_read_db)):
+    return await db.run_sync(lambda session: venue.get_venues(request=request, page=page, db=session))
+
+@router.get("/venue/my", response_model=List[VenueSchema])
+async def get_my_venues(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user_async)
+):
+    return await db.run_sync(lambda session: venue.get_my_venues(db=session, current_user=current_user))
+
+@router.get("/venue/search", response_model=List[VenueSearchResultSchema])
+async def search_venues(
+    q: str = Query(..., min_length=1, max_length=100),
+    order: str = Query("relevance", pattern="^(relevance|waiting)$"),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    return await db.run_sync(lambda session: venue.search_venues(q=q, order=order, page=page, db=session))
+
+@router.get("/venue/{venue_id}", response_model=VenueSchema)
+async def get_single_venue(venue_id: int, request: Request, db: AsyncSession = Depends(get_async_read_db)):
+    return await db.run_sync(lambda session: venue.get_single_venue(venue_id=venue_id, request=request, db=session))
+
+@router.post("/venue", response_model=VenueResponse)
+async def create_venue(venue_in: VenueCreateSchema, db: AsyncSession = Depends(get_async_db), current_user: UserModel = Depends(get_current_user_async)):
+    return await db.run_sync(lambda session: venue.create_venue(venue=venue_in, db=session, current_user=current_user))
+
+@router.put("/venue/{venue_id}", response_model=VenueSchema)
+async def update_venue(venue_id: int, venue_in: VenueCreateSchema, db: AsyncSession = Depends(get_async_db), current_user: UserModel = Depends(get_current_user_async)):
+    return await db.run_sync(lambda session: venue.update_venue(venue_id=venue_id, venue=venue_in, db=session, current_user=current_user))
+
+@router.delete("/venue/{venue_id}")
+async def delete_venue(venue_id: int, db: AsyncSession = Depends(get_async_db), current_user: UserModel = Depends(get_current_user_async)):
+    return await db.run_sync(lambda session: venue.delete_venue(venue_id=venue_id, db=session, current_user=current_user))
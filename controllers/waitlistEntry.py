@@ -1,42 +1,208 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
-from database import get_db
-from sqlalchemy import func
+from typing import List, Optional
+from database import get_db, get_read_db, ReadSessionLocal, SessionLocal
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime
 from models.user import UserModel
 from models.venue import VenueModel
 from models.waitlistEntry import WaitlistEntryModel
-from serializers.waitListEntry import WaitlistEntrySchema, WaitlistEntryResponseSchema, StaffWaitlistEntrySchema
+from serializers.waitListEntry import (
+    WaitlistEntrySchema, WaitlistEntryResponseSchema, StaffWaitlistEntrySchema,
+    WaitlistBatchSchema, WaitlistBatchResultSchema
+)
 from dependencies.get_current_user import get_current_user
+from dependencies.pagination import PageParams, paginate, paginate_columns, stream_ndjson
+from services.archive import all_entries
+from services.broker import broker, venue_channel
+from services.notification_worker import notification_worker
+from services.queue_counts import adjust_queue_counts, get_waiting_counts, lock_venue_queue
+from services.rate_limit import join_rate_limit, venue_count_rate_limit
+from services.recompute import recompute_scheduler
+from services.throughput import throughput_rollup
+from services.service_time import service_time_estimator
 
 
 router = APIRouter()
 
-def recalc_queue_positions_and_eta(db: Session, venue_id: int):
-    venue = db.query(VenueModel).filter(VenueModel.id == venue_id).first()
-    if not venue:
-        return
-
-    waiting_entries = db.query(WaitlistEntryModel).filter(
+# Entries still in a venue's live queue
+ACTIVE_STATUSES = ["pending", "waiting"]
+
+# Seconds between keep-alive comments on an idle event stream
+EVENTS_KEEPALIVE = 15
+
+# Most venue ids accepted by one /waitlist/counts request
+MAX_COUNT_BATCH = 200
+
+def notification_message(event: str, entry) -> Optional[str]:
+    if entry.status == "seated":
+        return "Your table is ready"
+    if entry.status == "rejected":
+        return "Your waitlist request was declined"
+    if entry.status == "waiting":
+        wait = f" (about {entry.estimated_wait_time} min)" if entry.estimated_wait_time is not None else ""
+        if event == "approved":
+            return f"You're in the queue at position {entry.position}{wait}"
+        return f"You moved up to position {entry.position}{wait}"
+    return None
+
+def announce_queue_change(venue_id: int, event: str, entries, transitions: int = 1):
+    # Runs after the transition commits. Notifications go through the batched
+    # worker, so shifting 200 people costs one INSERT, not 200.
+    throughput_rollup.record(venue_id, event, transitions)
+
+    for entry in entries:
+        message = notification_message(event, entry)
+        if message:
+            notification_worker.enqueue(entry.user_id, venue_id, entry.status, message)
+
+    # Tell the venue's subscribers which entries changed and where they now stand
+    broker.publish(venue_channel(venue_id), {
+        "venue_id": venue_id,
+        "event": event,
+        "entries": [
+            {
+                "id": e.id,
+                "user_id": e.user_id,
+                "status": e.status,
+                "position": e.position,
+                "estimated_wait_time": e.estimated_wait_time
+            }
+            for e in entries
+        ]
+    })
+
+def recalc_queue_positions_and_eta(db: Session, venue_id: int, removed_position: Optional[int] = None):
+    # Returns the waiting entries whose position or ETA changed
+
+    # Renumbering must not interleave with a position allocation for the same venue
+    lock_venue_queue(db, venue_id)
+
+    # Removing the last waiting entry leaves positions 1..n-1 and their ETAs untouched
+    if removed_position is not None:
+        behind = db.query(WaitlistEntryModel.id).filter(
+            WaitlistEntryModel.venue_id == venue_id,
+            WaitlistEntryModel.status == "waiting",
+            WaitlistEntryModel.position > removed_position
+        ).first()
+        if not behind:
+            db.commit()
+            return []
+
+    # Learned service time, falling back to the venue's configured one
+    avg_time = service_time_estimator.estimate(venue_id)
+    if avg_time is None:
+        avg_time = db.query(VenueModel.avg_service_time).filter(VenueModel.id == venue_id).scalar() or 10
+
+    # Rank the waiting entries by their current position and rewrite only the rows that moved
+    ranked = select(
+        WaitlistEntryModel.id.label("id"),
+        func.row_number().over(
+            order_by=(WaitlistEntryModel.position, WaitlistEntryModel.id)
+        ).label("new_position")
+    ).where(
         WaitlistEntryModel.venue_id == venue_id,
         WaitlistEntryModel.status == "waiting"
-    ).order_by(WaitlistEntryModel.position).all()
+    ).subquery()
 
-    avg_time = venue.avg_service_time or 10
-    running_time = 0
+    new_eta = (ranked.c.new_position - 1) * avg_time
 
-    for idx, entry in enumerate(waiting_entries, start=1):
-        old_position = entry.position
+    shifted = db.execute(
+        update(WaitlistEntryModel)
+        .where(
+            WaitlistEntryModel.id == ranked.c.id,
+            (WaitlistEntryModel.position != ranked.c.new_position)
+            | (WaitlistEntryModel.estimated_wait_time.is_(None))
+            | (WaitlistEntryModel.estimated_wait_time != new_eta)
+        )
+        .values(position=ranked.c.new_position, estimated_wait_time=new_eta)
+        .returning(
+            WaitlistEntryModel.id,
+            WaitlistEntryModel.user_id,
+            WaitlistEntryModel.status,
+            WaitlistEntryModel.position,
+            WaitlistEntryModel.estimated_wait_time
+        )
+        .execution_options(synchronize_session=False)
+    ).all()
+    db.commit()
 
-        entry.position = idx
-        entry.estimated_wait_time = running_time
-        running_time += avg_time
-        db.add(entry)
+    return shifted
 
-    db.commit()
+def settle_queue(db: Session, venue_id: int, removed_position: Optional[int], strict: bool = False):
+    # Call after the transition commits. Returns the entries renumbered inline;
+    # a deferred renumbering announces its own changes
+    if recompute_scheduler.defer(venue_id, removed_position, strict):
+        return []
+    return recalc_queue_positions_and_eta(db, venue_id, removed_position=removed_position)
+
+def run_scheduled_recompute(venue_id: int, removed_position: Optional[int]):
+    db = SessionLocal()
+    try:
+        shifted = recalc_queue_positions_and_eta(db, venue_id, removed_position=removed_position)
+    finally:
+        db.close()
+    if shifted:
+        announce_queue_change(venue_id, "reordered", shifted, transitions=0)
+
+recompute_scheduler.handler = run_scheduled_recompute
+
+# Staff transitions shared by the single-entry routes and the batch route.
+# They validate the status change and apply it; the caller adjusts the
+# venue's queue counters once for everything it applied, then commits.
+
+# action -> (status it applies to, status it leaves, why it was refused)
+TRANSITIONS = {
+    "approve": ("pending", "waiting", "Only pending entries can be approved"),
+    "seat": ("waiting", "seated", "Only waiting users can be marked as seated"),
+    "reject": ("pending", "rejected", "Only pending entries can be rejected"),
+}
+
+def check_transition(status: str, action: str):
+    required, _, detail = TRANSITIONS[action]
+    if status != required:
+        raise HTTPException(status_code=400, detail=detail)
+
+def approve_entries(db: Session, venue: VenueModel, entries: List[WaitlistEntryModel]):
+    for entry in entries:
+        check_transition(entry.status, "approve")
+
+    # Hold the venue's queue lock so concurrent approvals get distinct
+    # positions; one lock and one max(position) read cover the whole list
+    lock_venue_queue(db, venue.id)
+
+    max_pos = db.query(func.max(WaitlistEntryModel.position)).filter(
+        WaitlistEntryModel.venue_id == venue.id,
+        WaitlistEntryModel.status == "waiting"
+    ).scalar() or 0
+
+    now = datetime.utcnow()
+    avg_time = service_time_estimator.estimate(venue.id) or venue.avg_service_time or 10
+    for position, entry in enumerate(entries, start=max_pos + 1):
+        entry.position = position
+        entry.status = "waiting"
+        entry.approved_at = now
+        entry.approved_position = position
+        entry.estimated_wait_time = (position - 1) * avg_time
+
+def seat_entry(entry: WaitlistEntryModel):
+    check_transition(entry.status, "seat")
+
+    entry.status = "seated"
+    entry.seated_at = datetime.utcnow()
+
+def reject_entry(entry: WaitlistEntryModel):
+    check_transition(entry.status, "reject")
+
+    # The position is kept (positions are NOT NULL), like seated and cancelled entries
+    entry.status = "rejected"
+    entry.estimated_wait_time = None
 
-@router.post("/waitlist", response_model=WaitlistEntryResponseSchema)
+@router.post("/waitlist", response_model=WaitlistEntryResponseSchema, dependencies=[Depends(join_rate_limit)])
 def join_waitlist(
     entry: WaitlistEntrySchema,
     db: Session = Depends(get_db),
@@ -53,16 +219,19 @@ def join_waitlist(
     exists = db.query(WaitlistEntryModel).filter(
         WaitlistEntryModel.user_id == current_user.id,
         WaitlistEntryModel.venue_id == venue.id,
-        WaitlistEntryModel.status.in_(["pending", "waiting"])
+        WaitlistEntryModel.status.in_(ACTIVE_STATUSES)
     ).first()
 
     if exists:
         raise HTTPException(status_code=400, detail="You already have a waitlist entry for this venue")
 
+    # Hold the venue's queue lock until commit so concurrent joins get distinct positions
+    lock_venue_queue(db, venue.id)
+
     # Get current max position for this venue's active waitlist
     max_position = db.query(func.max(WaitlistEntryModel.position)).filter(
         WaitlistEntryModel.venue_id == venue.id,
-        WaitlistEntryModel.status.in_(["pending", "waiting"])
+        WaitlistEntryModel.status.in_(ACTIVE_STATUSES)
     ).scalar()
     new_position = (max_position or 0) + 1
 
@@ -78,22 +247,38 @@ def join_waitlist(
 
     try:
         db.add(new_entry)
+        adjust_queue_counts(db, venue.id, pending=1)
         db.commit()
         db.refresh(new_entry)
+    except IntegrityError as e:
+        # A concurrent join for the same customer won the unique index
+        db.rollback()
+        raise HTTPException(status_code=400, detail="You already have a waitlist entry for this venue") from e
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail="Failed to join waitlist") from e
 
+    announce_queue_change(venue.id, "joined", [new_entry])
     return new_entry
 
 @router.get("/waitlist/my", response_model=List[WaitlistEntryResponseSchema])
 def get_my_waitlist(
-    db: Session = Depends(get_db),
+    response: Response,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_read_db),
     current_user: UserModel = Depends(get_current_user)
 ):
-    return db.query(WaitlistEntryModel).filter(
-        WaitlistEntryModel.user_id == current_user.id
-    ).order_by(WaitlistEntryModel.timestamp.desc()).all()
+    # Live and archived entries together
+    query = db.query(all_entries).filter(
+        all_entries.user_id == current_user.id
+    )
+    # Newest first
+    keys = [all_entries.timestamp, all_entries.id]
+    if page.stream:
+        return stream_ndjson(
+            query, keys, page, WaitlistEntryResponseSchema, descending=True, session_factory=ReadSessionLocal
+        )
+    return paginate(query, keys, page, response, descending=True)
 
 
 @router.get("/waitlist/my/{entry_id}", response_model=WaitlistEntryResponseSchema)
@@ -102,9 +287,9 @@ def get_single_waitlist_entry(
     db: Session = Depends(get_db),
     current_user: UserModel = Depends(get_current_user)
 ):
-    entry = db.query(WaitlistEntryModel).filter(
-        WaitlistEntryModel.id == entry_id,
-        WaitlistEntryModel.user_id == current_user.id
+    entry = db.query(all_entries).filter(
+        all_entries.id == entry_id,
+        all_entries.user_id == current_user.id
     ).first()
 
     if not entry:
@@ -115,6 +300,7 @@ def get_single_waitlist_entry(
 @router.put("/waitlist/my/{entry_id}/cancel", response_model=WaitlistEntryResponseSchema)
 def cancel_waitlist_entry(
     entry_id: int,
+    strict: bool = False,
     db: Session = Depends(get_db),
     current_user: UserModel = Depends(get_current_user)
 ):
@@ -127,19 +313,34 @@ def cancel_waitlist_entry(
     ).first()
 
     if not entry:
+        # Archived entries are finished ones, and get the same answer as a
+        # finished entry still in the hot table
+        archived = db.query(all_entries.id).filter(
+            all_entries.id == entry_id,
+            all_entries.user_id == current_user.id
+        ).first()
+        if archived:
+            raise HTTPException(status_code=400, detail="This entry can no longer be cancelled")
         raise HTTPException(status_code=404, detail="Waitlist entry not found")
 
-    if entry.status not in ["pending", "waiting"]:
+    if entry.status not in ACTIVE_STATUSES:
         raise HTTPException(status_code=400, detail="This entry can no longer be cancelled")
 
     status_before = entry.status
+    position_before = entry.position
     entry.status = "cancelled"
+    if status_before == "waiting":
+        adjust_queue_counts(db, entry.venue_id, waiting=-1)
+    else:
+        adjust_queue_counts(db, entry.venue_id, pending=-1)
     db.commit()
 
+    shifted = []
     if status_before == "waiting":
-      recalc_queue_positions_and_eta(db, entry.venue_id)
+      shifted = settle_queue(db, entry.venue_id, position_before, strict)
 
     db.refresh(entry)
+    announce_queue_change(entry.venue_id, "cancelled", [entry, *shifted])
     return entry
 
 @router.put("/waitlist/{entry_id}/approve", response_model=WaitlistEntryResponseSchema)
@@ -163,27 +364,19 @@ def approve_waitlist_entry(
     if not venue:
         raise HTTPException(status_code=403, detail="You cannot manage this venue")
 
-    if entry.status != "pending":
-        raise HTTPException(status_code=400, detail="Only pending entries can be approved")
-
-    max_pos = db.query(func.max(WaitlistEntryModel.position)).filter(
-        WaitlistEntryModel.venue_id == entry.venue_id,
-        WaitlistEntryModel.status == "waiting"
-    ).scalar() or 0
-
-    entry.position = max_pos + 1
-    entry.status = "waiting"
-    entry.estimated_wait_time = (entry.position - 1) * (venue.avg_service_time or 10)
-
+    approve_entries(db, venue, [entry])
+    adjust_queue_counts(db, entry.venue_id, waiting=1, pending=-1)
     db.commit()
 
     db.refresh(entry)
+    announce_queue_change(entry.venue_id, "approved", [entry])
     return entry
 
 
 @router.put("/waitlist/{entry_id}/seated", response_model=WaitlistEntryResponseSchema)
 def mark_as_seated(
     entry_id: int,
+    strict: bool = False,
     db: Session = Depends(get_db),
     current_user: UserModel = Depends(get_current_user)
 ):
@@ -203,14 +396,15 @@ def mark_as_seated(
     if not venue:
         raise HTTPException(status_code=403, detail="You cannot manage this venue")
 
-    if entry.status != "waiting":
-        raise HTTPException(status_code=400, detail="Only waiting users can be marked as seated")
-
-    entry.status = "seated"
+    position_before = entry.position
+    seat_entry(entry)
+    adjust_queue_counts(db, entry.venue_id, waiting=-1)
     db.commit()
 
-    recalc_queue_positions_and_eta(db, entry.venue_id)
+    shifted = settle_queue(db, entry.venue_id, position_before, strict)
     db.refresh(entry)
+    service_time_estimator.observe(entry.venue_id, entry.approved_at, entry.seated_at, entry.approved_position)
+    announce_queue_change(entry.venue_id, "seated", [entry, *shifted])
     return entry
 
 @router.put("/waitlist/{entry_id}/reject", response_model=WaitlistEntryResponseSchema)
@@ -237,22 +431,107 @@ def reject_waitlist_entry(
     if not venue:
         raise HTTPException(status_code=403, detail="You are not allowed to manage this venue")
 
-    if entry.status != "pending":
-        raise HTTPException(status_code=400, detail="Only pending entries can be rejected")
-
-    entry.status = "rejected"
-    entry.position = None
-    entry.estimated_wait_time = None
-
-    db.add(entry)
+    reject_entry(entry)
+    adjust_queue_counts(db, entry.venue_id, pending=-1)
     db.commit()
     db.refresh(entry)
 
+    announce_queue_change(entry.venue_id, "rejected", [entry])
     return entry
 
+@router.post("/waitlist/venue/{venue_id}/batch", response_model=List[WaitlistBatchResultSchema])
+def apply_waitlist_batch(
+    venue_id: int,
+    batch: WaitlistBatchSchema,
+    strict: bool = False,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user)
+):
+    if current_user.role != "staff":
+        raise HTTPException(status_code=403, detail="Only staff can update waitlist status")
+
+    # Ownership is checked once for the whole batch
+    venue = db.query(VenueModel).filter(
+        VenueModel.id == venue_id,
+        VenueModel.owner_id == current_user.id
+    ).first()
+
+    if not venue:
+        raise HTTPException(status_code=403, detail="You do not manage this venue")
+
+    entry_ids = {action.entry_id for action in batch.actions}
+    entries = {
+        e.id: e for e in db.query(WaitlistEntryModel).filter(
+            WaitlistEntryModel.id.in_(entry_ids),
+            WaitlistEntryModel.venue_id == venue_id
+        ).all()
+    }
+
+    # Walk the actions in order against the entries' would-be statuses, so an
+    # entry can be approved and seated in one batch; a refused action is
+    # reported and skipped, and the rest of the batch still applies
+    statuses = {entry_id: entry.status for entry_id, entry in entries.items()}
+    results = []
+    applied = {"approve": [], "seat": [], "reject": []}
+
+    for action in batch.actions:
+        entry = entries.get(action.entry_id)
+        if not entry:
+            results.append({"entry_id": action.entry_id, "action": action.action, "ok": False, "detail": "Waitlist entry not found"})
+            continue
+
+        try:
+            check_transition(statuses[entry.id], action.action)
+        except HTTPException as e:
+            results.append({"entry_id": action.entry_id, "action": action.action, "ok": False, "detail": e.detail})
+            continue
+
+        statuses[entry.id] = TRANSITIONS[action.action][1]
+        applied[action.action].append(entry)
+        results.append({"entry_id": action.entry_id, "action": action.action, "ok": True, "entry": entry})
+
+    # Approvals first, so an entry approved in this batch is seated from its new position
+    if applied["approve"]:
+        approve_entries(db, venue, applied["approve"])
+    seated_positions = []
+    for entry in applied["seat"]:
+        seated_positions.append(entry.position)
+        seat_entry(entry)
+    for entry in applied["reject"]:
+        reject_entry(entry)
+
+    # One counter update and one commit for the whole batch, followed by at most one renumbering pass
+    if any(applied.values()):
+        adjust_queue_counts(
+            db, venue_id,
+            waiting=len(applied["approve"]) - len(applied["seat"]),
+            pending=-len(applied["approve"]) - len(applied["reject"])
+        )
+    db.commit()
+    shifted = []
+    if seated_positions:
+        shifted = settle_queue(db, venue_id, min(seated_positions), strict)
+
+    # Reload the committed entries in one query rather than one refresh each
+    if entries:
+        db.query(WaitlistEntryModel).filter(WaitlistEntryModel.id.in_(list(entries))).all()
+
+    for entry in applied["seat"]:
+        service_time_estimator.observe(venue_id, entry.approved_at, entry.seated_at, entry.approved_position)
+
+    if applied["approve"]:
+        announce_queue_change(venue_id, "approved", applied["approve"], transitions=len(applied["approve"]))
+    if applied["seat"]:
+        announce_queue_change(venue_id, "seated", [*applied["seat"], *shifted], transitions=len(applied["seat"]))
+    if applied["reject"]:
+        announce_queue_change(venue_id, "rejected", applied["reject"], transitions=len(applied["reject"]))
+
+    return results
+
 @router.get("/waitlist/venue/{venue_id}", response_model=List[WaitlistEntryResponseSchema])
 def get_waitlist_for_venue(
     venue_id: int,
+    page: PageParams = Depends(),
     db: Session = Depends(get_db),
     current_user: UserModel = Depends(get_current_user)
 ):
@@ -267,15 +546,16 @@ def get_waitlist_for_venue(
     if not venue:
         raise HTTPException(status_code=403, detail="You do not manage this venue")
 
-    waitlist_entries = db.query(WaitlistEntryModel).filter(
-        WaitlistEntryModel.venue_id == venue_id
-    ).all()
-
-    return waitlist_entries
+    query = db.query(all_entries).filter(
+        all_entries.venue_id == venue_id
+    )
+    # Big venues have long histories: tuples straight to JSON
+    return paginate_columns(query, all_entries, [all_entries.id], page, WaitlistEntryResponseSchema)
 
 @router.get("/waitlist/venue/{venue_id}/staff", response_model=List[StaffWaitlistEntrySchema])
 def get_waitlist_for_venue_staff(
     venue_id: int,
+    include_history: bool = False,
     db: Session = Depends(get_db),
     current_user: UserModel = Depends(get_current_user)
 ):
@@ -290,32 +570,118 @@ def get_waitlist_for_venue_staff(
     if not venue:
         raise HTTPException(status_code=403, detail="You do not manage this venue")
 
-    waitlist_entries = db.query(WaitlistEntryModel).filter(
-        WaitlistEntryModel.venue_id == venue_id
-    ).all()
+    # Live queue only, unless the seated/cancelled/rejected history (mostly archived) is asked for
+    entries = all_entries if include_history else WaitlistEntryModel
+
+    # One joined query for the columns the staff view needs, instead of lazy-loading each entry's user
+    query = db.query(
+        entries.id,
+        entries.user_id,
+        UserModel.username,
+        entries.status,
+        entries.position,
+        entries.timestamp
+    ).outerjoin(
+        UserModel, UserModel.id == entries.user_id
+    ).filter(
+        entries.venue_id == venue_id
+    )
+
+    if not include_history:
+        query = query.filter(entries.status.in_(ACTIVE_STATUSES))
+
+    rows = query.order_by(entries.position, entries.id).all()
 
     response = [
         StaffWaitlistEntrySchema(
             id=w.id,
             user_id=w.user_id,
-            username=w.user.username if w.user else "Unknown",
+            username=w.username or "Unknown",
             status=w.status,
             position=w.position,
             timestamp=w.timestamp
         )
-        for w in waitlist_entries
+        for w in rows
     ]
 
     return response
 
-@router.get("/waitlist/venue/count/{venue_id}")
+@router.get("/waitlist/venue/count/{venue_id}", dependencies=[Depends(venue_count_rate_limit)])
 def get_waitlist_count_for_venue(
     venue_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    count = db.query(WaitlistEntryModel).filter(
-        WaitlistEntryModel.venue_id == venue_id,
-        WaitlistEntryModel.status == "waiting"
-    ).count()
+    # Read from the maintained counter instead of counting waitlist_entries
+    count = get_waiting_counts(db, [venue_id])[venue_id]
+
+    return {"venue_id": venue_id, "waiting_count": count}
 
-    return {"venue_id": venue_id, "waiting_count": count}
\ No newline at end of file
+@router.get("/waitlist/counts")
+def get_waitlist_counts_for_venues(
+    venue_ids: List[int] = Query(..., max_length=MAX_COUNT_BATCH),
+    db: Session = Depends(get_read_db)
+):
+    # Batch variant for the venue list screen: /waitlist/counts?venue_ids=1&venue_ids=2
+    counts = get_waiting_counts(db, venue_ids)
+
+    return [{"venue_id": venue_id, "waiting_count": counts[venue_id]} for venue_id in venue_ids]
+
+def queue_event_scope(db: Session, venue_id: int, current_user: UserModel) -> bool:
+    # True when the caller sees every entry of the venue's queue (its staff),
+    # False when only their own (customers)
+    if current_user.role == "staff":
+        venue = db.query(VenueModel).filter(
+            VenueModel.id == venue_id,
+            VenueModel.owner_id == current_user.id
+        ).first()
+        if not venue:
+            raise HTTPException(status_code=403, detail="You do not manage this venue")
+        return True
+
+    if current_user.role != "customer":
+        raise HTTPException(status_code=403, detail="Only staff and customers can follow a queue")
+
+    venue = db.query(VenueModel).filter(VenueModel.id == venue_id).first()
+    if not venue:
+        raise HTTPException(status_code=404, detail="Venue not found")
+    return False
+
+def queue_event_for(message: dict, user_id: int, full_view: bool) -> Optional[dict]:
+    # A customer only hears about their own entries, and nothing at all
+    # about changes that did not touch them
+    if full_view:
+        return message
+    entries = [entry for entry in message["entries"] if entry["user_id"] == user_id]
+    if not entries:
+        return None
+    return {**message, "entries": entries}
+
+def queue_events_response(venue_id: int, user_id: int, full_view: bool) -> StreamingResponse:
+    async def events():
+        async with broker.subscribe(venue_channel(venue_id)) as queue:
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=EVENTS_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                message = queue_event_for(message, user_id, full_view)
+                if message is not None:
+                    yield f"event: {message['event']}\ndata: {json.dumps(message, default=str)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@router.get("/waitlist/venue/{venue_id}/events")
+def get_venue_queue_events(
+    venue_id: int,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user)
+):
+    # Server-sent events with the venue's queue changes, replacing polling of
+    # /waitlist/my/{entry_id} and /waitlist/venue/count/{venue_id}
+    full_view = queue_event_scope(db, venue_id, current_user)
+    user_id = current_user.id
+    # The stream stays open for as long as the client listens; it must not hold a pooled connection
+    db.close()
+
+    return queue_events_response(venue_id, user_id, full_view)
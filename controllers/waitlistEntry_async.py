@@ -0,0 +1,149 @@
+# Async versions of the routes in controllers/waitlistEntry.py, mounted
+# instead of them when USE_ASYNC_DB is set (see controllers/venue_async.py).
+
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from database import get_async_db, get_async_read_db
+from models.user import UserModel
+from serializers.waitListEntry import (
+    WaitlistEntrySchema, WaitlistEntryResponseSchema, StaffWaitlistEntrySchema,
+    WaitlistBatchSchema, WaitlistBatchResultSchema
+)
+from dependencies.get_current_user import get_current_user_async
+from dependencies.pagination import PageParams
+from services.rate_limit import join_rate_limit, venue_count_rate_limit
+from controllers import waitlistEntry
+
+router = APIRouter()
+
+@router.post("/waitlist", response_model=WaitlistEntryResponseSchema, dependencies=[Depends(join_rate_limit)])
+async def join_waitlist(
+    entry: WaitlistEntrySchema,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user_async)
+):
+    return await db.run_sync(lambda session: waitlistEntry.join_waitlist(entry=entry, db=session, current_user=current_user))
+
+@router.get("/waitlist/my", response_model=List[WaitlistEntryResponseSchema])
+async def get_my_waitlist(
+    response: Response,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: UserModel = Depends(get_current_user_async)
+):
+    return await db.run_sync(lambda session: waitlistEntry.get_my_waitlist(
+        response=response, page=page, db=session, current_user=current_user
+    ))
+
+@router.get("/waitlist/my/{entry_id}", response_model=WaitlistEntryResponseSchema)
+async def get_single_waitlist_entry(
+    entry_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user_async)
+):
+    return await db.run_sync(lambda session: waitlistEntry.get_single_waitlist_entry(
+        entry_id=entry_id, db=session, current_user=current_user
+    ))
+
+@router.put("/waitlist/my/{entry_id}/cancel", response_model=WaitlistEntryResponseSchema)
+async def cancel_waitlist_entry(
+    entry_id: int,
+    strict: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user_async)
+):
+    return await db.run_sync(lambda session: waitlistEntry.cancel_waitlist_entry(
+        entry_id=entry_id, strict=strict, db=session, current_user=current_user
+    ))
+
+@router.put("/waitlist/{entry_id}/approve", response_model=WaitlistEntryResponseSchema)
+async def approve_waitlist_entry(
+    entry_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user_async)
+):
+    return await db.run_sync(lambda session: waitlistEntry.approve_waitlist_entry(
+        entry_id=entry_id, db=session, current_user=current_user
+    ))
+
+@router.put("/waitlist/{entry_id}/seated", response_model=WaitlistEntryResponseSchema)
+async def mark_as_seated(
+    entry_id: int,
+    strict: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user_async)
+):
+    return await db.run_sync(lambda session: waitlistEntry.mark_as_seated(
+        entry_id=entry_id, strict=strict, db=session, current_user=current_user
+    ))
+
+@router.put("/waitlist/{entry_id}/reject", response_model=WaitlistEntryResponseSchema)
+async def reject_waitlist_entry(
+    entry_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user_async)
+):
+    return await db.run_sync(lambda session: waitlistEntry.reject_waitlist_entry(
+        entry_id=entry_id, db=session, current_user=current_user
+    ))
+
+@router.post("/waitlist/venue/{venue_id}/batch", response_model=List[WaitlistBatchResultSchema])
+async def apply_waitlist_batch(
+    venue_id: int,
+    batch: WaitlistBatchSchema,
+    strict: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user_async)
+):
+    return await db.run_sync(lambda session: waitlistEntry.apply_waitlist_batch(
+        venue_id=venue_id, batch=batch, strict=strict, db=session, current_user=current_user
+    ))
+
+@router.get("/waitlist/venue/{venue_id}", response_model=List[WaitlistEntryResponseSchema])
+async def get_waitlist_for_venue(
+    venue_id: int,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user_async)
+):
+    return await db.run_sync(lambda session: waitlistEntry.get_waitlist_for_venue(
+        venue_id=venue_id, page=page, db=session, current_user=current_user
+    ))
+
+@router.get("/waitlist/venue/{venue_id}/staff", response_model=List[StaffWaitlistEntrySchema])
+async def get_waitlist_for_venue_staff(
+    venue_id: int,
+    include_history: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user_async)
+):
+    return await db.run_sync(lambda session: waitlistEntry.get_waitlist_for_venue_staff(
+        venue_id=venue_id, include_history=include_history, db=session, current_user=current_user
+    ))
+
+@router.get("/waitlist/venue/count/{venue_id}", dependencies=[Depends(venue_count_rate_limit)])
+async def get_waitlist_count_for_venue(
+    venue_id: int,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    return await db.run_sync(lambda session: waitlistEntry.get_waitlist_count_for_venue(venue_id=venue_id, db=session))
+
+@router.get("/waitlist/counts")
+async def get_waitlist_counts_for_venues(
+    venue_ids: List[int] = Query(..., max_length=waitlistEntry.MAX_COUNT_BATCH),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    return await db.run_sync(lambda session: waitlistEntry.get_waitlist_counts_for_venues(venue_ids=venue_ids, db=session))
+
+@router.get("/waitlist/venue/{venue_id}/events")
+async def get_venue_queue_events(
+    venue_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user_async)
+):
+    full_view = await db.run_sync(lambda session: waitlistEntry.queue_event_scope(db=session, venue_id=venue_id, current_user=current_user))
+    user_id = current_user.id
+    await db.close()
+
+    return waitlistEntry.queue_events_response(venue_id, user_id, full_view)
@@ -1,14 +1,60 @@
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
-from config.environment import db_URI
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from config.environment import (
+    db_URI, async_db_URI, use_async_db, read_db_URI, async_read_db_URI,
+    db_pool_size, db_max_overflow, db_pool_timeout, db_pool_recycle, db_pool_pre_ping, db_statement_timeout_ms,
+    db_sqlite_busy_timeout
+)
+from services.metrics import instrument_engine
+
+
+def engine_options(uri: str) -> dict:
+    url = make_url(uri)
+    options = {"pool_pre_ping": db_pool_pre_ping, "pool_recycle": db_pool_recycle}
+    if url.get_backend_name() == "sqlite":
+        # Every writer queues on the one database lock (the venue queue lock
+        # included); under a burst of joins the default 5 s wait runs out
+        options["connect_args"] = {"timeout": db_sqlite_busy_timeout}
+        return options
+
+    options.update(pool_size=db_pool_size, max_overflow=db_max_overflow, pool_timeout=db_pool_timeout)
+    if db_statement_timeout_ms:
+        if url.get_driver_name() == "asyncpg":
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(db_statement_timeout_ms)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={db_statement_timeout_ms}"}
+    return options
+
 
 # Connect FastAPI with SQLAlchemy
-engine = create_engine(
-    db_URI
-)
+engine = create_engine(db_URI, **engine_options(db_URI))
+instrument_engine(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Read-only GET routes can opt into the replica; without one they share the primary's pool
+read_engine = engine if read_db_URI == db_URI else create_engine(read_db_URI, **engine_options(read_db_URI))
+if read_engine is not engine:
+    instrument_engine(read_engine)
+
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+# The async engine is only built in async mode so the sync deployment does not need asyncpg
+async_engine = create_async_engine(async_db_URI, **engine_options(async_db_URI)) if use_async_db else None
+if async_engine is not None:
+    instrument_engine(async_engine.sync_engine)
+
+async_read_engine = async_engine
+if use_async_db and async_read_db_URI != async_db_URI:
+    async_read_engine = create_async_engine(async_read_db_URI, **engine_options(async_read_db_URI))
+    instrument_engine(async_read_engine.sync_engine)
+
+# Handlers refresh what they return, so nothing needs expiring on commit
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+AsyncReadSessionLocal = async_sessionmaker(bind=async_read_engine, autoflush=False, expire_on_commit=False)
+
 
 def get_db():
     db = SessionLocal()
@@ -16,3 +62,22 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    # Replica reads may lag the primary; only for routes that tolerate that
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
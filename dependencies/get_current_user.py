@@ -4,8 +4,10 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from models.user import UserModel
-from database import get_db
+from database import get_db, get_async_db
+from services.user_cache import CachedUser, user_cache
 import jwt
 from jwt import DecodeError, ExpiredSignatureError # We import specific exceptions to handle them explicitly
 from config.environment import secret
@@ -13,20 +15,12 @@ from config.environment import secret
 # We're using the HTTP Bearer scheme for the Authorization header
 http_bearer = HTTPBearer()
 
-# This function takes the database session and the JWT token from the request header
-def get_current_user(db: Session = Depends(get_db), token: str = Depends(http_bearer)):
+# Decode the JWT and return its payload, turning token problems into HTTP errors
+def decode_token(token) -> dict:
 
     try:
         # Decode the token using the secret key
-        payload = jwt.decode(token.credentials, secret, algorithms=["HS256"])
-
-        # Query the database to find the user with the ID from the token's payload
-        user = db.query(UserModel).filter(UserModel.id == payload.get("sub")).first()
-
-        # If no user is found, raise an HTTP 401 Unauthorized error
-        if not user:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
-                                 detail="Invalid username or password")
+        return jwt.decode(token.credentials, secret, algorithms=["HS256"])
 
     # Handle decoding errors (invalid token)
     except DecodeError as e:
@@ -38,6 +32,48 @@ def get_current_user(db: Session = Depends(get_db), token: str = Depends(http_be
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                              detail='Token has expired')
 
+# This function takes the database session and the JWT token from the request header
+def get_current_user(db: Session = Depends(get_db), token: str = Depends(http_bearer)):
+
+    payload = decode_token(token)
+    user_id = str(payload.get("sub"))
+
+    # Serve recently seen users without touching the users table
+    cached = user_cache.get(user_id)
+    if cached:
+        return cached
+
+    # Query the database to find the user with the ID from the token's payload
+    user = db.query(UserModel).filter(UserModel.id == payload.get("sub")).first()
+
+    # If no user is found, raise an HTTP 401 Unauthorized error
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
+                             detail="Invalid username or password")
+
     # Return the user if the token is valid
-    return user
+    cached = CachedUser.from_model(user)
+    user_cache.set(user_id, cached)
+    return cached
+
+# Same as get_current_user, for routes running on an AsyncSession
+async def get_current_user_async(db: AsyncSession = Depends(get_async_db), token: str = Depends(http_bearer)):
+
+    payload = decode_token(token)
+
+    user_id = str(payload.get("sub"))
+
+    cached = user_cache.get(user_id)
+    if cached:
+        return cached
+
+    user = await db.get(UserModel, int(user_id)) if user_id.isdigit() else None
+
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
+                             detail="Invalid username or password")
+
+    cached = CachedUser.from_model(user)
+    user_cache.set(user_id, cached)
+    return cached
 
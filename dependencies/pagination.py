@@ -0,0 +1,178 @@
+# dependencies/pagination.py
+#
+# Keyset (cursor) pagination and NDJSON streaming for list endpoints.
+# A page is ordered by a unique key (e.g. (timestamp, id)); the cursor is the
+# key of the last row sent, so the next page starts with an index seek instead
+# of an OFFSET scan. The cursor for the next page is returned in the
+# X-Next-Cursor header and the body stays a plain JSON list.
+#
+# Streams read on a session of their own. In async mode (USE_ASYNC_DB, the
+# only mode that mounts the *_async routers) that session is the AsyncSession
+# matching the sync factory the route names, so a slow client holds an async
+# connection instead of a threadpool worker and a sync one.
+#
+# paginate_columns is the opt-in fast path for large lists: it selects only
+# the schema's columns as tuples and encodes the dicts directly (with orjson
+# when it is installed), skipping ORM instances and pydantic validation.
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException, Query, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import DateTime, Integer, String, tuple_
+from config.environment import use_async_db
+from database import SessionLocal, ReadSessionLocal, AsyncSessionLocal, AsyncReadSessionLocal
+
+try:
+    import orjson
+except ImportError:  # optional, the stdlib encoder is the fallback
+    orjson = None
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+STREAM_CHUNK_SIZE = 500
+ASYNC_SESSIONS = {SessionLocal: AsyncSessionLocal, ReadSessionLocal: AsyncReadSessionLocal}
+
+
+class PageParams:
+    def __init__(
+        self,
+        limit: int = Query(100, ge=1, le=1000),
+        cursor: Optional[str] = None,
+        format: str = Query("json", pattern="^(json|ndjson)$")
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.format = format
+
+    @property
+    def stream(self) -> bool:
+        return self.format == "ndjson"
+
+
+def encode_cursor(values) -> str:
+    plain = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(plain).encode()).decode()
+
+
+def cursor_value(key, value):
+    # A value of the wrong type would only fail in the database (a DataError
+    # on Postgres), so it is checked against its key's column type here
+    if value is None:
+        return None
+    if isinstance(key.type, DateTime):
+        if not isinstance(value, str):
+            raise ValueError
+        return datetime.fromisoformat(value)
+    if isinstance(key.type, Integer):
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise ValueError
+        return value
+    if isinstance(key.type, String):
+        if not isinstance(value, str):
+            raise ValueError
+        return value
+    if not isinstance(value, (str, int, float)) or isinstance(value, bool):
+        raise ValueError
+    return value
+
+
+def decode_cursor(cursor: str, keys) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError
+        return [cursor_value(key, v) for key, v in zip(keys, values)]
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def apply_keyset(query, keys, page: PageParams, descending: bool = False):
+    if page.cursor:
+        values = tuple_(*decode_cursor(page.cursor, keys))
+        query = query.filter(tuple_(*keys) < values if descending else tuple_(*keys) > values)
+    return query.order_by(*[key.desc() if descending else key for key in keys])
+
+
+def paginate(query, keys, page: PageParams, response: Response, descending: bool = False):
+    rows = apply_keyset(query, keys, page, descending).limit(page.limit + 1).all()
+
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([getattr(rows[-1], key.key) for key in keys])
+
+    return rows
+
+
+def stream_rows(query, session_factory, encode, scalars: bool = False):
+    # A generator over `query` from a server-side cursor, on a session owned
+    # by the generator so memory stays flat whatever the result size
+    if use_async_db:
+        async def rows():
+            async with ASYNC_SESSIONS[session_factory]() as db:
+                result = await db.stream(query.statement.execution_options(yield_per=STREAM_CHUNK_SIZE))
+                async for row in (result.scalars() if scalars else result):
+                    yield encode(row)
+
+        return rows()
+
+    def rows():
+        db = session_factory()
+        try:
+            for row in query.with_session(db).yield_per(STREAM_CHUNK_SIZE):
+                yield encode(row)
+        finally:
+            db.close()
+
+    return rows()
+
+
+def stream_ndjson(query, keys, page: PageParams, schema, descending: bool = False, session_factory=SessionLocal):
+    # Streams every row from the cursor onwards, one JSON document per line.
+    # Routes on the read replica pass ReadSessionLocal.
+    query = apply_keyset(query, keys, page, descending)
+
+    def encode(row):
+        return schema.model_validate(row, from_attributes=True).model_dump_json() + "\n"
+
+    return StreamingResponse(stream_rows(query, session_factory, encode, scalars=True), media_type="application/x-ndjson")
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dump_json(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, separators=(",", ":"), ensure_ascii=False, default=_json_default).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dump_json(content)
+
+
+def paginate_columns(query, model, keys, page: PageParams, schema, descending: bool = False, session_factory=SessionLocal):
+    # Handles both formats. The columns must hold exactly what the schema
+    # would produce, and every key must be one of the schema's fields.
+    names = list(schema.model_fields)
+    query = apply_keyset(query.with_entities(*[getattr(model, name) for name in names]), keys, page, descending)
+
+    if page.stream:
+        def encode(row):
+            return dump_json(dict(zip(names, row))) + b"\n"
+
+        return StreamingResponse(stream_rows(query, session_factory, encode), media_type="application/x-ndjson")
+
+    rows = query.limit(page.limit + 1).all()
+    headers = {}
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor([getattr(rows[-1], key.key) for key in keys])
+
+    return FastJSONResponse([dict(zip(names, row)) for row in rows], headers=headers)
@@ -0,0 +1,389 @@
+# generate_data.py
+#
+# Recreates the schema and fills it with synthetic data at production scale,
+# for reproducing real query plans locally:
+#
+#   python generate_data.py --users 2000000 --venues 5000 --entries 30000000
+#
+# Rows are generated with NumPy in chunks and loaded with COPY on PostgreSQL
+# (executemany INSERTs elsewhere), so memory stays flat whatever the size.
+# Secondary indexes on the entry and notification tables are dropped during
+# the load and rebuilt once at the end. Finished history is written straight
+# into waitlist_entries_archive, leaving only the live queues in the hot table.
+#
+# Distributions: venue popularity and customer activity are Zipf-like, joins
+# follow a lunch and dinner peak, and outcomes are mostly seated with some
+# cancels and rejects. Every venue also gets a live queue of pending and
+# waiting entries. The derived tables (queue counters, hourly throughput,
+# learned service times) are rebuilt from the result.
+#
+# Logins: admin/admin123, staff<n>/staff123 and user<n>/user123 (ids in the names).
+
+import argparse
+import csv
+import io
+import math
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from sqlalchemy import Integer, case, create_engine, func, insert, literal, select, text, union_all
+from sqlalchemy.orm import sessionmaker
+from models.base import Base
+# Register every table so drop_all/create_all cover the whole schema
+import models.waitlistEntry, models.notification, models.venueQueueStats, models.waitlistHourlyStats, models.venueServiceStats, models.cacheVersion, models.waitlistEntryArchive, models.rateLimitBucket
+from models.user import UserModel, pwd_context
+from models.venue import VenueModel
+from models.waitlistEntry import WaitlistEntryModel
+from models.waitlistEntryArchive import WaitlistEntryArchiveModel
+from models.notification import NotificationModel
+from models.venueQueueStats import VenueQueueStatsModel
+from models.waitlistHourlyStats import WaitlistHourlyStatsModel
+from config.environment import db_URI
+from migrations import run_migrations
+from services.archive import all_entries
+from services.queue_counts import count_queue
+from services.service_time import service_time_estimator
+
+LOCATIONS = ["Manama", "Riffa", "Muharraq", "Hamad Town", "Isa Town", "Sitra", "Budaiya", "Juffair", "Seef", "Amwaj"]
+NAME_WORDS = ["Cafe", "Grill", "Kitchen", "House", "Bistro", "Diner", "Garden", "Corner", "Table", "Oven"]
+CUISINES = ["Aroma", "Tea", "Spice", "Olive", "Saffron", "Harbor", "Palm", "Cedar", "Pearl", "Date"]
+
+# Share of joins per hour of the day: quiet mornings, lunch, then the dinner rush
+HOUR_WEIGHTS = np.array([1, 1, 1, 1, 1, 1, 2, 4, 6, 6, 7, 10, 14, 12, 8, 6, 7, 11, 18, 22, 20, 14, 7, 3], dtype=float)
+OUTCOMES = np.array(["seated", "cancelled", "rejected"])
+OUTCOME_WEIGHTS = [0.80, 0.14, 0.06]
+
+ENTRY_COLUMNS = [
+    "id", "user_id", "venue_id", "status", "position", "estimated_wait_time", "timestamp",
+    "approved_at", "approved_position", "seated_at"
+]
+NOTIFICATION_COLUMNS = ["id", "user_id", "venue_id", "message", "status", "timestamp", "read"]
+
+
+def zipf_weights(n: int, s: float) -> np.ndarray:
+    weights = 1.0 / np.arange(1, n + 1) ** s
+    return weights / weights.sum()
+
+
+class Loader:
+    # COPY on PostgreSQL, executemany INSERT on anything else
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.copy = engine.dialect.name == "postgresql"
+
+    def load(self, table, columns, rows):
+        if not rows:
+            return
+        if self.copy:
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(rows)
+            buffer.seek(0)
+            raw = self.engine.raw_connection()
+            try:
+                with raw.cursor() as cursor:
+                    cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+                raw.commit()
+            finally:
+                raw.close()
+        else:
+            with self.engine.begin() as conn:
+                conn.execute(insert(table), [dict(zip(columns, row)) for row in rows])
+
+    def reset_sequences(self, tables, shared=None):
+        # `shared` maps a table to the ones that also hold ids from its
+        # sequence: the archive keeps the ids of entries moved out of the hot
+        # table, so new entries must be numbered past both
+        if not self.copy:
+            return
+        shared = shared or {}
+        with self.engine.begin() as conn:
+            for table in tables:
+                highest = ", ".join(f"(SELECT MAX(id) FROM {t.name})" for t in [table, *shared.get(table, [])])
+                conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), COALESCE(GREATEST({highest}), 1))"
+                ))
+
+
+def to_objects(array: np.ndarray, mask: np.ndarray = None) -> list:
+    # NumPy datetimes to Python datetimes, with None where the mask is False
+    values = array.astype("datetime64[us]").astype(object).tolist()
+    if mask is not None:
+        values = [value if keep else None for value, keep in zip(values, mask.tolist())]
+    return values
+
+
+class Generator:
+
+    def __init__(self, args, loader: Loader):
+        self.args = args
+        self.loader = loader
+        self.rng = np.random.default_rng(args.seed)
+        self.now = datetime.utcnow().replace(microsecond=0)
+        # Midnight, so offsets in whole days land on the same hour of day
+        self.start = (self.now - timedelta(days=args.days)).replace(hour=0, minute=0, second=0)
+
+        self.staff = max(1, math.ceil(args.venues / args.venues_per_staff))
+        # ids: 1 is the admin, then staff, then customers
+        self.first_customer = self.staff + 2
+        self.customers = args.users - self.staff - 1
+        if self.customers < 1:
+            raise SystemExit("--users must leave room for the admin, staff and at least one customer")
+
+        self.venue_weights = zipf_weights(args.venues, 1.1)
+        self.customer_weights = zipf_weights(self.customers, 0.8)
+        # Popular venues are shuffled so they are not all the lowest ids
+        self.venue_ranks = self.rng.permutation(args.venues) + 1
+        self.customer_ranks = self.rng.permutation(self.customers) + self.first_customer
+        self.service_times = self.rng.integers(5, 31, size=args.venues + 1)
+        # Seconds after start; the last hour belongs to the live queues
+        self.history_end = (self.now - self.start).total_seconds() - 3600
+
+        self.next_notification_id = 1
+
+    def progress(self, label: str, done: int, total: int, started: float):
+        rate = done / max(time.perf_counter() - started, 1e-9)
+        print(f"  {label}: {done:,}/{total:,} ({rate:,.0f} rows/s)", flush=True)
+
+    def users(self):
+        # One hash per role; bcrypt per row would take days at this scale
+        hashes = {role: pwd_context.hash(password) for role, password in (
+            ("admin", "admin123"), ("staff", "staff123"), ("customer", "user123")
+        )}
+        table = UserModel.__table__
+        columns = ["id", "username", "email", "password_hash", "role"]
+
+        self.loader.load(table, columns, [(1, "admin", "admin@example.com", hashes["admin"], "admin")])
+        started = time.perf_counter()
+        for chunk_start in range(2, self.args.users + 1, self.args.chunk):
+            rows = []
+            for user_id in range(chunk_start, min(chunk_start + self.args.chunk, self.args.users + 1)):
+                role = "staff" if user_id < self.first_customer else "customer"
+                name = f"staff{user_id}" if role == "staff" else f"user{user_id}"
+                rows.append((user_id, name, f"{name}@example.com", hashes[role], role))
+            self.loader.load(table, columns, rows)
+            self.progress("users", rows[-1][0], self.args.users, started)
+
+    def venues(self):
+        rows = []
+        for venue_id in range(1, self.args.venues + 1):
+            name = f"{self.rng.choice(CUISINES)} {self.rng.choice(NAME_WORDS)} {venue_id}"
+            owner = 2 + (venue_id - 1) % self.staff
+            rows.append((
+                venue_id, name, str(self.rng.choice(LOCATIONS)), int(self.rng.integers(10, 121)),
+                int(self.service_times[venue_id]), owner, None
+            ))
+        columns = ["id", "name", "location", "max_capacity", "avg_service_time", "owner_id", "image_url"]
+        self.loader.load(VenueModel.__table__, columns, rows)
+        print(f"  venues: {len(rows):,}")
+
+    def join_times(self, n: int, window_start: float, window_end: float) -> np.ndarray:
+        # Uniform days inside the chunk's window, hour of day from HOUR_WEIGHTS
+        seconds = self.rng.uniform(window_start, window_end, size=n)
+        days = np.floor(seconds / 86400) * 86400
+        hours = self.rng.choice(24, size=n, p=HOUR_WEIGHTS / HOUR_WEIGHTS.sum())
+        seconds = days + hours * 3600 + self.rng.uniform(0, 3600, size=n)
+        # An hour drawn past the end of the last, partial day moves to the day before
+        seconds = np.sort(np.where(seconds > self.history_end, seconds - 86400, seconds))
+        return np.datetime64(self.start, "s") + seconds.astype("timedelta64[s]")
+
+    def history(self):
+        total = self.args.entries
+        span = self.history_end
+        started = time.perf_counter()
+
+        # Chunks walk forward through time, so ids grow with timestamps as in production
+        for chunk_start in range(0, total, self.args.chunk):
+            n = min(self.args.chunk, total - chunk_start)
+            joined = self.join_times(n, span * chunk_start / total, span * (chunk_start + n) / total)
+            venue_ids = self.venue_ranks[self.rng.choice(self.args.venues, size=n, p=self.venue_weights)]
+            user_ids = self.customer_ranks[self.rng.choice(self.customers, size=n, p=self.customer_weights)]
+            status = OUTCOMES[self.rng.choice(len(OUTCOMES), size=n, p=OUTCOME_WEIGHTS)]
+
+            position = self.rng.poisson(4, size=n) + 1
+            service = self.service_times[venue_ids]
+            eta = (position - 1) * service
+            # Seated entries and half the cancels were approved first
+            approved = (status == "seated") | ((status == "cancelled") & (self.rng.random(n) < 0.5))
+            approved_at = joined + (self.rng.exponential(8, size=n) * 60).astype("timedelta64[s]")
+            seated_minutes = position * service * self.rng.lognormal(0, 0.3, size=n)
+            # Entries whose service would run past now are closed off at now
+            seated_at = np.minimum(
+                approved_at + (seated_minutes * 60).astype("timedelta64[s]"), np.datetime64(self.now, "s")
+            )
+            approved_at = np.minimum(approved_at, seated_at)
+            seated = status == "seated"
+
+            ids = range(chunk_start + 1, chunk_start + n + 1)
+            entries = list(zip(
+                ids, user_ids.tolist(), venue_ids.tolist(), status.tolist(), position.tolist(), eta.tolist(),
+                to_objects(joined), to_objects(approved_at, approved),
+                [p if a else None for p, a in zip(position.tolist(), approved.tolist())],
+                to_objects(seated_at, seated)
+            ))
+            # Finished history goes straight to the archive, as the mover would have put it
+            self.loader.load(WaitlistEntryArchiveModel.__table__, ENTRY_COLUMNS, entries)
+            self.loader.load(NotificationModel.__table__, NOTIFICATION_COLUMNS, self.notifications(entries))
+            self.progress("waitlist entries", chunk_start + n, total, started)
+
+    def notifications(self, entries) -> list:
+        # What the transition handlers would have sent: the approval, then the outcome
+        rows = []
+        read_before = self.now - timedelta(days=2)
+        for entry_id, user_id, venue_id, status, position, eta, joined, approved_at, _, seated_at in entries:
+            sent = []
+            if approved_at is not None:
+                sent.append((f"You're in the queue at position {position} (about {eta} min)", "waiting", approved_at))
+            if status == "seated":
+                sent.append(("Your table is ready", "seated", seated_at))
+            elif status == "rejected":
+                sent.append(("Your waitlist request was declined", "rejected", joined + timedelta(minutes=5)))
+            for message, notification_status, sent_at in sent:
+                read = sent_at < read_before and self.rng.random() < 0.9
+                rows.append((self.next_notification_id, user_id, venue_id, message, notification_status, sent_at, read))
+                self.next_notification_id += 1
+        return rows
+
+    def live_queues(self):
+        # Distinct customers per venue, so the one-live-entry index holds
+        rows = []
+        entry_id = self.args.entries + 1
+        window = np.datetime64(self.now - timedelta(hours=1), "s")
+        mean_waiting = self.args.queue_length * self.venue_weights / self.venue_weights.mean()
+
+        for rank, venue_id in enumerate(self.venue_ranks.tolist()):
+            waiting = int(min(self.rng.poisson(mean_waiting[rank]), 200))
+            pending = int(min(self.rng.poisson(mean_waiting[rank] / 4), 50))
+            if not waiting + pending:
+                continue
+            users = self.customer_ranks[self.rng.choice(self.customers, size=min(waiting + pending, self.customers), replace=False)]
+            joined = np.sort(window + self.rng.integers(0, 3600, size=len(users)).astype("timedelta64[s]"))
+            service = int(self.service_times[venue_id])
+
+            for index, (user_id, joined_at) in enumerate(zip(users.tolist(), to_objects(joined)), start=1):
+                if index <= waiting:
+                    approved_at = joined_at + timedelta(minutes=2)
+                    rows.append((entry_id, user_id, venue_id, "waiting", index, (index - 1) * service, joined_at, approved_at, index, None))
+                else:
+                    rows.append((entry_id, user_id, venue_id, "pending", index, None, joined_at, None, None, None))
+                entry_id += 1
+
+            if len(rows) >= self.args.chunk:
+                self.loader.load(WaitlistEntryModel.__table__, ENTRY_COLUMNS, rows)
+                rows = []
+        self.loader.load(WaitlistEntryModel.__table__, ENTRY_COLUMNS, rows)
+        print(f"  live entries: {entry_id - self.args.entries - 1:,}")
+
+
+def hour_of(column, dialect: str):
+    if dialect == "postgresql":
+        return func.date_trunc("hour", column)
+    return func.strftime("%Y-%m-%d %H:00:00.000000", column)
+
+
+def rebuild_derived(engine):
+    entries = all_entries
+    dialect = engine.dialect.name
+
+    # One row per event, then summed per venue and hour
+    def events(column, joins=0, approvals=0, seats=0, cancels=0, rejects=0, where=None):
+        query = select(
+            entries.venue_id.label("venue_id"),
+            hour_of(column, dialect).label("hour"),
+            literal(joins, Integer).label("joins"),
+            literal(approvals, Integer).label("approvals"),
+            literal(seats, Integer).label("seats"),
+            case((entries.status == "cancelled", 1), else_=0).label("cancels") if cancels else literal(0, Integer).label("cancels"),
+            case((entries.status == "rejected", 1), else_=0).label("rejects") if rejects else literal(0, Integer).label("rejects"),
+        )
+        return query.where(where) if where is not None else query
+
+    all_events = union_all(
+        events(entries.timestamp, joins=1, cancels=1, rejects=1),
+        events(entries.approved_at, approvals=1, where=entries.approved_at.is_not(None)),
+        events(entries.seated_at, seats=1, where=entries.seated_at.is_not(None)),
+    ).subquery()
+    rollup = select(
+        all_events.c.venue_id, all_events.c.hour,
+        func.sum(all_events.c.joins), func.sum(all_events.c.approvals), func.sum(all_events.c.seats),
+        func.sum(all_events.c.cancels), func.sum(all_events.c.rejects)
+    ).group_by(all_events.c.venue_id, all_events.c.hour)
+
+    stats = WaitlistHourlyStatsModel.__table__
+    with engine.begin() as conn:
+        conn.execute(insert(stats).from_select(
+            ["venue_id", "hour", "joins", "approvals", "seats", "cancels", "rejects"], rollup
+        ))
+    print("  hourly throughput rolled up")
+
+    db = sessionmaker(bind=engine)()
+    venue_ids = [venue_id for (venue_id,) in db.query(VenueModel.id)]
+    for venue_id, counts in count_queue(db, venue_ids).items():
+        db.merge(VenueQueueStatsModel(venue_id=venue_id, **counts))
+    db.commit()
+    print("  queue counters rebuilt")
+
+    processed = service_time_estimator.recompute_from_history(db)
+    # Through this session: the global one points at DATABASE_URL, not --db
+    service_time_estimator.persist(db)
+    db.close()
+    print(f"  service times learned from {processed:,} seated entries")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recreate the schema and fill it with synthetic data")
+    parser.add_argument("--db", default=db_URI)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--venues", type=int, default=1_000)
+    parser.add_argument("--venues-per-staff", type=int, default=2)
+    parser.add_argument("--entries", type=int, default=1_000_000, help="historical waitlist entries")
+    parser.add_argument("--queue-length", type=float, default=8, help="mean live queue per venue")
+    parser.add_argument("--days", type=int, default=365, help="history window")
+    parser.add_argument("--chunk", type=int, default=50_000, help="rows per generated and loaded chunk")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    engine = create_engine(args.db)
+    loader = Loader(engine)
+    started = time.perf_counter()
+
+    print("Recreating database...")
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    # The fresh schema already has every index; record the migrations as applied
+    run_migrations(engine)
+
+    # Loading into unindexed tables and indexing once is much faster
+    bulk_tables = [WaitlistEntryModel.__table__, WaitlistEntryArchiveModel.__table__, NotificationModel.__table__]
+    with engine.begin() as conn:
+        for table in bulk_tables:
+            for index in table.indexes:
+                index.drop(bind=conn, checkfirst=True)
+
+    print("Generating data...")
+    generator = Generator(args, loader)
+    generator.users()
+    generator.venues()
+    generator.history()
+    generator.live_queues()
+    loader.reset_sequences(
+        [UserModel.__table__, VenueModel.__table__, WaitlistEntryModel.__table__, NotificationModel.__table__],
+        shared={WaitlistEntryModel.__table__: [WaitlistEntryArchiveModel.__table__]}
+    )
+
+    print("Building indexes...")
+    with engine.begin() as conn:
+        for table in bulk_tables:
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
+        if engine.dialect.name == "postgresql":
+            conn.execute(text("ANALYZE"))
+
+    print("Rebuilding derived tables...")
+    rebuild_derived(engine)
+
+    print(f"Synthetic data complete in {time.perf_counter() - started:,.0f}s 👋")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,75 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from controllers.venue import router as venue_router
-from controllers.waitlistEntry import router as waitlist_router
+from config.environment import use_async_db
 from controllers.users import router as user_router
-from controllers.notifications import router as notifications_router
 from controllers.admin import router as admin_router
+from controllers.metrics import router as metrics_router
+from services.passwords import shutdown_executor
+from services.broker import broker
+from services.notification_worker import notification_worker
+from services.throughput import throughput_rollup
+from services.service_time import service_time_estimator
+from services.archive import archive_mover
+from services.recompute import recompute_scheduler
+from services.metrics import MetricsMiddleware
+from services.rate_limit import LoadShedMiddleware
 
-app = FastAPI()
+if use_async_db:
+    from controllers.venue_async import router as venue_router
+    from controllers.waitlistEntry_async import router as waitlist_router
+    from controllers.notifications_async import router as notifications_router
+else:
+    from controllers.venue import router as venue_router
+    from controllers.waitlistEntry import router as waitlist_router
+    from controllers.notifications import router as notifications_router
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    notification_worker.start()
+    throughput_rollup.start()
+    service_time_estimator.start()
+    archive_mover.start()
+    recompute_scheduler.start()
+    yield
+    # Drained first: its renumberings publish and enqueue notifications
+    recompute_scheduler.stop()
+    shutdown_executor()
+    broker.close()
+    notification_worker.stop()
+    throughput_rollup.stop()
+    service_time_estimator.stop()
+    archive_mover.stop()
+
+app = FastAPI(lifespan=lifespan)
 
 origins = [
 'http://127.0.0.1:5173'
 ]
 
+# Sheds before any route work. Added before CORS so it sits inside it and
+# the 503s carry CORS headers the browser will let the client read
+app.add_middleware(LoadShedMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"],
-    allow_headers=["*"]
+    allow_headers=["*"],
+    # Keyset pagination cursor (dependencies/pagination.py)
+    expose_headers=["X-Next-Cursor"]
 )
 
+# Added last so it wraps everything, times the whole request and counts the shed 503s
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(venue_router, prefix="/api")
 app.include_router(waitlist_router, prefix="/api")
 app.include_router(user_router, prefix="/api")
 app.include_router(notifications_router, prefix="/api")
 app.include_router(admin_router, prefix="/api")
+app.include_router(metrics_router)
 
 @app.get('/')
 def home():
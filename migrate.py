@@ -0,0 +1,14 @@
+from database import engine
+from migrations import run_migrations
+
+try:
+    print("Applying migrations...")
+
+    applied = run_migrations(engine)
+
+    for revision in applied:
+        print(f"  applied {revision}")
+    print("Database is up to date 👋")
+
+except Exception as e:
+    print("An error occurred:", e)
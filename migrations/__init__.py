@@ -0,0 +1,47 @@
+# migrations/__init__.py
+#
+# Versioned schema migrations for existing databases.
+# Each module in migrations/versions defines a `revision` string and an
+# `upgrade(conn)` function. Upgrades must be idempotent so they can also run
+# right after seed.py has built the schema with create_all.
+
+import importlib
+import pkgutil
+from sqlalchemy import Column, DateTime, MetaData, String, Table, func, select
+from sqlalchemy.engine import Engine
+from migrations import versions
+
+migration_metadata = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations",
+    migration_metadata,
+    Column("revision", String, primary_key=True),
+    Column("applied_at", DateTime, default=func.now()),
+)
+
+
+def load_migrations():
+    modules = []
+    for module_info in sorted(pkgutil.iter_modules(versions.__path__), key=lambda m: m.name):
+        modules.append(importlib.import_module(f"{versions.__name__}.{module_info.name}"))
+    return modules
+
+
+def run_migrations(engine: Engine):
+    migration_metadata.create_all(bind=engine)
+
+    with engine.connect() as conn:
+        applied = set(conn.execute(select(schema_migrations.c.revision)).scalars())
+
+    newly_applied = []
+    for migration in load_migrations():
+        if migration.revision in applied:
+            continue
+        # One transaction per revision, recorded together with its changes
+        with engine.begin() as conn:
+            migration.upgrade(conn)
+            conn.execute(schema_migrations.insert().values(revision=migration.revision))
+        newly_applied.append(migration.revision)
+
+    return newly_applied
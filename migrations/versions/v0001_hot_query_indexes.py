@@ -0,0 +1,49 @@
+# Composite and partial indexes for the waitlist and notification hot queries.
+# The tables and indexes are snapshotted here as they stood at this revision:
+# indexes added to the models later belong to their own migrations.
+
+from sqlalchemy import Column, DateTime, Index, Integer, MetaData, String, Table, text
+
+revision = "0001_hot_query_indexes"
+
+metadata = MetaData()
+
+waitlist_entries = Table(
+    "waitlist_entries",
+    metadata,
+    Column("user_id", Integer),
+    Column("venue_id", Integer),
+    Column("status", String),
+    Column("position", Integer),
+    Column("timestamp", DateTime),
+)
+
+notifications = Table(
+    "notifications",
+    metadata,
+    Column("user_id", Integer),
+    Column("timestamp", DateTime),
+)
+
+indexes = [
+    Index(
+        "ix_waitlist_entries_venue_status_position",
+        waitlist_entries.c.venue_id, waitlist_entries.c.status, waitlist_entries.c.position
+    ),
+    Index(
+        "ix_waitlist_entries_user_venue_status",
+        waitlist_entries.c.user_id, waitlist_entries.c.venue_id, waitlist_entries.c.status
+    ),
+    Index("ix_waitlist_entries_user_timestamp", waitlist_entries.c.user_id, waitlist_entries.c.timestamp),
+    Index(
+        "ix_waitlist_entries_active_venue_position", waitlist_entries.c.venue_id, waitlist_entries.c.position,
+        postgresql_where=text("status IN ('pending', 'waiting')"),
+        sqlite_where=text("status IN ('pending', 'waiting')")
+    ),
+    Index("ix_notifications_user_timestamp", notifications.c.user_id, notifications.c.timestamp),
+]
+
+
+def upgrade(conn):
+    for index in indexes:
+        index.create(bind=conn, checkfirst=True)
@@ -0,0 +1,27 @@
+# Per-venue waiting/pending counters, backfilled from waitlist_entries
+
+from sqlalchemy import case, func, select
+from models.venue import VenueModel
+from models.venueQueueStats import VenueQueueStatsModel
+from models.waitlistEntry import WaitlistEntryModel
+
+revision = "0002_venue_queue_stats"
+
+
+def upgrade(conn):
+    stats = VenueQueueStatsModel.__table__
+    stats.create(bind=conn, checkfirst=True)
+
+    entries = WaitlistEntryModel.__table__
+    venues = VenueModel.__table__
+    counts = select(
+        venues.c.id,
+        func.count(case((entries.c.status == "waiting", 1))),
+        func.count(case((entries.c.status == "pending", 1)))
+    ).select_from(
+        venues.outerjoin(entries, entries.c.venue_id == venues.c.id)
+    ).where(
+        venues.c.id.not_in(select(stats.c.venue_id))
+    ).group_by(venues.c.id)
+
+    conn.execute(stats.insert().from_select(["venue_id", "waiting_count", "pending_count"], counts))
@@ -0,0 +1,9 @@
+# Hourly per-venue waitlist throughput rollup for the admin dashboard
+
+from models.waitlistHourlyStats import WaitlistHourlyStatsModel
+
+revision = "0003_waitlist_hourly_stats"
+
+
+def upgrade(conn):
+    WaitlistHourlyStatsModel.__table__.create(bind=conn, checkfirst=True)
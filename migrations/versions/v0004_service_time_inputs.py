@@ -0,0 +1,18 @@
+# Approval/seating timestamps on waitlist entries and the learned service time state
+
+from sqlalchemy import inspect, text
+from models.waitlistEntry import WaitlistEntryModel
+from models.venueServiceStats import VenueServiceStatsModel
+
+revision = "0004_service_time_inputs"
+
+
+def upgrade(conn):
+    entries = WaitlistEntryModel.__table__
+    existing = {column["name"] for column in inspect(conn).get_columns(entries.name)}
+    for name in ("approved_at", "approved_position", "seated_at"):
+        if name not in existing:
+            column_type = entries.c[name].type.compile(dialect=conn.dialect)
+            conn.execute(text(f"ALTER TABLE {entries.name} ADD COLUMN {name} {column_type}"))
+
+    VenueServiceStatsModel.__table__.create(bind=conn, checkfirst=True)
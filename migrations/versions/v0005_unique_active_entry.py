@@ -0,0 +1,46 @@
+# One live (pending/waiting) entry per customer and venue, enforced by a partial unique index
+
+from sqlalchemy import Column, Index, Integer, MetaData, String, Table, delete, func, select, text, update
+from models.venueQueueStats import VenueQueueStatsModel
+from models.waitlistEntry import WaitlistEntryModel
+
+revision = "0005_unique_active_entry"
+
+# The index as this revision creates it, snapshotted rather than read off the model
+metadata = MetaData()
+
+waitlist_entries = Table(
+    "waitlist_entries",
+    metadata,
+    Column("user_id", Integer),
+    Column("venue_id", Integer),
+    Column("status", String),
+)
+
+unique_active_entry = Index(
+    "uq_waitlist_entries_active_user_venue", waitlist_entries.c.user_id, waitlist_entries.c.venue_id, unique=True,
+    postgresql_where=text("status IN ('pending', 'waiting')"),
+    sqlite_where=text("status IN ('pending', 'waiting')")
+)
+
+
+def upgrade(conn):
+    entries = WaitlistEntryModel.__table__
+    active = entries.c.status.in_(["pending", "waiting"])
+
+    # Duplicates left by the old unlocked join would block the index: keep each
+    # customer's earliest live entry per venue and cancel the rest
+    keep = select(func.min(entries.c.id)).where(active).group_by(entries.c.user_id, entries.c.venue_id)
+    cancelled = conn.execute(
+        update(entries)
+        .where(active, entries.c.id.not_in(keep))
+        .values(status="cancelled")
+        .returning(entries.c.venue_id)
+    ).scalars().all()
+
+    # Those venues' counters are now off; a missing row is rebuilt on next use
+    if cancelled:
+        stats = VenueQueueStatsModel.__table__
+        conn.execute(delete(stats).where(stats.c.venue_id.in_(set(cancelled))))
+
+    unique_active_entry.create(bind=conn, checkfirst=True)
@@ -0,0 +1,9 @@
+# Version counters for the in-process caches (services/venue_catalog.py)
+
+from models.cacheVersion import CacheVersionModel
+
+revision = "0006_cache_versions"
+
+
+def upgrade(conn):
+    CacheVersionModel.__table__.create(bind=conn, checkfirst=True)
@@ -0,0 +1,14 @@
+# History store for terminal waitlist entries. Existing rows are moved by the
+# background archive mover (services/archive.py), not here, so the upgrade
+# stays quick however much history there is.
+
+# create() resolves the foreign keys, so the tables they point at must be
+# registered too; migrate.py imports nothing else from models
+import models.user, models.venue
+from models.waitlistEntryArchive import WaitlistEntryArchiveModel
+
+revision = "0007_waitlist_archive"
+
+
+def upgrade(conn):
+    WaitlistEntryArchiveModel.__table__.create(bind=conn, checkfirst=True)
@@ -0,0 +1,26 @@
+# Partial index over unread notifications, behind the unread count and bulk mark-read
+
+from sqlalchemy import Boolean, Column, Index, Integer, MetaData, Table, text
+
+revision = "0008_unread_notifications_index"
+
+# The index as this revision creates it, snapshotted rather than read off the model
+metadata = MetaData()
+
+notifications = Table(
+    "notifications",
+    metadata,
+    Column("id", Integer),
+    Column("user_id", Integer),
+    Column("read", Boolean),
+)
+
+unread_notifications = Index(
+    "ix_notifications_unread_user", notifications.c.user_id, notifications.c.id,
+    postgresql_where=text("NOT read"),
+    sqlite_where=text("read = 0")
+)
+
+
+def upgrade(conn):
+    unread_notifications.create(bind=conn, checkfirst=True)
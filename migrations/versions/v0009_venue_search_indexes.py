@@ -0,0 +1,15 @@
+# Trigram indexes behind GET /venue/search on Postgres. They live only here,
+# not on VenueModel, because create_all would run before the extension exists.
+# Other databases search the in-process index (services/venue_search.py).
+
+from sqlalchemy import text
+
+revision = "0009_venue_search_indexes"
+
+
+def upgrade(conn):
+    if conn.dialect.name != "postgresql":
+        return
+    conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_venues_name_trgm ON venues USING gin (lower(name) gin_trgm_ops)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_venues_location_trgm ON venues USING gin (lower(location) gin_trgm_ops)"))
@@ -0,0 +1,9 @@
+# Shared token buckets for the database rate-limit backend (services/rate_limit.py)
+
+from models.rateLimitBucket import RateLimitBucketModel
+
+revision = "0010_rate_limit_buckets"
+
+
+def upgrade(conn):
+    RateLimitBucketModel.__table__.create(bind=conn, checkfirst=True)
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from .base import Base
+
+class CacheVersionModel(Base):
+    # Version counters for in-process caches. Writers bump a row in the same
+    # transaction as the change; each worker compares it with the version it
+    # has cached to find out whether it is stale.
+
+    __tablename__ = "cache_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime)
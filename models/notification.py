@@ -1,9 +1,21 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, func, Boolean
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index, func, Boolean, text
+from sqlalchemy.orm import synonym
 from .base import Base
 
 class NotificationModel(Base):
 
     __tablename__ = "notifications"
+    __table_args__ = (
+        # A user's notifications, newest first
+        Index("ix_notifications_user_timestamp", "user_id", "timestamp"),
+        # Unread badge count and bulk mark-read only touch unread rows; the
+        # predicates match how ~NotificationModel.read compiles on each dialect
+        Index(
+            "ix_notifications_unread_user", "user_id", "id",
+            postgresql_where=text("NOT read"),
+            sqlite_where=text("read = 0")
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -12,3 +24,6 @@ class NotificationModel(Base):
     status = Column(String, nullable=False)  # status update from waitlist entry
     timestamp = Column(DateTime, default=func.now())
     read = Column(Boolean, default=False)
+
+    # The API exposes the notification time as created_at
+    created_at = synonym("timestamp")
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, Float, Boolean
+from .base import Base
+
+class RateLimitBucketModel(Base):
+    # Token buckets shared by every worker when RATE_LIMIT_BACKEND=database
+    # (services/rate_limit.py). refilled_at is epoch seconds so the refill is
+    # plain arithmetic on every dialect.
+
+    __tablename__ = "rate_limit_buckets"
+
+    key = Column(String, primary_key=True)
+    tokens = Column(Float, nullable=False)
+    refilled_at = Column(Float, nullable=False)
+    allowed = Column(Boolean, nullable=False, default=True)  # outcome of the last take
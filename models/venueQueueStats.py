@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, func
+from .base import Base
+
+class VenueQueueStatsModel(Base):
+    # Live queue sizes per venue, kept in step with waitlist_entries by the
+    # transition handlers inside their own transactions
+
+    __tablename__ = "venue_queue_stats"
+
+    venue_id = Column(Integer, ForeignKey("venues.id", ondelete="CASCADE"), primary_key=True)
+    waiting_count = Column(Integer, nullable=False, default=0)
+    pending_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
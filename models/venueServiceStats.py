@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime
+from .base import Base
+
+class VenueServiceStatsModel(Base):
+    # Persisted state of the learned per-venue service time (services/service_time.py)
+
+    __tablename__ = "venue_service_stats"
+
+    venue_id = Column(Integer, ForeignKey("venues.id", ondelete="CASCADE"), primary_key=True)
+    weighted_sum = Column(Float, nullable=False, default=0.0)
+    weight_total = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime, nullable=False)  # time the decayed sums refer to, UTC
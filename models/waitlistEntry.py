@@ -1,10 +1,30 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, func
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index, func, text
 from sqlalchemy.orm import relationship
 from .base import Base
 
 class WaitlistEntryModel(Base):
 
     __tablename__ = "waitlist_entries"
+    __table_args__ = (
+        # Venue queue views: filter on (venue_id, status), ordered by position
+        Index("ix_waitlist_entries_venue_status_position", "venue_id", "status", "position"),
+        # Duplicate check in join_waitlist
+        Index("ix_waitlist_entries_user_venue_status", "user_id", "venue_id", "status"),
+        # Customer history, newest first
+        Index("ix_waitlist_entries_user_timestamp", "user_id", "timestamp"),
+        # Live queues only, stays small however much history piles up
+        Index(
+            "ix_waitlist_entries_active_venue_position", "venue_id", "position",
+            postgresql_where=text("status IN ('pending', 'waiting')"),
+            sqlite_where=text("status IN ('pending', 'waiting')")
+        ),
+        # At most one live entry per customer and venue
+        Index(
+            "uq_waitlist_entries_active_user_venue", "user_id", "venue_id", unique=True,
+            postgresql_where=text("status IN ('pending', 'waiting')"),
+            sqlite_where=text("status IN ('pending', 'waiting')")
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -13,5 +33,9 @@ class WaitlistEntryModel(Base):
     position = Column(Integer, nullable=False)
     estimated_wait_time = Column(Integer, nullable=True)
     timestamp = Column(DateTime, default=func.now())
+    # Inputs of the learned service time (services/service_time.py)
+    approved_at = Column(DateTime, nullable=True)
+    approved_position = Column(Integer, nullable=True)
+    seated_at = Column(DateTime, nullable=True)
 
-    user = relationship("UserModel")
\ No newline at end of file
+    user = relationship("UserModel")
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index, func
+from .base import Base
+
+class WaitlistEntryArchiveModel(Base):
+    # Seated, cancelled and rejected entries moved out of waitlist_entries by
+    # services/archive.py. Same columns and ids as the hot table, so reads can
+    # union the two (see services.archive.all_entries).
+
+    __tablename__ = "waitlist_entries_archive"
+    __table_args__ = (
+        # Customer history, newest first
+        Index("ix_waitlist_entries_archive_user_timestamp", "user_id", "timestamp"),
+        # Venue history pages, keyed on id
+        Index("ix_waitlist_entries_archive_venue_id", "venue_id", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    venue_id = Column(Integer, ForeignKey("venues.id"), nullable=False)
+    status = Column(String, nullable=False)
+    position = Column(Integer, nullable=False)
+    estimated_wait_time = Column(Integer, nullable=True)
+    timestamp = Column(DateTime)
+    approved_at = Column(DateTime, nullable=True)
+    approved_position = Column(Integer, nullable=True)
+    seated_at = Column(DateTime, nullable=True)
+    archived_at = Column(DateTime, server_default=func.now())
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from .base import Base
+
+class WaitlistHourlyStatsModel(Base):
+    # Per-venue waitlist throughput rolled up by hour (services/throughput.py),
+    # so the admin dashboard never has to scan waitlist_entries
+
+    __tablename__ = "waitlist_hourly_stats"
+
+    venue_id = Column(Integer, ForeignKey("venues.id", ondelete="CASCADE"), primary_key=True)
+    hour = Column(DateTime, primary_key=True)  # start of the hour, UTC
+    joins = Column(Integer, nullable=False, default=0)
+    approvals = Column(Integer, nullable=False, default=0)
+    seats = Column(Integer, nullable=False, default=0)
+    cancels = Column(Integer, nullable=False, default=0)
+    rejects = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,15 @@
+from database import SessionLocal
+from services.service_time import service_time_estimator
+
+try:
+    print("Recomputing service times from history...")
+
+    db = SessionLocal()
+    processed = service_time_estimator.recompute_from_history(db)
+    db.close()
+
+    service_time_estimator.persist()
+    print(f"Processed {processed} seated entries for {service_time_estimator.stats()['venues']} venues 👋")
+
+except Exception as e:
+    print("An error occurred:", e)
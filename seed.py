@@ -1,9 +1,12 @@
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy import create_engine
 from models.base import Base
+# Register every table so drop_all/create_all cover the whole schema
+import models.waitlistEntry, models.notification, models.venueQueueStats, models.waitlistHourlyStats, models.venueServiceStats, models.cacheVersion, models.waitlistEntryArchive, models.rateLimitBucket
 from data.user_data import user_list
 from data.venue_data import venue_list
 from config.environment import db_URI
+from migrations import run_migrations
 
 engine = create_engine(db_URI)
 SessionLocal = sessionmaker(bind=engine)
@@ -13,6 +16,8 @@ try:
 
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
+    # The fresh schema already has every index; record the migrations as applied
+    run_migrations(engine)
 
     print("Seeding database...")
     db: Session = SessionLocal()
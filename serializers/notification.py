@@ -1,5 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 from datetime import datetime
+from typing import List, Optional
 
 class NotificationSchema(BaseModel):
     id: int
@@ -19,4 +20,22 @@ class NotificationResponseSchema(BaseModel):
     read: bool
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class NotificationUnreadCountSchema(BaseModel):
+    unread: int
+    capped: bool  # there are more than `unread` unread notifications
+
+class NotificationMarkReadSchema(BaseModel):
+    # Neither set marks every notification read
+    up_to_id: Optional[int] = None
+    ids: Optional[List[int]] = Field(None, min_length=1, max_length=500)
+
+    @model_validator(mode="after")
+    def one_selector(self):
+        if self.up_to_id is not None and self.ids is not None:
+            raise ValueError("Give either up_to_id or ids, not both")
+        return self
+
+class NotificationMarkReadResultSchema(BaseModel):
+    updated: int
@@ -12,6 +12,9 @@ class VenueSchema(BaseModel):
     class Config:
         orm_mode = True
 
+class VenueSearchResultSchema(VenueSchema):
+    waiting_count: int = 0
+
 class VenueCreateSchema(BaseModel):
     name: str
     location: str
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Literal, Optional
 
 class WaitlistEntrySchema(BaseModel):
     venue_id: int  # customer sends only venue_id
@@ -36,3 +36,19 @@ class StaffWaitlistEntrySchema(BaseModel):
     class Config:
         orm_mode = True
 
+class WaitlistBatchActionSchema(BaseModel):
+    entry_id: int
+    action: Literal["approve", "seat", "reject"]
+
+class WaitlistBatchSchema(BaseModel):
+    actions: List[WaitlistBatchActionSchema] = Field(..., min_length=1, max_length=500)
+
+class WaitlistBatchResultSchema(BaseModel):
+    entry_id: int
+    action: str
+    ok: bool
+    detail: Optional[str] = None  # why the action was not applied
+    entry: Optional[WaitlistEntryResponseSchema] = None
+
+    class Config:
+        orm_mode = True
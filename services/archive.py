@@ -0,0 +1,128 @@
+# services/archive.py
+#
+# Hot/cold split for waitlist entries. waitlist_entries keeps the live queues
+# plus recently finished rows; a background mover copies seated, cancelled
+# and rejected entries older than ARCHIVE_AFTER_MINUTES into
+# waitlist_entries_archive and deletes them from the hot table, in chunks of
+# ARCHIVE_CHUNK_SIZE, each in its own transaction.
+#
+# Reads that span history use all_entries, WaitlistEntryModel mapped onto a
+# UNION ALL of both tables; filters and keyset ordering push down into each
+# branch's indexes.
+
+import os
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import delete, func, insert, select, union_all
+from sqlalchemy.orm import aliased
+from database import SessionLocal
+# aliased() below configures the mappers, so every related model must be registered first
+import models.user, models.venue
+from models.waitlistEntry import WaitlistEntryModel
+from models.waitlistEntryArchive import WaitlistEntryArchiveModel
+
+TERMINAL_STATUSES = ["seated", "cancelled", "rejected"]
+
+hot = WaitlistEntryModel.__table__
+archive = WaitlistEntryArchiveModel.__table__
+ENTRY_COLUMNS = [column.name for column in hot.columns]
+
+all_entries = aliased(
+    WaitlistEntryModel,
+    union_all(
+        select(*[hot.c[name] for name in ENTRY_COLUMNS]),
+        select(*[archive.c[name] for name in ENTRY_COLUMNS])
+    ).subquery("waitlist_entries_all"),
+    name="all_entries"
+)
+
+
+class ArchiveMover:
+
+    def __init__(self, interval: float, after_minutes: float, chunk_size: int):
+        self.interval = interval
+        self.after_minutes = after_minutes
+        self.chunk_size = chunk_size
+        self._stopping = threading.Event()
+        self._thread = None
+
+        self.moved = 0
+        self.runs = 0
+        self.failed_runs = 0
+        self.last_run_rows = 0
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="archive-mover", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stopping.wait(self.interval):
+            self.run()
+
+    def run(self) -> int:
+        # Moves chunks until nothing old enough is left (or the app stops)
+        moved = 0
+        try:
+            while not self._stopping.is_set():
+                chunk = self.move_chunk()
+                moved += chunk
+                if chunk < self.chunk_size:
+                    break
+            self.runs += 1
+        except Exception:
+            self.failed_runs += 1
+        self.last_run_rows = moved
+        return moved
+
+    def move_chunk(self) -> int:
+        # Finished rows are never written again, so copy-then-delete is safe;
+        # SKIP LOCKED keeps several workers from picking the same chunk
+        cutoff = datetime.utcnow() - timedelta(minutes=self.after_minutes)
+        db = SessionLocal()
+        try:
+            ids = db.execute(
+                select(hot.c.id).where(
+                    hot.c.status.in_(TERMINAL_STATUSES),
+                    func.coalesce(hot.c.seated_at, hot.c.timestamp) < cutoff,
+                    # SQLite hands out max(id) + 1, so the newest row stays to keep ids from repeating
+                    hot.c.id < select(func.max(hot.c.id)).scalar_subquery()
+                ).order_by(hot.c.id).limit(self.chunk_size).with_for_update(skip_locked=True)
+            ).scalars().all()
+            if not ids:
+                return 0
+
+            db.execute(insert(archive).from_select(
+                ENTRY_COLUMNS, select(*[hot.c[name] for name in ENTRY_COLUMNS]).where(hot.c.id.in_(ids))
+            ))
+            db.execute(delete(hot).where(hot.c.id.in_(ids)))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        self.moved += len(ids)
+        return len(ids)
+
+    def stats(self) -> dict:
+        return {
+            "moved": self.moved,
+            "runs": self.runs,
+            "failed_runs": self.failed_runs,
+            "last_run_rows": self.last_run_rows,
+        }
+
+
+archive_mover = ArchiveMover(
+    interval=float(os.getenv("ARCHIVE_INTERVAL", "300")),
+    after_minutes=float(os.getenv("ARCHIVE_AFTER_MINUTES", "60")),
+    chunk_size=int(os.getenv("ARCHIVE_CHUNK_SIZE", "5000"))
+)
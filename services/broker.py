@@ -0,0 +1,187 @@
+# services/broker.py
+#
+# Per-venue pub/sub for live queue updates. The waitlist transition handlers
+# publish position/ETA deltas after they commit; the SSE endpoint in
+# controllers/waitlistEntry.py subscribes to a venue's channel.
+#
+# Broker is the adapter interface. InProcessBroker fans messages out to the
+# subscribers of this worker only. PostgresNotifyBroker relays them through
+# Postgres LISTEN/NOTIFY so every worker's subscribers see every update.
+# QUEUE_BROKER selects the implementation ("inprocess" or "postgres").
+
+import asyncio
+import json
+import logging
+import os
+import queue
+import select
+import threading
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from typing import Dict, Set, Tuple
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from config.environment import db_URI
+from database import engine
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+def venue_channel(venue_id: int) -> str:
+    return f"venue_{venue_id}"
+
+
+class Broker(ABC):
+
+    @abstractmethod
+    def publish(self, channel: str, message: dict):
+        # Safe to call from any thread, including threadpool request handlers
+        ...
+
+    @abstractmethod
+    def subscribe(self, channel: str):
+        # Async context manager yielding an asyncio.Queue of messages
+        ...
+
+    def close(self):
+        pass
+
+
+class InProcessBroker(Broker):
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._lock = threading.Lock()
+        self.published = 0
+        self.dropped = 0
+
+    def publish(self, channel: str, message: dict):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        self.published += 1
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(self._offer, queue, message)
+
+    def _offer(self, queue: asyncio.Queue, message: dict):
+        # A slow subscriber loses its oldest update rather than holding up the publisher
+        if queue.full():
+            queue.get_nowait()
+            self.dropped += 1
+        queue.put_nowait(message)
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str):
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE))
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscriber)
+        try:
+            yield subscriber[1]
+        finally:
+            with self._lock:
+                channel_subscribers = self._subscribers.get(channel)
+                if channel_subscribers is not None:
+                    channel_subscribers.discard(subscriber)
+                    if not channel_subscribers:
+                        del self._subscribers[channel]
+
+    def stats(self) -> dict:
+        with self._lock:
+            subscribers = sum(len(s) for s in self._subscribers.values())
+        return {"subscribers": subscribers, "published": self.published, "dropped": self.dropped}
+
+
+class PostgresNotifyBroker(InProcessBroker):
+    # Messages go out with pg_notify and come back to every worker, including
+    # this one, through a listener thread, which hands them to the local subscribers.
+
+    NOTIFY_CHANNEL = "queue_updates"
+    # NOTIFY payloads are capped at 8000 bytes, so large deltas are split
+    ENTRIES_PER_NOTIFY = 50
+    # Messages waiting for the sender thread before new ones are dropped
+    OUTBOX_SIZE = 1000
+
+    def __init__(self, uri: str = db_URI):
+        super().__init__()
+        self._engine = engine
+        # psycopg2 takes a libpq DSN, not SQLAlchemy's postgresql+psycopg2:// form
+        self._dsn = make_url(uri).set(drivername="postgresql").render_as_string(hide_password=False)
+        self._stopping = threading.Event()
+        self._outbox: "queue.Queue[Tuple[str, dict]]" = queue.Queue(maxsize=self.OUTBOX_SIZE)
+        self.send_failed = 0
+        self._sender = threading.Thread(target=self._send, name="queue-broker-sender", daemon=True)
+        self._sender.start()
+        self._listener = threading.Thread(target=self._listen, name="queue-broker-listener", daemon=True)
+        self._listener.start()
+
+    def publish(self, channel: str, message: dict):
+        # Publishers run after their commit, in async mode on the event loop
+        # itself, so the NOTIFY transaction is left to the sender thread
+        try:
+            self._outbox.put_nowait((channel, message))
+        except queue.Full:
+            self.dropped += 1
+
+    def _send(self):
+        # One thread, so messages reach Postgres in the order they were published
+        while not (self._stopping.is_set() and self._outbox.empty()):
+            try:
+                channel, message = self._outbox.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            try:
+                self._notify(channel, message)
+            except Exception:
+                self.send_failed += 1
+                logger.exception("Failed to publish a queue update on %s", channel)
+
+    def _notify(self, channel: str, message: dict):
+        entries = message.get("entries") or [None]
+        with self._engine.begin() as conn:
+            for start in range(0, len(entries), self.ENTRIES_PER_NOTIFY):
+                part = dict(message)
+                if message.get("entries"):
+                    part["entries"] = entries[start:start + self.ENTRIES_PER_NOTIFY]
+                payload = json.dumps({"channel": channel, "message": part}, default=str)
+                conn.execute(text("SELECT pg_notify(:channel, :payload)"),
+                             {"channel": self.NOTIFY_CHANNEL, "payload": payload})
+
+    def _listen(self):
+        import psycopg2
+
+        while not self._stopping.is_set():
+            try:
+                conn = psycopg2.connect(self._dsn)
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    cursor.execute(f"LISTEN {self.NOTIFY_CHANNEL}")
+                while not self._stopping.is_set():
+                    if select.select([conn], [], [], 1.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        data = json.loads(notify.payload)
+                        InProcessBroker.publish(self, data["channel"], data["message"])
+                conn.close()
+            except Exception:
+                # Reconnect after a dropped connection
+                self._stopping.wait(1.0)
+
+    def stats(self) -> dict:
+        return {**super().stats(), "outbox": self._outbox.qsize(), "send_failed": self.send_failed}
+
+    def close(self):
+        # The sender drains what is already queued before it exits
+        self._stopping.set()
+        self._sender.join(timeout=5)
+
+
+def create_broker(kind: str) -> Broker:
+    if kind == "postgres":
+        return PostgresNotifyBroker()
+    return InProcessBroker()
+
+
+broker = create_broker(os.getenv("QUEUE_BROKER", "inprocess"))
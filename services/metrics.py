@@ -0,0 +1,232 @@
+# services/metrics.py
+#
+# Request and database metrics, rendered in the Prometheus text format.
+# MetricsMiddleware times every HTTP request under its route template and
+# opens a RequestStats in a context variable; the engine listeners installed
+# by database.py add each SQL statement and its duration to it. Requests over
+# SLOW_REQUEST_MS or SLOW_REQUEST_QUERIES are logged with their SQL.
+#
+# Statements run outside a request (background workers, scripts) only count
+# towards the process-wide totals.
+
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, Optional
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Statements kept per request for the slow-request log
+MAX_LOGGED_STATEMENTS = 100
+
+
+class RequestStats:
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.sql = []
+
+    def record(self, statement: str, seconds: float):
+        self.statements += 1
+        self.db_seconds += seconds
+        if len(self.sql) < MAX_LOGGED_STATEMENTS:
+            self.sql.append((statement, seconds))
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+class Histogram:
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _labels(**labels) -> str:
+    def escape(value) -> str:
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{key}="{escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class RequestMetrics:
+
+    def __init__(self, slow_ms: float, slow_queries: int):
+        self.slow_ms = slow_ms
+        self.slow_queries = slow_queries
+        self._lock = threading.Lock()
+        self._latency: Dict[tuple, Histogram] = {}
+        self._responses: Dict[tuple, int] = {}
+        self._route_statements: Dict[tuple, int] = {}
+        self._route_db_seconds: Dict[tuple, float] = {}
+        self._sources: Dict[str, tuple] = {}
+
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.slow_requests = 0
+
+    def record_statement(self, statement: str, seconds: float):
+        with self._lock:
+            self.statements += 1
+            self.db_seconds += seconds
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.record(statement, seconds)
+
+    def observe(self, method: str, route: str, status: int, seconds: float, stats: RequestStats):
+        key = (method, route)
+        with self._lock:
+            histogram = self._latency.get(key)
+            if histogram is None:
+                histogram = self._latency[key] = Histogram()
+            histogram.observe(seconds)
+            self._responses[key + (status,)] = self._responses.get(key + (status,), 0) + 1
+            self._route_statements[key] = self._route_statements.get(key, 0) + stats.statements
+            self._route_db_seconds[key] = self._route_db_seconds.get(key, 0.0) + stats.db_seconds
+
+        elapsed_ms = seconds * 1000
+        if elapsed_ms > self.slow_ms or stats.statements > self.slow_queries:
+            self.slow_requests += 1
+            sql = "\n".join(f"  [{s * 1000:.1f} ms] {statement}" for statement, s in stats.sql)
+            logger.warning(
+                "Slow request %s %s: %.1f ms, %d statements, %.1f ms in the database\n%s",
+                method, route, elapsed_ms, stats.statements, stats.db_seconds * 1000, sql
+            )
+
+    def register_source(self, name: str, stats: Callable[[], dict], counters: Iterable[str] = ()):
+        # Numeric values from stats() are exported as queuemate_<name>_<key>
+        # gauges, except the cumulative keys listed in counters, which become
+        # queuemate_<name>_<key>_total counters
+        self._sources[name] = (stats, frozenset(counters))
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            latency = {key: (list(h.counts), h.sum, h.count) for key, h in self._latency.items()}
+            responses = dict(self._responses)
+            route_statements = dict(self._route_statements)
+            route_db_seconds = dict(self._route_db_seconds)
+            statements, db_seconds = self.statements, self.db_seconds
+
+        lines.append("# HELP queuemate_http_request_duration_seconds Request latency by route template.")
+        lines.append("# TYPE queuemate_http_request_duration_seconds histogram")
+        for (method, route), (counts, total, count) in sorted(latency.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(LATENCY_BUCKETS + ("+Inf",), counts):
+                cumulative += bucket_count
+                labels = _labels(method=method, route=route, le=bound)
+                lines.append(f"queuemate_http_request_duration_seconds_bucket{labels} {cumulative}")
+            labels = _labels(method=method, route=route)
+            lines.append(f"queuemate_http_request_duration_seconds_sum{labels} {total}")
+            lines.append(f"queuemate_http_request_duration_seconds_count{labels} {count}")
+
+        lines.append("# HELP queuemate_http_responses_total Responses by route template and status code.")
+        lines.append("# TYPE queuemate_http_responses_total counter")
+        for (method, route, status), count in sorted(responses.items()):
+            lines.append(f"queuemate_http_responses_total{_labels(method=method, route=route, status=status)} {count}")
+
+        lines.append("# HELP queuemate_http_db_statements_total SQL statements issued while serving each route.")
+        lines.append("# TYPE queuemate_http_db_statements_total counter")
+        for (method, route), count in sorted(route_statements.items()):
+            lines.append(f"queuemate_http_db_statements_total{_labels(method=method, route=route)} {count}")
+
+        lines.append("# HELP queuemate_http_db_seconds_total Time spent in SQL while serving each route.")
+        lines.append("# TYPE queuemate_http_db_seconds_total counter")
+        for (method, route), seconds in sorted(route_db_seconds.items()):
+            lines.append(f"queuemate_http_db_seconds_total{_labels(method=method, route=route)} {seconds}")
+
+        lines.append("# TYPE queuemate_db_statements_total counter")
+        lines.append(f"queuemate_db_statements_total {statements}")
+        lines.append("# TYPE queuemate_db_seconds_total counter")
+        lines.append(f"queuemate_db_seconds_total {db_seconds}")
+        lines.append("# TYPE queuemate_slow_requests_total counter")
+        lines.append(f"queuemate_slow_requests_total {self.slow_requests}")
+
+        for name, (stats, counters) in sorted(self._sources.items()):
+            for key, value in stats().items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    if key in counters:
+                        lines.append(f"# TYPE queuemate_{name}_{key}_total counter")
+                        lines.append(f"queuemate_{name}_{key}_total {value}")
+                    else:
+                        lines.append(f"# TYPE queuemate_{name}_{key} gauge")
+                        lines.append(f"queuemate_{name}_{key} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+request_metrics = RequestMetrics(
+    slow_ms=float(os.getenv("SLOW_REQUEST_MS", "1000")),
+    slow_queries=int(os.getenv("SLOW_REQUEST_QUERIES", "50"))
+)
+
+
+def instrument_engine(engine):
+    # Called from database.py for the sync engine and the async engine's sync_engine
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append((context, time.perf_counter()))
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _finish(conn, cursor, statement, parameters, context, executemany):
+        _, started = conn.info["query_start"].pop()
+        request_metrics.record_statement(statement, time.perf_counter() - started)
+
+    @event.listens_for(engine, "handle_error")
+    def _failed(context):
+        # A failed statement never reaches after_cursor_execute; without this
+        # its start time would stay on the stack and skew the next timing.
+        # Errors raised before the cursor ran never pushed one.
+        conn = context.connection
+        pending = conn.info.get("query_start") if conn is not None else None
+        if pending and context.execution_context is not None and pending[-1][0] is context.execution_context:
+            _, started = pending.pop()
+            request_metrics.record_statement(context.statement, time.perf_counter() - started)
+
+
+class MetricsMiddleware:
+    # Plain ASGI so streamed bodies (NDJSON exports) are timed to the last chunk
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status = 500
+        event_stream = False
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status, event_stream
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = dict(message.get("headers") or [])
+                event_stream = headers.get(b"content-type", b"").startswith(b"text/event-stream")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _request_stats.reset(token)
+            # SSE connections stay open for minutes and would swamp the histogram
+            if not event_stream:
+                route = getattr(scope.get("route"), "path", None) or "unmatched"
+                request_metrics.observe(scope["method"], route, status, time.perf_counter() - start, stats)
@@ -0,0 +1,156 @@
+# services/notification_worker.py
+#
+# Asynchronous notification stage. Waitlist transitions enqueue events here
+# instead of inserting notifications inline; a background thread coalesces
+# them per (user, venue), keeping only the latest update, and writes each
+# batch with a single multi-row INSERT.
+#
+# Backpressure: the queue is bounded. When it is full, enqueue drops the event
+# straight away, counting it in `dropped`: callers include async handlers on
+# the event loop, which must never wait on a queue.
+#
+# A batch whose INSERT fails is retried NOTIFICATION_FLUSH_RETRIES times,
+# waiting NOTIFICATION_RETRY_BACKOFF seconds and doubling that each time;
+# only then is it discarded, counting its notifications in `discarded`.
+
+import logging
+import os
+import queue
+import threading
+import time
+from sqlalchemy import insert
+from database import SessionLocal
+from models.notification import NotificationModel
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationWorker:
+
+    def __init__(self, batch_size: int, flush_interval: float, max_queue: int, retries: int = 3, retry_backoff: float = 0.5):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stopping = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+        self.enqueued = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.written = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.retried = 0
+        self.discarded = 0
+        self.last_batch_size = 0
+        self.last_flush_ms = 0.0
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="notification-worker", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def enqueue(self, user_id: int, venue_id: int, status: str, message: str):
+        self.start()
+        try:
+            self._queue.put_nowait((user_id, venue_id, status, message))
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while not (self._stopping.is_set() and self._queue.empty()):
+            batch = self._collect()
+            if batch:
+                self._flush(batch)
+
+    def _collect(self) -> dict:
+        # Gather events until the batch is full or the flush interval runs out
+        pending = {}
+        deadline = time.monotonic() + self.flush_interval
+        while len(pending) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                user_id, venue_id, status, message = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if (user_id, venue_id) in pending:
+                self.coalesced += 1
+            pending[(user_id, venue_id)] = {
+                "user_id": user_id,
+                "venue_id": venue_id,
+                "status": status,
+                "message": message,
+                "read": False
+            }
+        return pending
+
+    def _flush(self, batch: dict):
+        start = time.perf_counter()
+        rows = list(batch.values())
+        delay = self.retry_backoff
+        for attempt in range(self.retries + 1):
+            if self._write(rows):
+                self.written += len(rows)
+                self.batches += 1
+                self.last_batch_size = len(rows)
+                break
+            if attempt == self.retries:
+                self.failed_batches += 1
+                self.discarded += len(rows)
+                logger.error("Discarded a batch of %d notifications after %d attempts", len(rows), attempt + 1)
+                break
+            # A shutdown cuts the waits short, not the retries
+            self.retried += 1
+            self._stopping.wait(delay)
+            delay *= 2
+        self.last_flush_ms = (time.perf_counter() - start) * 1000
+
+    def _write(self, rows: list) -> bool:
+        db = SessionLocal()
+        try:
+            db.execute(insert(NotificationModel), rows)
+            db.commit()
+            return True
+        except Exception:
+            db.rollback()
+            logger.exception("Notification batch of %d failed to write", len(rows))
+            return False
+        finally:
+            db.close()
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self._queue.qsize(),
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "written": self.written,
+            "batches": self.batches,
+            "failed_batches": self.failed_batches,
+            "retried": self.retried,
+            "discarded": self.discarded,
+            "last_batch_size": self.last_batch_size,
+            "last_flush_ms": self.last_flush_ms,
+        }
+
+
+notification_worker = NotificationWorker(
+    batch_size=int(os.getenv("NOTIFICATION_BATCH_SIZE", "500")),
+    flush_interval=float(os.getenv("NOTIFICATION_FLUSH_INTERVAL", "1.0")),
+    max_queue=int(os.getenv("NOTIFICATION_QUEUE_SIZE", "10000")),
+    retries=int(os.getenv("NOTIFICATION_FLUSH_RETRIES", "3")),
+    retry_backoff=float(os.getenv("NOTIFICATION_RETRY_BACKOFF", "0.5"))
+)
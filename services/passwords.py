@@ -0,0 +1,113 @@
+# services/passwords.py
+#
+# bcrypt hashing and verification on a dedicated process pool, so a login
+# burst uses spare cores instead of the request threadpool. Each auth route
+# goes through its own AdmissionLimit: at most `concurrency` requests hash at
+# once, up to `max_queue` wait for a slot, and the rest get a 503 straight away.
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import HTTPException, status
+from models.user import pwd_context
+
+hash_workers = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 2)))
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify(password: str, password_hash: str) -> bool:
+    return pwd_context.verify(password, password_hash)
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # Never fork: by now the background workers' threads (and their locks)
+        # are running, and a forked child can inherit a lock held mid-operation
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        _executor = ProcessPoolExecutor(max_workers=hash_workers, mp_context=multiprocessing.get_context(method))
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def hash_password(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), _hash, password)
+
+
+async def verify_password(password: str, password_hash: Optional[str]) -> bool:
+    if not password_hash:
+        return False
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), _verify, password, password_hash)
+
+
+class AdmissionLimit:
+
+    def __init__(self, name: str, concurrency: int, max_queue: int, retry_after: int = 1):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    @asynccontextmanager
+    async def admit(self):
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                                detail="Too many authentication requests, try again shortly",
+                                headers={"Retry-After": str(self.retry_after)})
+
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        self.admitted += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "queue_depth": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
+
+
+login_admission = AdmissionLimit(
+    "login",
+    concurrency=int(os.getenv("LOGIN_CONCURRENCY", str(hash_workers * 2))),
+    max_queue=int(os.getenv("LOGIN_QUEUE_LIMIT", "100"))
+)
+
+registration_admission = AdmissionLimit(
+    "registration",
+    concurrency=int(os.getenv("REGISTRATION_CONCURRENCY", str(hash_workers))),
+    max_queue=int(os.getenv("REGISTRATION_QUEUE_LIMIT", "50"))
+)
@@ -0,0 +1,93 @@
+# services/queue_counts.py
+#
+# Helpers for the per-venue counters in venue_queue_stats. Adjustments are
+# relative UPDATEs inside the caller's transaction, so they commit or roll
+# back together with the transition. A missing row is rebuilt with one COUNT.
+#
+# The row doubles as the venue's queue lock: lock_venue_queue writes to it,
+# which holds the row lock (the database write lock on SQLite) until commit,
+# so position allocation and renumbering for one venue run one transaction at
+# a time while other venues proceed in parallel.
+
+from typing import Dict, List
+from sqlalchemy import case, func, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from models.venueQueueStats import VenueQueueStatsModel
+from models.waitlistEntry import WaitlistEntryModel
+
+
+def count_queue(db: Session, venue_ids: List[int]) -> Dict[int, dict]:
+    rows = db.query(
+        WaitlistEntryModel.venue_id,
+        func.count(case((WaitlistEntryModel.status == "waiting", 1))),
+        func.count(case((WaitlistEntryModel.status == "pending", 1)))
+    ).filter(
+        WaitlistEntryModel.venue_id.in_(venue_ids),
+        WaitlistEntryModel.status.in_(["pending", "waiting"])
+    ).group_by(WaitlistEntryModel.venue_id).all()
+
+    counts = {venue_id: {"waiting_count": 0, "pending_count": 0} for venue_id in venue_ids}
+    for venue_id, waiting, pending in rows:
+        counts[venue_id] = {"waiting_count": waiting, "pending_count": pending}
+    return counts
+
+
+def rebuild_queue_counts(db: Session, venue_id: int):
+    # Count with the session's pending changes included
+    db.flush()
+    counts = count_queue(db, [venue_id])[venue_id]
+    db.merge(VenueQueueStatsModel(venue_id=venue_id, **counts))
+    db.flush()
+
+
+def lock_venue_queue(db: Session, venue_id: int):
+    touch = (
+        update(VenueQueueStatsModel)
+        .where(VenueQueueStatsModel.venue_id == venue_id)
+        .values(updated_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+    if db.execute(touch).rowcount:
+        return
+
+    # First transition for this venue: concurrent callers may both get here,
+    # so create the row without conflicting and then lock whichever one won
+    db.flush()
+    counts = count_queue(db, [venue_id])[venue_id]
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    db.execute(
+        dialect.insert(VenueQueueStatsModel)
+        .values(venue_id=venue_id, **counts)
+        .on_conflict_do_nothing(index_elements=["venue_id"])
+    )
+    db.execute(touch)
+
+
+def adjust_queue_counts(db: Session, venue_id: int, waiting: int = 0, pending: int = 0):
+    updated = db.execute(
+        update(VenueQueueStatsModel)
+        .where(VenueQueueStatsModel.venue_id == venue_id)
+        .values(
+            waiting_count=VenueQueueStatsModel.waiting_count + waiting,
+            pending_count=VenueQueueStatsModel.pending_count + pending
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+    if not updated:
+        rebuild_queue_counts(db, venue_id)
+
+
+def get_waiting_counts(db: Session, venue_ids: List[int]) -> Dict[int, int]:
+    rows = db.query(
+        VenueQueueStatsModel.venue_id, VenueQueueStatsModel.waiting_count
+    ).filter(VenueQueueStatsModel.venue_id.in_(venue_ids)).all()
+
+    counts = dict(rows)
+    # Venues without a stats row yet (no transitions since the migration)
+    missing = [venue_id for venue_id in venue_ids if venue_id not in counts]
+    if missing:
+        for venue_id, venue_counts in count_queue(db, missing).items():
+            counts[venue_id] = venue_counts["waiting_count"]
+    return counts
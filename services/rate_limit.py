@@ -0,0 +1,323 @@
+# services/rate_limit.py
+#
+# Token-bucket rate limits for the auth, join and public poll routes, plus
+# global load shedding.
+#
+# A RateLimit is a route dependency with up to three buckets: per client IP,
+# per authenticated user (read from the bearer token, no database lookup) and
+# one shared by every caller of the route. A request takes a token from each;
+# an empty bucket turns it away with a 429 and a Retry-After for when the next
+# token is due. Limits are "N/second", "N/minute" or "N/hour" (a burst of N,
+# refilled evenly) from RATE_LIMIT_<NAME>_<IP|USER|ROUTE>, or "off".
+# RATE_LIMIT_ENABLED=false turns every limit off (the load benchmarks drive
+# all their traffic from one client).
+#
+# RATE_LIMIT_BACKEND picks where the buckets live: "memory" (per worker, the
+# default) or "database" (the rate_limit_buckets table, one upsert per take,
+# shared by every worker).
+#
+# LoadShedMiddleware answers 503 straight away once LOAD_SHED_QUEUE_DEPTH
+# requests are waiting for their response to start, instead of queueing more
+# work behind a saturated threadpool or connection pool.
+
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+import jwt
+from fastapi import HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from sqlalchemy import case, delete
+from sqlalchemy.dialects import postgresql, sqlite
+from config.environment import secret
+from database import engine
+from models.rateLimitBucket import RateLimitBucketModel
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600}
+# Any bucket untouched this long has refilled, whatever its limit
+STALE_AFTER = max(PERIODS.values())
+
+
+class Limit:
+
+    def __init__(self, count: int, period: float):
+        self.burst = count
+        self.rate = count / period  # tokens per second
+
+    @classmethod
+    def parse(cls, spec: str) -> Optional["Limit"]:
+        spec = spec.strip().lower()
+        if spec in ("", "off", "none"):
+            return None
+        count, _, period = spec.partition("/")
+        return cls(int(count), PERIODS[period])
+
+
+def limit_from_env(name: str, scope: str, default: str) -> Optional[Limit]:
+    return Limit.parse(os.getenv(f"RATE_LIMIT_{name.upper()}_{scope.upper()}", default))
+
+
+class RateLimitBackend:
+
+    # take() blocks on I/O and is run off the event loop
+    blocking = False
+
+    def take(self, key: str, limit: Limit, now: float) -> float:
+        # Takes one token; returns 0 when granted, else seconds until one is due
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {}
+
+
+class InMemoryBackend(RateLimitBackend):
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        # key -> (tokens, refilled_at, full_at), least recently used first
+        self._buckets: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evicted = 0
+
+    def take(self, key: str, limit: Limit, now: float) -> float:
+        with self._lock:
+            bucket = self._buckets.pop(key, None)
+            tokens = limit.burst if bucket is None else min(limit.burst, bucket[0] + (now - bucket[1]) * limit.rate)
+            granted = tokens >= 1
+            if granted:
+                tokens -= 1
+            self._buckets[key] = (tokens, now, now + (limit.burst - tokens) / limit.rate)
+            self._evict(now)
+        return 0.0 if granted else (1 - tokens) / limit.rate
+
+    def _evict(self, now: float):
+        # Least recently used first: drop the oldest bucket while it has
+        # refilled (a full bucket is the same as no bucket) or there are too
+        # many. Stops at the first one worth keeping, so a take stays O(1).
+        buckets = self._buckets
+        while buckets:
+            full_at = next(iter(buckets.values()))[2]
+            if full_at > now and len(buckets) <= self.max_keys:
+                break
+            buckets.popitem(last=False)
+            self.evicted += 1
+
+    def stats(self) -> dict:
+        return {"keys": len(self._buckets), "evicted": self.evicted}
+
+
+class DatabaseBackend(RateLimitBackend):
+    # One INSERT ... ON CONFLICT DO UPDATE per take: the refill, the take and
+    # the outcome are worked out from the stored row in a single statement, so
+    # concurrent workers never lose a token. Idle rows are purged now and then.
+
+    blocking = True
+    PURGE_EVERY = 1000
+
+    def __init__(self):
+        self._takes = 0
+        self.purged = 0
+
+    def take(self, key: str, limit: Limit, now: float) -> float:
+        buckets = RateLimitBucketModel.__table__
+        topped_up = buckets.c.tokens + (now - buckets.c.refilled_at) * limit.rate
+        refilled = case((topped_up > limit.burst, float(limit.burst)), else_=topped_up)
+        dialect = postgresql if engine.dialect.name == "postgresql" else sqlite
+
+        with engine.begin() as conn:
+            tokens, granted = conn.execute(
+                dialect.insert(buckets)
+                .values(key=key, tokens=limit.burst - 1, refilled_at=now, allowed=True)
+                .on_conflict_do_update(
+                    index_elements=["key"],
+                    set_={
+                        "tokens": case((refilled >= 1, refilled - 1), else_=refilled),
+                        "refilled_at": now,
+                        "allowed": refilled >= 1,
+                    }
+                )
+                .returning(buckets.c.tokens, buckets.c.allowed)
+            ).one()
+
+            self._takes += 1
+            if self._takes % self.PURGE_EVERY == 0:
+                self.purged += conn.execute(
+                    delete(buckets).where(buckets.c.refilled_at < now - STALE_AFTER)
+                ).rowcount
+        return 0.0 if granted else (1 - tokens) / limit.rate
+
+    def stats(self) -> dict:
+        return {"purged": self.purged}
+
+
+def create_backend(kind: str) -> RateLimitBackend:
+    if kind == "database":
+        return DatabaseBackend()
+    return InMemoryBackend(max_keys=int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000")))
+
+
+class RateLimiter:
+
+    def __init__(self, backend: RateLimitBackend, trust_forwarded_for: bool):
+        self.backend = backend
+        self.trust_forwarded_for = trust_forwarded_for
+        self.allowed = 0
+        self.limited = 0
+        self.backend_errors = 0
+        self.limited_by_rule = {}
+
+    def client_ip(self, request: Request) -> str:
+        if self.trust_forwarded_for:
+            forwarded = request.headers.get("x-forwarded-for")
+            if forwarded:
+                return forwarded.split(",")[0].strip()
+        return request.client.host if request.client else "unknown"
+
+    def user_id(self, request: Request) -> Optional[str]:
+        # Only the signature is checked; the route's own auth still decides access
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return None
+        try:
+            return str(jwt.decode(token, secret, algorithms=["HS256"]).get("sub"))
+        except jwt.PyJWTError:
+            return None
+
+    async def take(self, key: str, limit: Limit) -> float:
+        now = time.time()
+        try:
+            if self.backend.blocking:
+                return await run_in_threadpool(self.backend.take, key, limit, now)
+            return self.backend.take(key, limit, now)
+        except Exception:
+            # A broken shared store must not take the routes down with it
+            self.backend_errors += 1
+            logger.exception("Rate limit backend failed, letting the request through")
+            return 0.0
+
+    def stats(self) -> dict:
+        stats = {"allowed": self.allowed, "limited": self.limited, "backend_errors": self.backend_errors}
+        stats.update({f"limited_{name}": count for name, count in self.limited_by_rule.items()})
+        stats.update(self.backend.stats())
+        return stats
+
+
+rate_limits_enabled = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+
+rate_limiter = RateLimiter(
+    create_backend(os.getenv("RATE_LIMIT_BACKEND", "memory")),
+    trust_forwarded_for=os.getenv("RATE_LIMIT_TRUST_FORWARDED_FOR", "false").lower() in ("1", "true", "yes")
+)
+
+
+class RateLimit:
+
+    def __init__(self, name: str, ip: str = "off", user: str = "off", route: str = "off"):
+        self.name = name
+        self.ip = limit_from_env(name, "ip", ip)
+        self.user = limit_from_env(name, "user", user)
+        self.route = limit_from_env(name, "route", route)
+        rate_limiter.limited_by_rule[name] = 0
+
+    async def __call__(self, request: Request):
+        if not rate_limits_enabled:
+            return
+
+        # The caller's own buckets go first, so a client already over its
+        # limit does not also drain the bucket every caller shares
+        buckets = []
+        user_id = rate_limiter.user_id(request) if self.user else None
+        if user_id:
+            buckets.append((f"{self.name}:user:{user_id}", self.user))
+        elif self.ip:
+            buckets.append((f"{self.name}:ip:{rate_limiter.client_ip(request)}", self.ip))
+        if self.route:
+            buckets.append((f"{self.name}:route", self.route))
+
+        for key, limit in buckets:
+            wait = await rate_limiter.take(key, limit)
+            if wait > 0:
+                rate_limiter.limited += 1
+                rate_limiter.limited_by_rule[self.name] += 1
+                raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                                    detail="Too many requests, try again later",
+                                    headers={"Retry-After": str(math.ceil(wait))})
+        rate_limiter.allowed += 1
+
+
+login_rate_limit = RateLimit("login", ip="20/minute", route="1200/minute")
+register_rate_limit = RateLimit("register", ip="5/minute", route="300/minute")
+join_rate_limit = RateLimit("join", user="10/minute", ip="30/minute", route="3000/minute")
+venue_count_rate_limit = RateLimit("venue_count", ip="120/minute", route="30000/minute")
+
+
+class LoadShedder:
+
+    # Monitoring has to keep working while the app is shedding
+    EXEMPT_PATHS = ("/metrics",)
+
+    def __init__(self, max_queue_depth: int, retry_after: int = 1):
+        self.max_queue_depth = max_queue_depth  # 0 turns shedding off
+        self.retry_after = retry_after
+        # Only touched on the event loop thread, so no lock
+        self.queue_depth = 0
+        self.peak_queue_depth = 0
+        self.shed = 0
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self.queue_depth,
+            "peak_queue_depth": self.peak_queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "shed": self.shed,
+        }
+
+
+load_shedder = LoadShedder(max_queue_depth=int(os.getenv("LOAD_SHED_QUEUE_DEPTH", "200")))
+
+
+class LoadShedMiddleware:
+    # A request counts towards the queue depth until its response starts, so
+    # long-lived SSE streams only count while they are being set up
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        shedder = load_shedder
+        if scope["type"] != "http" or not shedder.max_queue_depth or scope["path"] in shedder.EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        if shedder.queue_depth >= shedder.max_queue_depth:
+            shedder.shed += 1
+            response = JSONResponse(
+                {"detail": "Server is busy, try again shortly"},
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(shedder.retry_after)}
+            )
+            await response(scope, receive, send)
+            return
+
+        shedder.queue_depth += 1
+        shedder.peak_queue_depth = max(shedder.peak_queue_depth, shedder.queue_depth)
+        started = False
+
+        async def send_started(message):
+            nonlocal started
+            if message["type"] == "http.response.start" and not started:
+                started = True
+                shedder.queue_depth -= 1
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_started)
+        finally:
+            if not started:
+                shedder.queue_depth -= 1
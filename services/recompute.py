@@ -0,0 +1,128 @@
+# services/recompute.py
+#
+# Coalescing scheduler for queue renumbering. Seating or cancelling a waiting
+# entry marks its venue dirty instead of renumbering inside the request; a
+# background thread renumbers each dirty venue once per RECOMPUTE_WINDOW_MS,
+# however many transitions landed in that window. A venue marked again while
+# it is already dirty counts as coalesced.
+#
+# The scheduled renumbering is the handler registered by
+# controllers/waitlistEntry.py. Requests that need the queue settled before
+# they return (strict consistency) renumber inline instead, as does every
+# request while the scheduler is not running or the window is 0.
+
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RecomputeScheduler:
+
+    def __init__(self, window: float):
+        self.window = window
+        # Renumbers one venue on its own session: handler(venue_id, removed_position)
+        self.handler: Optional[Callable[[int, Optional[int]], None]] = None
+        # venue_id -> lowest removed position, None for a full renumbering
+        self._dirty: Dict[int, Optional[int]] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+        self.requested = 0
+        self.coalesced = 0
+        self.executed = 0
+        self.inline = 0
+        self.failed = 0
+        self.last_batch_venues = 0
+        self.last_run_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self.window > 0 and self._thread is not None and self._thread.is_alive() and not self._stopping.is_set()
+
+    def start(self):
+        if self.window > 0 and (self._thread is None or not self._thread.is_alive()):
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="queue-recompute", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        # Pending venues are renumbered before the thread exits
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def defer(self, venue_id: int, removed_position: Optional[int] = None, strict: bool = False) -> bool:
+        # Call once the transition has committed, or the renumbering could run
+        # before it. False means the caller has to renumber inline.
+        self.requested += 1
+        if strict or not self.running:
+            self.inline += 1
+            return False
+
+        with self._lock:
+            if venue_id in self._dirty:
+                self.coalesced += 1
+                pending = self._dirty[venue_id]
+                # Renumber from the earliest gap; None (everything) wins
+                if pending is not None and removed_position is not None:
+                    self._dirty[venue_id] = min(pending, removed_position)
+                else:
+                    self._dirty[venue_id] = None
+            else:
+                self._dirty[venue_id] = removed_position
+        self._wake.set()
+        return True
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake.wait()
+            # Let the rest of the window's transitions pile onto the same venues
+            self._stopping.wait(self.window)
+            self._wake.clear()
+            self.run_pending()
+        self.run_pending()
+
+    def run_pending(self):
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+        if not dirty:
+            return
+
+        start = time.perf_counter()
+        for venue_id, removed_position in dirty.items():
+            # A failure is not retried: the next transition marks the venue
+            # again, and a renumbering always covers the whole queue
+            try:
+                self.handler(venue_id, removed_position)
+                self.executed += 1
+            except Exception:
+                self.failed += 1
+                logger.exception("Queue recompute failed for venue %s", venue_id)
+        self.last_batch_venues = len(dirty)
+        self.last_run_ms = (time.perf_counter() - start) * 1000
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = len(self._dirty)
+        return {
+            "pending": pending,
+            "requested": self.requested,
+            "coalesced": self.coalesced,
+            "executed": self.executed,
+            "inline": self.inline,
+            "failed": self.failed,
+            "last_batch_venues": self.last_batch_venues,
+            "last_run_ms": self.last_run_ms,
+        }
+
+
+recompute_scheduler = RecomputeScheduler(
+    window=float(os.getenv("RECOMPUTE_WINDOW_MS", "250")) / 1000
+)
@@ -0,0 +1,274 @@
+# services/service_time.py
+#
+# Learned per-venue service time: minutes of waiting per place in the queue,
+# estimated from real waiting-to-seated durations. Each sample is
+#
+#     (seated_at - approved_at) / approved_position
+#
+# and the estimate is a time-decayed mean: a sample loses half its weight
+# every SERVICE_TIME_HALF_LIFE_HOURS hours. The state per venue is a decayed
+# sum, a decayed weight and the time both refer to. mark_as_seated updates it
+# in memory, a background thread persists changed venues to
+# venue_service_stats, and recompute_from_history rebuilds the same state
+# offline from the full history with NumPy.
+#
+# Every worker learns from its own seatings, so persist() writes increments:
+# the samples observed since the last persist are merged into the stored row
+# under its row lock (the database write lock on SQLite), and the merged row
+# becomes the worker's state. A rebuild from history replaces the row instead.
+
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from models.venueServiceStats import VenueServiceStatsModel
+from services.archive import all_entries
+
+# Samples outside this range (minutes per place) are clipped
+MIN_SAMPLE = 0.5
+MAX_SAMPLE = 240.0
+
+HISTORY_CHUNK_SIZE = 50000
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def service_sample(approved_at: datetime, seated_at: datetime, approved_position: int) -> Optional[float]:
+    if not approved_at or not seated_at or not approved_position:
+        return None
+    minutes = (seated_at - approved_at).total_seconds() / 60
+    return min(max(minutes / approved_position, MIN_SAMPLE), MAX_SAMPLE)
+
+
+class ServiceTimeEstimator:
+
+    def __init__(self, half_life_hours: float, min_weight: float, persist_interval: float):
+        self.half_life_hours = half_life_hours
+        self.min_weight = min_weight
+        self.persist_interval = persist_interval
+        # venue_id -> [weighted_sum, weight_total, updated_at]
+        self._state = {}
+        # venue_id -> [weighted_sum, weight_total, updated_at, replace]: what
+        # was observed since the last persist, or the whole state after a rebuild
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = None
+
+        self.observed = 0
+        self.persisted = 0
+
+    def _decay(self, since: datetime, until: datetime) -> float:
+        hours = max((until - since).total_seconds() / 3600, 0)
+        return 0.5 ** (hours / self.half_life_hours)
+
+    def _combine(self, a, b) -> list:
+        # Two decayed (sum, weight, time) states as one, referred to the later time
+        updated_at = max(a[2], b[2])
+        a_factor = self._decay(a[2], updated_at)
+        b_factor = self._decay(b[2], updated_at)
+        return [a[0] * a_factor + b[0] * b_factor, a[1] * a_factor + b[1] * b_factor, updated_at]
+
+    def observe(self, venue_id: int, approved_at: datetime, seated_at: datetime, approved_position: int):
+        sample = service_sample(approved_at, seated_at, approved_position)
+        if sample is None:
+            return
+        observation = (sample, 1.0, seated_at)
+        with self._lock:
+            self._state[venue_id] = self._combine(self._state.get(venue_id, (0.0, 0.0, seated_at)), observation)
+            pending = self._pending.get(venue_id)
+            if pending is None:
+                self._pending[venue_id] = [*observation, False]
+            else:
+                self._pending[venue_id] = [*self._combine(pending, observation), pending[3]]
+        self.observed += 1
+
+    def estimate(self, venue_id: int) -> Optional[int]:
+        # Minutes per place, or None while there is too little recent data
+        with self._lock:
+            state = self._state.get(venue_id)
+        if state is None:
+            return None
+        weighted_sum, weight_total, updated_at = state
+        factor = self._decay(updated_at, utcnow())
+        if weight_total * factor < self.min_weight:
+            return None
+        return max(round(weighted_sum / weight_total), 1)
+
+    def load(self, db: Session):
+        rows = db.query(VenueServiceStatsModel).all()
+        with self._lock:
+            for row in rows:
+                stored = [row.weighted_sum, row.weight_total, row.updated_at]
+                pending = self._pending.get(row.venue_id)
+                if pending is None:
+                    self._state[row.venue_id] = stored
+                elif not pending[3]:
+                    self._state[row.venue_id] = self._combine(stored, pending)
+
+    def persist(self, db: Optional[Session] = None):
+        # Writes through db when given (scripts working on another database),
+        # else through a session of its own
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+
+        own_session = db is None
+        if own_session:
+            db = SessionLocal()
+        try:
+            merged = self._merge(db, pending)
+            db.commit()
+            self.persisted += len(merged)
+        except Exception:
+            db.rollback()
+            # Put the increments back in front of anything observed meanwhile
+            with self._lock:
+                for venue_id, increment in pending.items():
+                    later = self._pending.get(venue_id)
+                    if later is None:
+                        self._pending[venue_id] = increment
+                    else:
+                        self._pending[venue_id] = [*self._combine(increment, later), increment[3] or later[3]]
+            if not own_session:
+                raise
+            return
+        finally:
+            if own_session:
+                db.close()
+
+        # The merged rows carry the other workers' samples too
+        with self._lock:
+            for venue_id, state in merged.items():
+                later = self._pending.get(venue_id)
+                self._state[venue_id] = state if later is None else self._combine(state, later)
+
+    def _merge(self, db: Session, pending: dict) -> dict:
+        stats = VenueServiceStatsModel.__table__
+        venue_ids = list(pending)
+        dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+
+        # Create the missing rows, then lock them all until commit so a
+        # concurrent persist from another worker merges after this one
+        first_seen = min(increment[2] for increment in pending.values())
+        db.execute(
+            dialect.insert(stats)
+            .values([
+                {"venue_id": venue_id, "weighted_sum": 0.0, "weight_total": 0.0, "updated_at": first_seen}
+                for venue_id in venue_ids
+            ])
+            .on_conflict_do_nothing(index_elements=["venue_id"])
+        )
+        db.execute(
+            update(stats).where(stats.c.venue_id.in_(venue_ids)).values(updated_at=stats.c.updated_at)
+        )
+        stored = {
+            row.venue_id: [row.weighted_sum, row.weight_total, row.updated_at]
+            for row in db.execute(select(stats).where(stats.c.venue_id.in_(venue_ids)))
+        }
+
+        merged = {
+            venue_id: increment[:3] if increment[3] else self._combine(stored[venue_id], increment)
+            for venue_id, increment in pending.items()
+        }
+        db.execute(
+            update(stats).where(stats.c.venue_id == bindparam("b_venue_id")).values(
+                weighted_sum=bindparam("b_weighted_sum"),
+                weight_total=bindparam("b_weight_total"),
+                updated_at=bindparam("b_updated_at")
+            ),
+            [
+                {"b_venue_id": venue_id, "b_weighted_sum": state[0], "b_weight_total": state[1], "b_updated_at": state[2]}
+                for venue_id, state in merged.items()
+            ]
+        )
+        return merged
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            db = SessionLocal()
+            try:
+                self.load(db)
+            finally:
+                db.close()
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="service-time-persister", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.persist()
+
+    def _run(self):
+        while not self._stopping.wait(self.persist_interval):
+            self.persist()
+
+    def recompute_from_history(self, db: Session) -> int:
+        # Rebuild every venue's state from all seated entries, in vectorized chunks
+        import numpy as np
+
+        now = utcnow()
+        sums = {}
+        weights = {}
+        processed = 0
+
+        # Seated entries are mostly in the archive by now
+        query = select(
+            all_entries.venue_id,
+            all_entries.approved_at,
+            all_entries.seated_at,
+            all_entries.approved_position
+        ).where(
+            all_entries.status == "seated",
+            all_entries.approved_at.is_not(None),
+            all_entries.seated_at.is_not(None),
+            all_entries.approved_position > 0
+        ).execution_options(yield_per=HISTORY_CHUNK_SIZE)
+
+        for chunk in db.execute(query).partitions():
+            venue_ids = np.fromiter((row[0] for row in chunk), dtype=np.int64, count=len(chunk))
+            approved = np.array([row[1] for row in chunk], dtype="datetime64[us]")
+            seated = np.array([row[2] for row in chunk], dtype="datetime64[us]")
+            positions = np.fromiter((row[3] for row in chunk), dtype=np.float64, count=len(chunk))
+
+            minutes = (seated - approved) / np.timedelta64(1, "m")
+            samples = np.clip(minutes / positions, MIN_SAMPLE, MAX_SAMPLE)
+            age_hours = (np.datetime64(now, "us") - seated) / np.timedelta64(1, "h")
+            sample_weights = 0.5 ** (np.maximum(age_hours, 0) / self.half_life_hours)
+
+            venues, index = np.unique(venue_ids, return_inverse=True)
+            chunk_sums = np.bincount(index, weights=samples * sample_weights)
+            chunk_weights = np.bincount(index, weights=sample_weights)
+            for venue_id, venue_sum, venue_weight in zip(venues.tolist(), chunk_sums, chunk_weights):
+                sums[venue_id] = sums.get(venue_id, 0.0) + float(venue_sum)
+                weights[venue_id] = weights.get(venue_id, 0.0) + float(venue_weight)
+            processed += len(chunk)
+
+        with self._lock:
+            for venue_id in sums:
+                self._state[venue_id] = [sums[venue_id], weights[venue_id], now]
+                # The full history, so it replaces the stored row
+                self._pending[venue_id] = [sums[venue_id], weights[venue_id], now, True]
+        return processed
+
+    def stats(self) -> dict:
+        with self._lock:
+            venues = len(self._state)
+            dirty = len(self._pending)
+        return {"venues": venues, "dirty": dirty, "observed": self.observed, "persisted": self.persisted}
+
+
+service_time_estimator = ServiceTimeEstimator(
+    half_life_hours=float(os.getenv("SERVICE_TIME_HALF_LIFE_HOURS", "72")),
+    min_weight=float(os.getenv("SERVICE_TIME_MIN_WEIGHT", "5")),
+    persist_interval=float(os.getenv("SERVICE_TIME_PERSIST_INTERVAL", "60"))
+)
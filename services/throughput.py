@@ -0,0 +1,123 @@
+# services/throughput.py
+#
+# Incremental rollup of waitlist throughput. Transitions record into an
+# in-memory tally keyed by (venue, hour, counter). A background thread folds
+# the tally into waitlist_hourly_stats every ROLLUP_FLUSH_INTERVAL seconds
+# with additive upserts, so several workers can flush into the same rows.
+#
+# Loss window: the tally lives only in this process, so a crash (or a kill
+# that skips the lifespan shutdown) loses up to ROLLUP_FLUSH_INTERVAL seconds
+# of counts per worker. The rollup is not recomputed from the entries: a
+# cancelled or rejected entry records no time of its own, and archived
+# history has moved to another table. A clean shutdown loses nothing, since
+# stop() flushes what is left, and a failed flush keeps its counts for the
+# next one.
+
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime, timezone
+from sqlalchemy.dialects import postgresql, sqlite
+from database import SessionLocal
+from models.waitlistHourlyStats import WaitlistHourlyStatsModel
+
+# Queue events (see controllers/waitlistEntry.py) and the column each one counts in
+EVENT_COLUMNS = {
+    "joined": "joins",
+    "approved": "approvals",
+    "seated": "seats",
+    "cancelled": "cancels",
+    "rejected": "rejects",
+}
+
+
+def current_hour() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None, minute=0, second=0, microsecond=0)
+
+
+class ThroughputRollup:
+
+    def __init__(self, flush_interval: float):
+        self.flush_interval = flush_interval
+        self._tally = defaultdict(int)
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = None
+
+        self.recorded = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.last_flush_rows = 0
+
+    def record(self, venue_id: int, event: str, count: int = 1):
+        column = EVENT_COLUMNS.get(event)
+        if column is None:
+            return
+        with self._lock:
+            self._tally[(venue_id, current_hour(), column)] += count
+        self.recorded += count
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="throughput-rollup", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.flush()
+
+    def _run(self):
+        while not self._stopping.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            tally, self._tally = self._tally, defaultdict(int)
+        if not tally:
+            return
+
+        rows = {}
+        for (venue_id, hour, column), count in tally.items():
+            row = rows.setdefault((venue_id, hour), {"venue_id": venue_id, "hour": hour, **{c: 0 for c in EVENT_COLUMNS.values()}})
+            row[column] += count
+
+        db = SessionLocal()
+        try:
+            dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+            stmt = dialect.insert(WaitlistHourlyStatsModel)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["venue_id", "hour"],
+                set_={c: getattr(WaitlistHourlyStatsModel, c) + getattr(stmt.excluded, c) for c in EVENT_COLUMNS.values()}
+            )
+            db.execute(stmt, list(rows.values()))
+            db.commit()
+            self.flushes += 1
+            self.last_flush_rows = len(rows)
+        except Exception:
+            db.rollback()
+            self.failed_flushes += 1
+            # Keep the counts for the next flush
+            with self._lock:
+                for key, count in tally.items():
+                    self._tally[key] += count
+        finally:
+            db.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = len(self._tally)
+        return {
+            "recorded": self.recorded,
+            "pending_keys": pending,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "last_flush_rows": self.last_flush_rows,
+        }
+
+
+throughput_rollup = ThroughputRollup(
+    flush_interval=float(os.getenv("ROLLUP_FLUSH_INTERVAL", "30"))
+)
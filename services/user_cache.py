@@ -0,0 +1,82 @@
+# services/user_cache.py
+#
+# Bounded TTL cache of the authenticated user, keyed by the token's `sub`.
+# get_current_user checks it before querying the users table. Entries are
+# dropped as soon as a user row is updated (e.g. a role change) or deleted
+# through the ORM in this process. Other workers see the change once their
+# own entry expires, so keep USER_CACHE_TTL short.
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import event
+from models.user import UserModel
+
+
+class CachedUser:
+    # The user fields routes read from current_user
+    __slots__ = ("id", "role", "username")
+
+    def __init__(self, id: int, role: str, username: str):
+        self.id = id
+        self.role = role
+        self.username = username
+
+    @classmethod
+    def from_model(cls, user: UserModel):
+        return cls(id=user.id, role=user.role, username=user.username)
+
+
+class TTLCache:
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None or item[0] < time.monotonic():
+                if item is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+user_cache = TTLCache(
+    maxsize=int(os.getenv("USER_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("USER_CACHE_TTL", "30"))
+)
+
+
+@event.listens_for(UserModel, "after_update")
+@event.listens_for(UserModel, "after_delete")
+def _invalidate_user(mapper, connection, target):
+    user_cache.invalidate(str(target.id))
@@ -0,0 +1,177 @@
+# services/venue_catalog.py
+#
+# In-process copy of the venue catalog behind GET /venue and GET /venue/{id}.
+# Every venue insert, update or delete bumps the "venues" row of
+# cache_versions inside the writing transaction (mapper events below). A
+# worker re-reads that one row at most every VENUE_CATALOG_CHECK_INTERVAL
+# seconds and reloads the catalog when the number moved, so writes made by
+# other workers show up within the interval. The writing worker calls
+# invalidate() after its commit and sees the change immediately.
+#
+# The version also drives the ETag and Last-Modified headers, so clients
+# revalidating an unchanged catalog get a 304.
+
+import hashlib
+import os
+import threading
+import time
+from bisect import bisect_right
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, List, Optional
+from fastapi import Request
+from sqlalchemy import event, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from models.cacheVersion import CacheVersionModel
+from models.venue import VenueModel
+from serializers.venue import VenueSchema
+
+CATALOG = "venues"
+
+
+class CatalogSnapshot:
+
+    def __init__(self, version: int, last_modified: datetime, venues: List[dict]):
+        self.version = version
+        self.last_modified = last_modified
+        self.venues = venues
+        self.ids = [venue["id"] for venue in venues]
+        self.by_id: Dict[int, dict] = {venue["id"]: venue for venue in venues}
+
+    def page_after(self, after_id: Optional[int], limit: int) -> List[dict]:
+        start = bisect_right(self.ids, after_id) if after_id is not None else 0
+        return self.venues[start:start + limit]
+
+    def etag(self, *parts) -> str:
+        # Weak: the body for a version is stable but its bytes are not promised
+        digest = hashlib.blake2b(repr(parts).encode(), digest_size=8).hexdigest()
+        return f'W/"{self.version}-{digest}"'
+
+    def headers(self, etag: str) -> dict:
+        return {"ETag": etag, "Last-Modified": format_datetime(self.last_modified, usegmt=True)}
+
+    def not_modified(self, request: Request, etag: str) -> bool:
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            return self.last_modified.replace(microsecond=0) <= since
+        return False
+
+
+class VenueCatalog:
+
+    def __init__(self, check_interval: float):
+        self.check_interval = check_interval
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._checked_at = 0.0
+        self._refreshing = False
+        # Bumped by invalidate(), so a refresh that started before it is not kept
+        self._generation = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.version_checks = 0
+        self.reloads = 0
+
+    def get(self, db: Session) -> CatalogSnapshot:
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._checked_at < self.check_interval:
+            self.hits += 1
+            return snapshot
+
+        # The lock is never held across a query: in async mode the queries
+        # await on the event loop, and a second request blocking on the lock
+        # there would stall the loop the first one needs to finish. One request
+        # refreshes at a time; the others keep serving the stale snapshot.
+        with self._lock:
+            if snapshot is not None and self._refreshing:
+                self.hits += 1
+                return snapshot
+            owns_refresh = not self._refreshing
+            self._refreshing = True
+            generation = self._generation
+
+        try:
+            snapshot = self._load(db, snapshot)
+        finally:
+            with self._lock:
+                if owns_refresh:
+                    self._refreshing = False
+                # An invalidate() while the queries ran may mean they missed a write
+                if generation == self._generation:
+                    self._snapshot = snapshot
+                    self._checked_at = time.monotonic()
+        return snapshot
+
+    def _load(self, db: Session, snapshot: Optional[CatalogSnapshot]) -> CatalogSnapshot:
+        # Read the version before the venues: a write landing in between
+        # leaves an older number with newer rows, which the next check reloads
+        self.version_checks += 1
+        row = db.query(CacheVersionModel.version, CacheVersionModel.updated_at).filter(
+            CacheVersionModel.name == CATALOG
+        ).first()
+        version, updated_at = row if row else (0, None)
+
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+
+        venues = db.query(VenueModel).order_by(VenueModel.id).all()
+        last_modified = (updated_at or datetime.utcnow()).replace(tzinfo=timezone.utc)
+        self.reloads += 1
+        return CatalogSnapshot(
+            version,
+            last_modified,
+            [VenueSchema.model_validate(venue, from_attributes=True).model_dump(mode="json") for venue in venues]
+        )
+
+    def invalidate(self):
+        with self._lock:
+            self._snapshot = None
+            self._generation += 1
+
+    def stats(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "version": snapshot.version if snapshot else -1,
+            "venues": len(snapshot.venues) if snapshot else 0,
+            "hits": self.hits,
+            "version_checks": self.version_checks,
+            "reloads": self.reloads,
+        }
+
+
+venue_catalog = VenueCatalog(
+    check_interval=float(os.getenv("VENUE_CATALOG_CHECK_INTERVAL", "1"))
+)
+
+
+@event.listens_for(VenueModel, "after_insert")
+@event.listens_for(VenueModel, "after_update")
+@event.listens_for(VenueModel, "after_delete")
+def _bump_catalog_version(mapper, connection, target):
+    now = datetime.utcnow()
+    versions = CacheVersionModel.__table__
+    bumped = connection.execute(
+        update(versions)
+        .where(versions.c.name == CATALOG)
+        .values(version=versions.c.version + 1, updated_at=now)
+    ).rowcount
+
+    if not bumped:
+        dialect = postgresql if connection.dialect.name == "postgresql" else sqlite
+        connection.execute(
+            dialect.insert(versions)
+            .values(name=CATALOG, version=1, updated_at=now)
+            .on_conflict_do_update(
+                index_elements=["name"],
+                set_={"version": versions.c.version + 1, "updated_at": now}
+            )
+        )
@@ -0,0 +1,185 @@
+# services/venue_search.py
+#
+# Venue search by name and location for GET /venue/search. Every word of the
+# query must match the start of a word in the venue's name or location
+# ("caf man" finds "Cafe Aroma, Manama"). Matches rank by where they hit:
+# the name's first word, anywhere in the name, then the location.
+#
+# On Postgres the match runs in SQL against the pg_trgm GIN indexes from
+# migration 0009. Elsewhere it runs on an inverted index built from the venue
+# catalog snapshot (services/venue_catalog.py), rebuilt when the catalog
+# reloads.
+#
+# Pages use the same keyset cursors as paginate(), over (sort key, id): the
+# rank, or minus the waiting count when ordering by queue size.
+
+import re
+import threading
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy import Integer, and_, case, column, func, tuple_
+from sqlalchemy.orm import Session
+from dependencies.pagination import PageParams, decode_cursor, encode_cursor
+from models.venue import VenueModel
+from models.venueQueueStats import VenueQueueStatsModel
+from serializers.venue import VenueSchema
+from services.venue_catalog import CatalogSnapshot, venue_catalog
+
+# Words past this are ignored; they rarely narrow the result further
+MAX_QUERY_TOKENS = 8
+
+CURSOR_KEYS = [column("sort_key", Integer), VenueModel.id]
+
+_word = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _word.findall(text.lower())
+
+
+def rank(tokens: List[str], name: str) -> int:
+    # 0: the name starts with the first word, 1: every word is in the name, 2: some only in the location
+    words = tokenize(name)
+    if not all(any(word.startswith(token) for word in words) for token in tokens):
+        return 2
+    return 0 if words and words[0].startswith(tokens[0]) else 1
+
+
+class SearchIndex:
+
+    def __init__(self, venues: List[dict]):
+        postings: Dict[str, Set[int]] = defaultdict(set)
+        for venue in venues:
+            for word in tokenize(venue["name"]) + tokenize(venue["location"]):
+                postings[word].add(venue["id"])
+        self.postings = dict(postings)
+        self.words = sorted(postings)
+
+    def prefixed(self, token: str) -> Set[int]:
+        # The words starting with token sit together in the sorted list
+        ids: Set[int] = set()
+        for word in self.words[bisect_left(self.words, token):]:
+            if not word.startswith(token):
+                break
+            ids |= self.postings[word]
+        return ids
+
+    def match(self, tokens: List[str]) -> Set[int]:
+        # Rarest word first keeps the intersections small
+        candidates = sorted((self.prefixed(token) for token in tokens), key=len)
+        return set.intersection(*candidates) if candidates else set()
+
+
+class VenueSearch:
+
+    def __init__(self):
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._index: Optional[SearchIndex] = None
+        self._lock = threading.Lock()
+
+        self.sql_searches = 0
+        self.index_searches = 0
+        self.index_builds = 0
+
+    def search(self, db: Session, q: str, order: str, page: PageParams) -> Tuple[List[dict], Optional[str]]:
+        # Returns the page and the cursor for the next one; a stream gets every row after the cursor
+        tokens = tokenize(q)[:MAX_QUERY_TOKENS]
+        if not tokens:
+            return [], None
+        after = tuple(decode_cursor(page.cursor, CURSOR_KEYS)) if page.cursor else None
+        limit = None if page.stream else page.limit + 1
+
+        if db.get_bind().dialect.name == "postgresql":
+            rows = self._search_sql(db, tokens, order, after, limit)
+        else:
+            rows = self._search_index(db, tokens, order, after, limit)
+
+        if limit is None or len(rows) < limit:
+            return [venue for venue, _ in rows], None
+        rows = rows[:page.limit]
+        return [venue for venue, _ in rows], encode_cursor(rows[-1][1])
+
+    def _search_sql(self, db: Session, tokens: List[str], order: str, after, limit) -> List[tuple]:
+        self.sql_searches += 1
+        name = func.lower(VenueModel.name)
+        location = func.lower(VenueModel.location)
+        # \m is a word start; tokens are plain word characters, so nothing needs escaping
+        in_name = and_(*[name.regexp_match(r"\m" + token) for token in tokens])
+        matches = [
+            name.regexp_match(r"\m" + token) | location.regexp_match(r"\m" + token) for token in tokens
+        ]
+
+        waiting = func.coalesce(VenueQueueStatsModel.waiting_count, 0)
+        if order == "waiting":
+            sort_key = -waiting
+        else:
+            sort_key = case((and_(in_name, name.regexp_match(r"^\W*" + tokens[0])), 0), (in_name, 1), else_=2)
+
+        query = db.query(VenueModel, waiting, sort_key).outerjoin(
+            VenueQueueStatsModel, VenueQueueStatsModel.venue_id == VenueModel.id
+        ).filter(*matches)
+        if after is not None:
+            query = query.filter(tuple_(sort_key, VenueModel.id) > tuple_(*after))
+        query = query.order_by(sort_key, VenueModel.id)
+        if limit is not None:
+            query = query.limit(limit)
+
+        return [
+            (
+                {**VenueSchema.model_validate(venue, from_attributes=True).model_dump(mode="json"), "waiting_count": count},
+                (key, venue.id)
+            )
+            for venue, count, key in query.all()
+        ]
+
+    def _search_index(self, db: Session, tokens: List[str], order: str, after, limit) -> List[tuple]:
+        self.index_searches += 1
+        catalog = venue_catalog.get(db)
+        ids = self._index_for(catalog).match(tokens)
+
+        def waiting_counts(venue_ids=None) -> Dict[int, int]:
+            query = db.query(VenueQueueStatsModel.venue_id, VenueQueueStatsModel.waiting_count)
+            if venue_ids is not None:
+                query = query.filter(VenueQueueStatsModel.venue_id.in_(venue_ids))
+            return dict(query.all())
+
+        if order == "waiting":
+            # One row per venue, no bigger than the catalog itself
+            waiting = waiting_counts()
+            keyed = [(-waiting.get(venue_id, 0), venue_id) for venue_id in ids]
+        else:
+            keyed = [(rank(tokens, catalog.by_id[venue_id]["name"]), venue_id) for venue_id in ids]
+
+        keyed.sort()
+        if after is not None:
+            keyed = keyed[bisect_right(keyed, after):]
+        if limit is not None:
+            keyed = keyed[:limit]
+
+        if order != "waiting":
+            waiting = waiting_counts([venue_id for _, venue_id in keyed]) if keyed else {}
+        return [
+            ({**catalog.by_id[venue_id], "waiting_count": waiting.get(venue_id, 0)}, (key, venue_id))
+            for key, venue_id in keyed
+        ]
+
+    def _index_for(self, snapshot: CatalogSnapshot) -> SearchIndex:
+        with self._lock:
+            if self._snapshot is not snapshot:
+                self._index = SearchIndex(snapshot.venues)
+                self._snapshot = snapshot
+                self.index_builds += 1
+            return self._index
+
+    def stats(self) -> dict:
+        index = self._index
+        return {
+            "sql_searches": self.sql_searches,
+            "index_searches": self.index_searches,
+            "index_builds": self.index_builds,
+            "index_words": len(index.words) if index else 0,
+        }
+
+
+venue_search = VenueSearch()
@@ -0,0 +1,89 @@
+# tests/conftest.py
+#
+# Every test runs against a scratch SQLite database, rebuilt before each test
+# the way seed.py builds one. database.py and the services read their settings
+# at import time, so the environment is set before any app module is imported.
+#
+#   python -m pytest -q
+
+import os
+import tempfile
+
+scratch_dir = tempfile.mkdtemp(prefix="queuemate-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{scratch_dir}/queuemate.db"
+os.environ.pop("READ_DATABASE_URL", None)
+os.environ.pop("USE_ASYNC_DB", None)
+# The tests drive every request from one client
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+os.environ["LOAD_SHED_QUEUE_DEPTH"] = "0"
+# Renumber inside the request, so responses already show the settled queue
+os.environ["RECOMPUTE_WINDOW_MS"] = "0"
+os.environ["VENUE_CATALOG_CHECK_INTERVAL"] = "0"
+
+import pytest
+from fastapi.testclient import TestClient
+from database import engine, SessionLocal
+from migrations import migration_metadata, run_migrations
+from models.base import Base
+# Register every table so drop_all/create_all cover the whole schema
+import models.waitlistEntry, models.notification, models.venueQueueStats, models.waitlistHourlyStats, models.venueServiceStats, models.cacheVersion, models.waitlistEntryArchive, models.rateLimitBucket
+from models.user import UserModel
+from models.venue import VenueModel
+from services.user_cache import user_cache
+from services.venue_catalog import venue_catalog
+
+
+@pytest.fixture(autouse=True)
+def schema():
+    Base.metadata.drop_all(bind=engine)
+    migration_metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    # Ids start over with the schema, so nothing cached may outlive it
+    user_cache.clear()
+    venue_catalog.invalidate()
+    yield
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client():
+    from main import app
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def make_user(db):
+    # Users are created without a password; tests authenticate with their token
+    def make_user(username: str, role: str = "customer") -> UserModel:
+        user = UserModel(username=username, email=f"{username}@example.com", role=role)
+        db.add(user)
+        db.commit()
+        return user
+    return make_user
+
+
+@pytest.fixture
+def make_venue(db):
+    def make_venue(owner: UserModel, name: str = "Test Venue", location: str = "Manama") -> VenueModel:
+        venue = VenueModel(name=name, location=location, max_capacity=50, avg_service_time=10, owner_id=owner.id)
+        db.add(venue)
+        db.commit()
+        return venue
+    return make_venue
+
+
+@pytest.fixture
+def auth():
+    def auth(user: UserModel) -> dict:
+        return {"Authorization": f"Bearer {user.generate_token()}"}
+    return auth
@@ -0,0 +1,83 @@
+# Admin analytics: totals in one statement, throughput from the hourly rollup,
+# which must not lose its in-memory tally on a clean shutdown.
+
+from fastapi.testclient import TestClient
+from models.waitlistHourlyStats import WaitlistHourlyStatsModel
+from services.throughput import ThroughputRollup, throughput_rollup
+
+
+def test_analytics_report_totals_and_throughput(client, db, make_user, make_venue, auth):
+    # Whatever an earlier test left in the shared tally
+    throughput_rollup.flush()
+    db.query(WaitlistHourlyStatsModel).delete()
+    db.commit()
+
+    admin = make_user("admin", role="admin")
+    staff = make_user("staff", role="staff")
+    venue = make_venue(staff)
+    customers = [make_user(f"customer_{i}") for i in range(3)]
+
+    entries = [client.post("/api/waitlist", json={"venue_id": venue.id}, headers=auth(c)).json()["id"] for c in customers]
+    client.put(f"/api/waitlist/{entries[0]}/approve", headers=auth(staff)).raise_for_status()
+    client.put(f"/api/waitlist/{entries[0]}/seated", headers=auth(staff)).raise_for_status()
+    client.put(f"/api/waitlist/{entries[1]}/reject", headers=auth(staff)).raise_for_status()
+    client.put(f"/api/waitlist/my/{entries[2]}/cancel", headers=auth(customers[2])).raise_for_status()
+    throughput_rollup.flush()
+
+    analytics = client.get("/api/admin/analytics", headers=auth(admin)).json()
+
+    assert (analytics["total_users"], analytics["total_staff"], analytics["total_customers"], analytics["total_venues"]) == (5, 1, 3, 1)
+    [row] = analytics["waitlist_throughput"]
+    assert row["venue_id"] == venue.id
+    assert {key: row[key] for key in ("joins", "approvals", "seats", "cancels", "rejects")} == {
+        "joins": 3, "approvals": 1, "seats": 1, "cancels": 1, "rejects": 1
+    }
+
+
+def test_flushes_add_to_the_stored_hour(db, make_user, make_venue):
+    venue = make_venue(make_user("staff", role="staff"))
+    first, second = ThroughputRollup(flush_interval=60), ThroughputRollup(flush_interval=60)
+
+    # Two workers flushing into the same row
+    first.record(venue.id, "joined", 2)
+    second.record(venue.id, "joined", 3)
+    second.record(venue.id, "reordered")
+    first.flush()
+    second.flush()
+
+    row = db.query(WaitlistHourlyStatsModel).filter(WaitlistHourlyStatsModel.venue_id == venue.id).one()
+    assert row.joins == 5
+    assert row.seats == 0
+
+
+def test_stop_flushes_the_pending_tally(db, make_user, make_venue):
+    venue = make_venue(make_user("staff", role="staff"))
+    # Far longer than the test: only stop() can write the counts
+    rollup = ThroughputRollup(flush_interval=3600)
+    rollup.start()
+    rollup.record(venue.id, "seated", 4)
+
+    rollup.stop()
+
+    row = db.query(WaitlistHourlyStatsModel).filter(WaitlistHourlyStatsModel.venue_id == venue.id).one()
+    assert row.seats == 4
+    assert rollup.stats()["pending_keys"] == 0
+
+
+def test_app_shutdown_flushes_the_rollup(db, make_user, make_venue, auth):
+    from main import app
+
+    venue = make_venue(make_user("staff", role="staff"))
+    customer = make_user("customer")
+    throughput_rollup.flush()
+
+    with TestClient(app) as client:
+        client.post("/api/waitlist", json={"venue_id": venue.id}, headers=auth(customer)).raise_for_status()
+        assert db.query(WaitlistHourlyStatsModel).filter(WaitlistHourlyStatsModel.venue_id == venue.id).count() == 0
+
+    row = db.query(WaitlistHourlyStatsModel).filter(WaitlistHourlyStatsModel.venue_id == venue.id).one()
+    assert row.joins == 1
+
+
+def test_analytics_are_admin_only(client, make_user, auth):
+    assert client.get("/api/admin/analytics", headers=auth(make_user("staff", role="staff"))).status_code == 403
@@ -0,0 +1,63 @@
+# The hot/cold split: finished entries move to waitlist_entries_archive in
+# chunks, and history reads see both tables through all_entries.
+# Archiving must not change what the API answers about an entry.
+
+from datetime import datetime, timedelta
+from models.waitlistEntry import WaitlistEntryModel
+from models.waitlistEntryArchive import WaitlistEntryArchiveModel
+from services.archive import ArchiveMover
+
+
+def test_old_finished_entries_move_and_stay_readable(client, db, make_user, make_venue, auth):
+    customer = make_user("customer")
+    venue = make_venue(make_user("staff", role="staff"))
+    old = datetime.utcnow() - timedelta(hours=3)
+    recent = datetime.utcnow()
+
+    def entry(status, timestamp):
+        return WaitlistEntryModel(user_id=customer.id, venue_id=venue.id, status=status, position=1, timestamp=timestamp)
+
+    db.add_all([entry(status, old) for status in ["seated", "cancelled", "rejected", "seated", "cancelled"]])
+    db.add_all([entry("waiting", old), entry("seated", recent)])
+    db.commit()
+
+    mover = ArchiveMover(interval=300, after_minutes=60, chunk_size=2)
+
+    # Three chunks: two full, then the one that comes up short
+    assert mover.run() == 5
+    assert mover.stats()["moved"] == 5
+
+    db.expire_all()
+    hot = [(e.status, e.timestamp == recent) for e in db.query(WaitlistEntryModel).order_by(WaitlistEntryModel.id)]
+    assert hot == [("waiting", False), ("seated", True)]
+    assert db.query(WaitlistEntryArchiveModel).count() == 5
+
+    history = client.get("/api/waitlist/my", headers=auth(customer)).json()
+    assert len(history) == 7
+    archived_id = db.query(WaitlistEntryArchiveModel.id).first().id
+    assert client.get(f"/api/waitlist/my/{archived_id}", headers=auth(customer)).json()["id"] == archived_id
+
+    # Nothing left to move
+    assert mover.run() == 0
+
+
+def test_archived_entries_cannot_be_cancelled(client, db, make_user, make_venue, auth):
+    customer = make_user("customer")
+    venue = make_venue(make_user("staff", role="staff"))
+    old = datetime.utcnow() - timedelta(hours=3)
+    db.add_all([
+        WaitlistEntryModel(user_id=customer.id, venue_id=venue.id, status="seated", position=1, timestamp=old),
+        WaitlistEntryModel(user_id=customer.id, venue_id=venue.id, status="seated", position=1, timestamp=datetime.utcnow())
+    ])
+    db.commit()
+    ArchiveMover(interval=300, after_minutes=60, chunk_size=10).run()
+    archived_id = db.query(WaitlistEntryArchiveModel.id).one().id
+    hot_id = db.query(WaitlistEntryModel.id).one().id
+
+    archived = client.put(f"/api/waitlist/my/{archived_id}/cancel", headers=auth(customer))
+    hot = client.put(f"/api/waitlist/my/{hot_id}/cancel", headers=auth(customer))
+
+    assert (archived.status_code, archived.json()) == (hot.status_code, hot.json())
+    assert archived.json()["detail"] == "This entry can no longer be cancelled"
+    # Someone else's archived entry stays invisible
+    assert client.put(f"/api/waitlist/my/{archived_id}/cancel", headers=auth(make_user("other"))).status_code == 404
@@ -0,0 +1,105 @@
+# With USE_ASYNC_DB the *_async routers are mounted and run the same handlers
+# on an AsyncSession. The app reads the setting at import time, so it runs in
+# a subprocess of its own.
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+
+SCRIPT = """
+import json
+from fastapi.testclient import TestClient
+from database import engine, SessionLocal
+from migrations import run_migrations
+from models.base import Base
+import models.waitlistEntry, models.notification, models.venueQueueStats, models.waitlistHourlyStats, models.venueServiceStats, models.cacheVersion, models.waitlistEntryArchive, models.rateLimitBucket
+from models.user import UserModel
+from models.venue import VenueModel
+from dependencies import pagination
+import main
+
+Base.metadata.create_all(bind=engine)
+run_migrations(engine)
+
+db = SessionLocal()
+staff, other, customer = [
+    UserModel(username=name, email=f"{name}@example.com", role=role)
+    for name, role in [("staff", "staff"), ("other", "staff"), ("customer", "customer")]
+]
+db.add_all([staff, other, customer])
+db.flush()
+venue = VenueModel(name="Async Venue", location="Manama", max_capacity=20, avg_service_time=10, owner_id=staff.id)
+db.add(venue)
+db.commit()
+
+def auth(user):
+    return {"Authorization": f"Bearer {user.generate_token()}"}
+
+# NDJSON streams should read on AsyncSessions, not the sync pool
+streamed = []
+def counting(factory):
+    def session():
+        streamed.append(factory)
+        return factory()
+    return session
+pagination.ASYNC_SESSIONS = {sync: counting(factory) for sync, factory in pagination.ASYNC_SESSIONS.items()}
+
+def ndjson(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+with TestClient(main.app) as client:
+    joined = client.post("/api/waitlist", json={"venue_id": venue.id}, headers=auth(customer))
+    again = client.post("/api/waitlist", json={"venue_id": venue.id}, headers=auth(customer))
+    approved = client.put(f"/api/waitlist/{joined.json()['id']}/approve", headers=auth(staff))
+    result = {
+        "routers": sorted({route.endpoint.__module__ for route in main.app.routes if route.path.startswith("/api/waitlist")}),
+        "join": joined.status_code,
+        "duplicate": again.status_code,
+        "approved": approved.json()["status"],
+        "staff_view": [row["username"] for row in client.get(f"/api/waitlist/venue/{venue.id}/staff", headers=auth(staff)).json()],
+        "count": client.get(f"/api/waitlist/venue/count/{venue.id}").json()["waiting_count"],
+        "my": [entry["status"] for entry in client.get("/api/waitlist/my", headers=auth(customer)).json()],
+        "venues": [v["name"] for v in client.get("/api/venue").json()],
+        "events_other_staff": client.get(f"/api/waitlist/venue/{venue.id}/events", headers=auth(other)).status_code,
+        "my_ndjson": [e["status"] for e in ndjson(client.get("/api/waitlist/my?format=ndjson", headers=auth(customer)))],
+        "venue_ndjson": [e["status"] for e in ndjson(client.get(f"/api/waitlist/venue/{venue.id}?format=ndjson", headers=auth(staff)))],
+        "notifications_ndjson": client.get("/api/notifications?format=ndjson", headers=auth(customer)).status_code,
+        "async_streams": len(streamed),
+    }
+print(json.dumps(result))
+"""
+
+
+def test_async_mode_serves_the_same_api(tmp_path):
+    database = tmp_path / "async.db"
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{database}",
+        "ASYNC_DATABASE_URL": f"sqlite+aiosqlite:///{database}",
+        "USE_ASYNC_DB": "true",
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT], cwd=REPO, env=env, capture_output=True, text=True, timeout=300
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+
+    outcome = json.loads(result.stdout.strip().splitlines()[-1])
+    assert outcome == {
+        "routers": ["controllers.waitlistEntry_async"],
+        "join": 200,
+        "duplicate": 400,
+        "approved": "waiting",
+        "staff_view": ["customer"],
+        "count": 1,
+        "my": ["waiting"],
+        "venues": ["Async Venue"],
+        "events_other_staff": 403,
+        "my_ndjson": ["waiting"],
+        "venue_ndjson": ["waiting"],
+        "notifications_ndjson": 200,
+        "async_streams": 3,
+    }
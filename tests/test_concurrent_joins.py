@@ -0,0 +1,46 @@
+# Concurrent joins against one venue's queue lock (services/queue_counts.py).
+# Every customer fires the join twice at the same moment; whatever the
+# interleaving, each must end up with exactly one live entry and the
+# positions must be exactly 1..N.
+
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from models.waitlistEntry import WaitlistEntryModel
+from models.venueQueueStats import VenueQueueStatsModel
+
+CUSTOMERS = 64
+# Two joins per customer, a whole number of barrier rounds
+WORKERS = 16
+
+
+def test_concurrent_joins_get_distinct_contiguous_positions(client, db, make_user, make_venue, auth):
+    staff = make_user("staff", role="staff")
+    venue = make_venue(staff)
+    headers = [auth(make_user(f"customer_{i}")) for i in range(CUSTOMERS)]
+
+    # Released together, so the joins really do collide on the lock
+    start = threading.Barrier(WORKERS)
+
+    def join(customer_headers):
+        try:
+            start.wait(timeout=5)
+        except threading.BrokenBarrierError:
+            pass
+        return client.post("/api/waitlist", json={"venue_id": venue.id}, headers=customer_headers).status_code
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        statuses = Counter(pool.map(join, headers + headers))
+
+    # The second join of each customer is refused, never failed
+    assert statuses == {200: CUSTOMERS, 400: CUSTOMERS}
+
+    rows = db.query(WaitlistEntryModel.user_id, WaitlistEntryModel.position).filter(
+        WaitlistEntryModel.venue_id == venue.id,
+        WaitlistEntryModel.status.in_(["pending", "waiting"])
+    ).all()
+    assert not [user_id for user_id, n in Counter(row.user_id for row in rows).items() if n > 1]
+    assert sorted(row.position for row in rows) == list(range(1, CUSTOMERS + 1))
+
+    stats = db.query(VenueQueueStatsModel).filter(VenueQueueStatsModel.venue_id == venue.id).one()
+    assert stats.pending_count == CUSTOMERS
@@ -0,0 +1,78 @@
+# generate_data.py builds everything, derived tables included, in the
+# database named by --db, whatever DATABASE_URL says, and leaves the id
+# sequences past every id it loaded.
+
+import os
+import subprocess
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from sqlalchemy import create_engine, func, inspect, select
+from generate_data import Loader
+from models.venue import VenueModel
+from models.venueServiceStats import VenueServiceStatsModel
+from models.waitlistEntry import WaitlistEntryModel
+from models.waitlistEntryArchive import WaitlistEntryArchiveModel
+
+REPO = Path(__file__).resolve().parent.parent
+
+
+def test_generate_data_writes_derived_tables_to_the_target_database(tmp_path):
+    target = tmp_path / "generated.db"
+    elsewhere = tmp_path / "elsewhere.db"
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{elsewhere}"}
+    result = subprocess.run(
+        [
+            sys.executable, "generate_data.py", "--db", f"sqlite:///{target}",
+            "--users", "60", "--venues", "6", "--entries", "600", "--chunk", "200",
+        ],
+        cwd=REPO, env=env, capture_output=True, text=True, timeout=300
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+
+    engine = create_engine(f"sqlite:///{target}")
+    with engine.connect() as conn:
+        venues = conn.execute(select(func.count()).select_from(VenueModel.__table__)).scalar()
+        live = conn.execute(select(func.count()).select_from(WaitlistEntryModel.__table__)).scalar()
+        learned = conn.execute(select(func.count()).select_from(VenueServiceStatsModel.__table__)).scalar()
+    engine.dispose()
+
+    assert venues == 6
+    assert live > 0
+    # The learned service times are persisted next to the history they came from
+    assert learned > 0
+
+    # Nothing touched the database DATABASE_URL points at
+    if elsewhere.exists():
+        assert not inspect(create_engine(f"sqlite:///{elsewhere}")).get_table_names()
+
+
+class RecordingEngine:
+    # Stands in for a PostgreSQL engine and keeps the SQL it is given
+
+    class dialect:
+        name = "postgresql"
+
+    def __init__(self):
+        self.statements = []
+
+    @contextmanager
+    def begin(self):
+        yield self
+
+    def execute(self, statement):
+        self.statements.append(str(statement))
+
+
+def test_entry_ids_continue_past_the_archive():
+    engine = RecordingEngine()
+    Loader(engine).reset_sequences(
+        [VenueModel.__table__, WaitlistEntryModel.__table__],
+        shared={WaitlistEntryModel.__table__: [WaitlistEntryArchiveModel.__table__]}
+    )
+
+    assert engine.statements == [
+        "SELECT setval(pg_get_serial_sequence('venues', 'id'), COALESCE(GREATEST((SELECT MAX(id) FROM venues)), 1))",
+        "SELECT setval(pg_get_serial_sequence('waitlist_entries', 'id'), COALESCE(GREATEST("
+        "(SELECT MAX(id) FROM waitlist_entries), (SELECT MAX(id) FROM waitlist_entries_archive)), 1))",
+    ]
@@ -0,0 +1,113 @@
+# The hot waitlist and notification queries must be answered from the indexes
+# in models/waitlistEntry.py and models/notification.py, never by scanning the
+# table. Each query is built the way its controller builds it and run through
+# EXPLAIN QUERY PLAN.
+
+from datetime import datetime
+import pytest
+from sqlalchemy import func, select
+from database import engine
+from models.notification import NotificationModel
+from models.waitlistEntry import WaitlistEntryModel
+from controllers.waitlistEntry import ACTIVE_STATUSES
+
+
+def query_plan(query) -> str:
+    statement = getattr(query, "statement", query)
+    sql = statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").all()
+    # (id, parent, notused, detail)
+    return "\n".join(row[3] for row in rows)
+
+
+HOT_QUERIES = {
+    # Venue queue views and renumbering
+    "venue_queue": (
+        lambda db: db.query(WaitlistEntryModel).filter(
+            WaitlistEntryModel.venue_id == 1,
+            WaitlistEntryModel.status == "waiting"
+        ).order_by(WaitlistEntryModel.position),
+        "ix_waitlist_entries_venue_status_position"
+    ),
+    # Position allocation; either venue index answers it
+    "next_position": (
+        lambda db: db.query(func.max(WaitlistEntryModel.position)).filter(
+            WaitlistEntryModel.venue_id == 1,
+            WaitlistEntryModel.status.in_(ACTIVE_STATUSES)
+        ),
+        "ix_waitlist_entries_"
+    ),
+    # Duplicate check in join_waitlist, the plain or the unique partial index
+    "duplicate_check": (
+        lambda db: db.query(WaitlistEntryModel).filter(
+            WaitlistEntryModel.user_id == 1,
+            WaitlistEntryModel.venue_id == 1,
+            WaitlistEntryModel.status.in_(ACTIVE_STATUSES)
+        ),
+        "_user_venue"
+    ),
+    "customer_history": (
+        lambda db: db.query(WaitlistEntryModel).filter(
+            WaitlistEntryModel.user_id == 1
+        ).order_by(WaitlistEntryModel.timestamp.desc(), WaitlistEntryModel.id.desc()),
+        "ix_waitlist_entries_user_timestamp"
+    ),
+    "notifications": (
+        lambda db: db.query(NotificationModel).filter(
+            NotificationModel.user_id == 1
+        ).order_by(NotificationModel.timestamp.desc(), NotificationModel.id.desc()),
+        "ix_notifications_user_timestamp"
+    ),
+    "unread_count": (
+        lambda db: select(func.count()).select_from(
+            select(NotificationModel.id).where(
+                NotificationModel.user_id == 1,
+                ~NotificationModel.read
+            ).limit(100).subquery()
+        ),
+        "ix_notifications_unread_user"
+    ),
+}
+
+
+@pytest.fixture
+def history(db, make_user, make_venue):
+    # Plans depend on table statistics: give the planner a few long histories,
+    # mostly finished entries and read notifications, as in production
+    owner = make_user("owner", role="staff")
+    venues = [make_venue(owner, name=f"Venue {i}") for i in range(5)]
+    customers = [make_user(f"customer_{i}") for i in range(20)]
+    now = datetime.utcnow()
+
+    db.add_all(
+        WaitlistEntryModel(
+            user_id=customer.id, venue_id=venue.id, position=i + 1, timestamp=now,
+            status="waiting" if i % 20 == 0 else "seated"
+        )
+        for customer in customers for venue in venues for i in range(10)
+    )
+    db.add_all(
+        NotificationModel(
+            user_id=customer.id, venue_id=venues[0].id, status="seated", timestamp=now, read=i % 20 != 0
+        )
+        for customer in customers for i in range(100)
+    )
+    db.commit()
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE")
+    # Pooled connections keep the statistics they read with the schema
+    engine.dispose()
+
+
+@pytest.mark.parametrize("name", HOT_QUERIES)
+def test_hot_query_uses_index(db, history, name):
+    build, index = HOT_QUERIES[name]
+    plan = query_plan(build(db))
+
+    assert index in plan, plan
+    assert "USING" in plan and "INDEX" in plan, plan
+    # A bare "SCAN <table>" is a full table scan; "SCAN ... USING INDEX" walks an index
+    for table in ("waitlist_entries", "notifications"):
+        assert f"SCAN {table}\n" not in plan + "\n", plan
+
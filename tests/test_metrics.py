@@ -0,0 +1,88 @@
+# Request metrics: histograms by route template, statements counted from the
+# engine's cursor events, the slow-request log and the registered sources.
+
+import logging
+import re
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from services.metrics import RequestMetrics, RequestStats, _request_stats, instrument_engine
+
+
+def test_requests_are_labelled_by_route_template(client, make_user, make_venue):
+    venue = make_venue(make_user("staff", role="staff"))
+    client.get(f"/api/venue/{venue.id}").raise_for_status()
+    assert client.get("/api/venue/999").status_code == 404
+
+    output = client.get("/metrics").text
+
+    template = 'method="GET",route="/api/venue/{venue_id}"'
+    assert re.search(r"queuemate_http_request_duration_seconds_count\{" + re.escape(template) + r"\} \d+", output)
+    assert f'queuemate_http_responses_total{{{template},status="404"}}' in output
+    # The raw paths never become label values
+    assert f'route="/api/venue/{venue.id}"' not in output
+    assert 'route="/api/venue/999"' not in output
+
+
+@pytest.fixture
+def instrumented():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    stats = RequestStats()
+    token = _request_stats.set(stats)
+    yield engine, stats
+    _request_stats.reset(token)
+    engine.dispose()
+
+
+def test_statements_are_counted_from_cursor_events(instrumented):
+    engine, stats = instrumented
+
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+        conn.execute(text("INSERT INTO t VALUES (1)"))
+        conn.execute(text("SELECT x FROM t")).all()
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT missing FROM t"))
+        # The failed statement left no start time behind
+        assert conn.info["query_start"] == []
+
+    assert stats.statements == 4
+    assert [statement for statement, _ in stats.sql][-1] == "SELECT missing FROM t"
+
+
+def test_slow_requests_are_logged_with_their_sql(caplog):
+    metrics = RequestMetrics(slow_ms=100, slow_queries=2)
+    quick, chatty = RequestStats(), RequestStats()
+    quick.record("SELECT 1", 0.001)
+    for i in range(3):
+        chatty.record(f"SELECT {i}", 0.001)
+
+    with caplog.at_level(logging.WARNING, logger="services.metrics"):
+        metrics.observe("GET", "/api/quick", 200, 0.01, quick)
+        metrics.observe("GET", "/api/slow", 200, 0.5, quick)
+        metrics.observe("GET", "/api/chatty", 200, 0.01, chatty)
+
+    assert [record.args[1] for record in caplog.records] == ["/api/slow", "/api/chatty"]
+    assert "SELECT 2" in caplog.records[1].getMessage()
+    assert metrics.slow_requests == 2
+
+
+def test_registered_sources_are_exported():
+    metrics = RequestMetrics(slow_ms=1000, slow_queries=50)
+    metrics.register_source("demo", lambda: {"hits": 3, "size": 2, "enabled": True, "name": "x"}, counters=("hits",))
+
+    output = metrics.render()
+
+    assert "# TYPE queuemate_demo_hits_total counter\nqueuemate_demo_hits_total 3" in output
+    assert "# TYPE queuemate_demo_size gauge\nqueuemate_demo_size 2" in output
+    assert "queuemate_demo_enabled" not in output
+    assert "queuemate_demo_name" not in output
+
+
+def test_the_app_exports_its_services(client):
+    output = client.get("/metrics").text
+
+    assert "queuemate_user_cache_hits_total" in output
+    assert "queuemate_notification_worker_enqueued_total" in output
+    assert "queuemate_login_admission_queue_depth" in output
@@ -0,0 +1,135 @@
+# Upgrading a database created before the versioned migrations existed, the
+# way `python migrate.py` does it: in a fresh interpreter that has imported
+# nothing but what migrate.py imports.
+
+import os
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+import pytest
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, MetaData, String, Table, create_engine, inspect
+from migrations import load_migrations
+from models.base import Base
+
+REPO = Path(__file__).resolve().parent.parent
+
+# The schema as seed.py created it before the first migration
+baseline = MetaData()
+
+Table(
+    "users", baseline,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("username", String, nullable=False, unique=True),
+    Column("email", String, nullable=False, unique=True),
+    Column("password_hash", String, nullable=True),
+    Column("role", String),
+)
+Table(
+    "venues", baseline,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String, nullable=False),
+    Column("location", String, nullable=False),
+    Column("max_capacity", Integer, nullable=False),
+    Column("avg_service_time", Integer, nullable=True),
+    Column("owner_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("image_url", String, nullable=True),
+)
+Table(
+    "waitlist_entries", baseline,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("venue_id", Integer, ForeignKey("venues.id"), nullable=False),
+    Column("status", String),
+    Column("position", Integer, nullable=False),
+    Column("estimated_wait_time", Integer, nullable=True),
+    Column("timestamp", DateTime),
+)
+Table(
+    "notifications", baseline,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("venue_id", Integer, ForeignKey("venues.id"), nullable=False),
+    Column("message", String, nullable=True),
+    Column("status", String, nullable=False),
+    Column("timestamp", DateTime),
+    Column("read", Boolean),
+)
+
+
+@pytest.fixture
+def baseline_db(tmp_path):
+    url = f"sqlite:///{tmp_path}/baseline.db"
+    engine = create_engine(url)
+    baseline.create_all(bind=engine)
+
+    now = datetime.utcnow()
+    tables = baseline.tables
+    with engine.begin() as conn:
+        conn.execute(tables["users"].insert(), [
+            {"id": 1, "username": "staff", "email": "staff@example.com", "role": "staff"},
+            {"id": 2, "username": "customer", "email": "customer@example.com", "role": "customer"},
+        ])
+        conn.execute(tables["venues"].insert(), [
+            {"id": 1, "name": "Venue", "location": "Manama", "max_capacity": 50, "owner_id": 1},
+        ])
+        conn.execute(tables["waitlist_entries"].insert(), [
+            {"user_id": 2, "venue_id": 1, "status": "waiting", "position": 1, "timestamp": now},
+            {"user_id": 2, "venue_id": 1, "status": "seated", "position": 1, "timestamp": now},
+        ])
+    yield engine, url
+    engine.dispose()
+
+
+def migrate(url: str) -> subprocess.CompletedProcess:
+    env = {**os.environ, "DATABASE_URL": url}
+    result = subprocess.run(
+        [sys.executable, "migrate.py"], cwd=REPO, env=env, capture_output=True, text=True, timeout=120
+    )
+    # migrate.py reports failures on stdout rather than exiting non-zero
+    assert "An error occurred" not in result.stdout, result.stdout
+    assert "Database is up to date" in result.stdout, result.stdout + result.stderr
+    return result
+
+
+def test_migrate_from_baseline(baseline_db):
+    engine, url = baseline_db
+    result = migrate(url)
+
+    revisions = [migration.revision for migration in load_migrations()]
+    for revision in revisions:
+        assert f"applied {revision}" in result.stdout
+
+    # The upgraded database has every table and index a fresh create_all builds
+    schema = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        assert schema.has_table(table.name), table.name
+        existing = {index["name"] for index in schema.get_indexes(table.name)}
+        assert {index.name for index in table.indexes} <= existing, table.name
+        columns = {column["name"] for column in schema.get_columns(table.name)}
+        assert set(table.columns.keys()) <= columns, table.name
+
+    # Running it again finds nothing to do
+    assert "applied" not in migrate(url).stdout
+
+
+def test_migrate_baseline_with_duplicate_live_entries(baseline_db):
+    # The unlocked join of the baseline could leave a customer twice in one
+    # queue; 0005 resolves that before its unique index, and the earlier
+    # migrations must not trip over the index first
+    engine, url = baseline_db
+    entries = baseline.tables["waitlist_entries"]
+    with engine.begin() as conn:
+        conn.execute(entries.insert(), [
+            {"user_id": 2, "venue_id": 1, "status": "pending", "position": 2, "timestamp": datetime.utcnow()},
+        ])
+
+    migrate(url)
+
+    with engine.connect() as conn:
+        statuses = conn.execute(
+            entries.select().with_only_columns(entries.c.status).where(entries.c.user_id == 2).order_by(entries.c.id)
+        ).scalars().all()
+    assert statuses == ["waiting", "seated", "cancelled"]
+    indexes = {index["name"] for index in inspect(engine).get_indexes("waitlist_entries")}
+    assert "uq_waitlist_entries_active_user_venue" in indexes
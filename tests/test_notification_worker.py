@@ -0,0 +1,79 @@
+# The batched notification writer (services/notification_worker.py) retries a
+# failed batch with backoff before giving up on it, and never makes a caller
+# wait on a full queue.
+
+import time
+import pytest
+from sqlalchemy.exc import OperationalError
+import services.notification_worker as notification_module
+from database import SessionLocal
+from models.notification import NotificationModel
+from services.notification_worker import NotificationWorker
+
+
+@pytest.fixture
+def flaky_database(monkeypatch):
+    # The first `failures` sessions fail on execute, like a database that is briefly unreachable
+    state = {"failures": 0, "attempts": 0}
+
+    def session_factory():
+        session = SessionLocal()
+        state["attempts"] += 1
+        if state["attempts"] <= state["failures"]:
+            def fail(*args, **kwargs):
+                raise OperationalError("INSERT", {}, Exception("connection refused"))
+            session.execute = fail
+        return session
+
+    monkeypatch.setattr(notification_module, "SessionLocal", session_factory)
+    return state
+
+
+def batch(user, venue, count: int = 3) -> dict:
+    return {
+        (user.id, i): {"user_id": user.id, "venue_id": venue.id, "status": "waiting", "message": f"#{i}", "read": False}
+        for i in range(count)
+    }
+
+
+def test_failed_batch_is_retried(db, make_user, make_venue, flaky_database, caplog):
+    user = make_user("customer")
+    venue = make_venue(make_user("owner", role="staff"))
+    flaky_database["failures"] = 2
+    worker = NotificationWorker(batch_size=10, flush_interval=0.01, max_queue=10, retries=3, retry_backoff=0.01)
+
+    worker._flush(batch(user, venue))
+
+    assert db.query(NotificationModel).count() == 3
+    stats = worker.stats()
+    assert (stats["written"], stats["retried"], stats["failed_batches"], stats["discarded"]) == (3, 2, 0, 0)
+    assert "Notification batch of 3 failed to write" in caplog.text
+
+
+def test_batch_is_discarded_once_retries_run_out(db, make_user, make_venue, flaky_database, caplog):
+    user = make_user("customer")
+    venue = make_venue(make_user("owner", role="staff"))
+    flaky_database["failures"] = 10
+    worker = NotificationWorker(batch_size=10, flush_interval=0.01, max_queue=10, retries=2, retry_backoff=0.01)
+
+    worker._flush(batch(user, venue))
+
+    assert db.query(NotificationModel).count() == 0
+    assert flaky_database["attempts"] == 3
+    stats = worker.stats()
+    assert (stats["written"], stats["retried"], stats["failed_batches"], stats["discarded"]) == (0, 2, 1, 3)
+    assert "Discarded a batch of 3 notifications after 3 attempts" in caplog.text
+
+
+def test_full_queue_drops_without_waiting():
+    worker = NotificationWorker(batch_size=10, flush_interval=0.01, max_queue=1)
+    # No writer thread, so the queue stays full
+    worker.start = lambda: None
+
+    started = time.monotonic()
+    for i in range(100):
+        worker.enqueue(1, 1, "waiting", f"#{i}")
+    assert time.monotonic() - started < 0.05
+
+    stats = worker.stats()
+    assert (stats["queue_depth"], stats["enqueued"], stats["dropped"]) == (1, 1, 99)
@@ -0,0 +1,67 @@
+# The unread badge count and bulk mark-as-read.
+
+import pytest
+from controllers.notifications import UNREAD_COUNT_CAP
+from models.notification import NotificationModel
+
+
+@pytest.fixture
+def notify(db, make_user, make_venue):
+    venue = make_venue(make_user("staff", role="staff"))
+
+    def notify(user, count: int, read: bool = False):
+        rows = [
+            NotificationModel(user_id=user.id, venue_id=venue.id, status="waiting", message=f"update {i}", read=read)
+            for i in range(count)
+        ]
+        db.add_all(rows)
+        db.commit()
+        return [row.id for row in rows]
+    return notify
+
+
+def unread(client, headers) -> dict:
+    return client.get("/api/notifications/unread-count", headers=headers).json()
+
+
+def test_unread_count_ignores_read_and_other_users(client, make_user, auth, notify):
+    customer = make_user("customer")
+    notify(customer, 3)
+    notify(customer, 5, read=True)
+    notify(make_user("other"), 4)
+
+    assert unread(client, auth(customer)) == {"unread": 3, "capped": False}
+
+
+def test_unread_count_stops_at_the_cap(client, make_user, auth, notify):
+    customer = make_user("customer")
+    notify(customer, UNREAD_COUNT_CAP + 5)
+
+    assert unread(client, auth(customer)) == {"unread": UNREAD_COUNT_CAP, "capped": True}
+
+
+def test_mark_read_by_ids_up_to_an_id_and_all(client, make_user, auth, notify):
+    customer = make_user("customer")
+    other = make_user("other")
+    ids = notify(customer, 6)
+    others = notify(other, 2)
+    headers = auth(customer)
+
+    # Another user's ids are not touched
+    marked = client.put("/api/notifications/read", json={"ids": [ids[0], others[0]]}, headers=headers).json()
+    assert marked == {"updated": 1}
+    assert client.put("/api/notifications/read", json={"up_to_id": ids[2]}, headers=headers).json() == {"updated": 2}
+    assert unread(client, headers)["unread"] == 3
+
+    assert client.put("/api/notifications/read", headers=headers).json() == {"updated": 3}
+    assert unread(client, headers)["unread"] == 0
+    assert unread(client, auth(other))["unread"] == 2
+
+
+def test_mark_read_takes_one_selector(client, make_user, auth, notify):
+    customer = make_user("customer")
+    ids = notify(customer, 2)
+
+    response = client.put("/api/notifications/read", json={"ids": ids, "up_to_id": ids[-1]}, headers=auth(customer))
+
+    assert response.status_code == 422
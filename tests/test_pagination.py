@@ -0,0 +1,88 @@
+# Keyset pages (cursor in X-Next-Cursor) and NDJSON streams on list endpoints.
+
+import json
+from datetime import datetime, timedelta
+import pytest
+from dependencies.pagination import NEXT_CURSOR_HEADER, encode_cursor
+from models.waitlistEntry import WaitlistEntryModel
+
+
+@pytest.fixture
+def history(db, make_user, make_venue):
+    customer = make_user("customer")
+    staff = make_user("staff", role="staff")
+    venue = make_venue(staff)
+    start = datetime(2024, 1, 1, 18, 0)
+    # Pairs share a timestamp, so the id has to break the tie
+    db.add_all([
+        WaitlistEntryModel(user_id=customer.id, venue_id=venue.id, status="seated", position=1, timestamp=start + timedelta(minutes=i // 2))
+        for i in range(7)
+    ])
+    db.commit()
+    return customer, staff, venue
+
+
+def walk(client, url, headers, limit):
+    ids, pages, params = [], 0, {"limit": limit}
+    while True:
+        response = client.get(url, params=params, headers=headers)
+        ids += [row["id"] for row in response.json()]
+        pages += 1
+        if NEXT_CURSOR_HEADER not in response.headers:
+            return ids, pages
+        params["cursor"] = response.headers[NEXT_CURSOR_HEADER]
+
+
+def test_pages_cover_every_row_once(client, db, auth, history):
+    customer, staff, venue = history
+    newest_first = [e.id for e in db.query(WaitlistEntryModel).order_by(WaitlistEntryModel.timestamp.desc(), WaitlistEntryModel.id.desc())]
+
+    assert walk(client, "/api/waitlist/my", auth(customer), limit=3) == (newest_first, 3)
+    # The staff history goes through the column-tuple fast path
+    assert walk(client, f"/api/waitlist/venue/{venue.id}", auth(staff), limit=2) == (sorted(newest_first), 4)
+
+
+def test_ndjson_streams_everything_after_the_cursor(client, auth, history):
+    customer, _, _ = history
+    first = client.get("/api/waitlist/my", params={"limit": 2}, headers=auth(customer))
+
+    stream = client.get(
+        "/api/waitlist/my", params={"format": "ndjson", "cursor": first.headers[NEXT_CURSOR_HEADER]}, headers=auth(customer)
+    )
+
+    assert stream.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in stream.text.splitlines()]
+    assert len(rows) == 5
+    assert not {row["id"] for row in rows} & {row["id"] for row in first.json()}
+
+
+def test_a_bad_cursor_is_rejected(client, auth, history):
+    customer, _, _ = history
+
+    response = client.get("/api/waitlist/my", params={"cursor": "not-a-cursor"}, headers=auth(customer))
+
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("cursor", [
+    "MQ==",  # 1, not a list
+    "bnVsbA==",  # null
+    encode_cursor(["2024-01-01T18:00:00"]),  # one value for two keys
+    encode_cursor(["2024-01-01T18:00:00", "seven"]),  # a string for the id
+    encode_cursor([7, 7]),  # a number for the timestamp
+    encode_cursor(["not a date", 7]),
+    "%%%",
+])
+def test_malformed_cursors_are_rejected(client, auth, history, cursor):
+    customer, _, _ = history
+
+    response = client.get("/api/waitlist/my", params={"cursor": cursor}, headers=auth(customer))
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_search_cursors_are_checked_too(client):
+    response = client.get("/api/venue/search", params={"q": "cafe", "cursor": encode_cursor(["first", 1])})
+
+    assert response.status_code == 400
@@ -0,0 +1,75 @@
+# Password hashing on the process pool, and the admission limits in front of
+# the auth routes.
+
+import asyncio
+import pytest
+from fastapi import HTTPException
+from controllers import users
+from models.user import UserModel
+from services import passwords
+from services.passwords import AdmissionLimit
+
+
+def test_register_and_login_hash_on_the_process_pool(client, db):
+    registered = client.post("/api/register", json={"username": "dana", "email": "dana@example.com", "password": "s3cret"})
+    assert registered.status_code == 200
+
+    # Hashed in a pool worker, stored as a bcrypt hash
+    stored = db.query(UserModel.password_hash).filter(UserModel.username == "dana").scalar()
+    assert stored.startswith("$2b$")
+    assert passwords._executor is not None
+
+    login = client.post("/api/login", json={"username": "dana", "password": "s3cret"})
+    assert login.status_code == 200
+    assert login.json()["token"]
+
+    wrong = client.post("/api/login", json={"username": "dana", "password": "guess"})
+    assert wrong.status_code == 400
+
+
+def test_a_full_admission_queue_sheds_with_retry_after():
+    limit = AdmissionLimit("test", concurrency=1, max_queue=1, retry_after=3)
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def hold():
+            async with limit.admit():
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        waiter = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        # One in flight, one queued: the third is turned away at once
+        assert limit.stats() == {"in_flight": 1, "queue_depth": 1, "admitted": 1, "rejected": 0}
+
+        with pytest.raises(HTTPException) as refused:
+            async with limit.admit():
+                pass
+
+        release.set()
+        await asyncio.gather(holder, waiter)
+        return refused.value
+
+    refused = asyncio.run(scenario())
+
+    assert refused.status_code == 503
+    assert refused.headers == {"Retry-After": "3"}
+    assert limit.stats() == {"in_flight": 0, "queue_depth": 0, "admitted": 2, "rejected": 1}
+
+
+@pytest.mark.parametrize("route, limit_name, body", [
+    ("/api/login", "login_admission", {"username": "dana", "password": "s3cret"}),
+    ("/api/register", "registration_admission", {"username": "erin", "email": "erin@example.com", "password": "s3cret"}),
+])
+def test_saturated_auth_routes_answer_503(client, monkeypatch, route, limit_name, body):
+    # Every slot taken and no room to queue
+    limit = AdmissionLimit(limit_name, concurrency=1, max_queue=0, retry_after=2)
+    asyncio.run(limit._semaphore.acquire())
+    monkeypatch.setattr(users, limit_name, limit)
+
+    response = client.post(route, json=body)
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "2"
+    assert limit.stats()["rejected"] == 1
@@ -0,0 +1,123 @@
+# The per-venue event stream: who may follow it, what each caller sees, and
+# the Postgres broker keeping the NOTIFY off the publishing thread.
+
+import asyncio
+import json
+import threading
+import time
+import pytest
+from controllers.waitlistEntry import queue_events_response
+from services.broker import Broker, PostgresNotifyBroker
+
+
+def test_stream_requires_a_token(client, make_user, make_venue):
+    venue = make_venue(make_user("staff", role="staff"))
+
+    assert client.get(f"/api/waitlist/venue/{venue.id}/events").status_code in (401, 403)
+
+
+def test_staff_only_follow_their_own_venues(client, make_user, make_venue, auth):
+    venue = make_venue(make_user("owner", role="staff"))
+    other_staff = make_user("other", role="staff")
+
+    response = client.get(f"/api/waitlist/venue/{venue.id}/events", headers=auth(other_staff))
+
+    assert response.status_code == 403
+    assert response.json()["detail"] == "You do not manage this venue"
+
+
+def test_customers_cannot_follow_a_missing_venue(client, make_user, auth):
+    response = client.get("/api/waitlist/venue/999/events", headers=auth(make_user("customer")))
+
+    assert response.status_code == 404
+
+
+def read_events(venue_id: int, user_id: int, full_view: bool, joins) -> list:
+    # Subscribes as the route would, runs the joins through the API and
+    # returns the events that reached this subscriber
+    async def listen():
+        stream = queue_events_response(venue_id, user_id, full_view).body_iterator
+        received = []
+        first = asyncio.ensure_future(stream.__anext__())
+        # Let the generator subscribe before anything is published
+        await asyncio.sleep(0.1)
+        for join in joins:
+            await asyncio.to_thread(join)
+        try:
+            received.append(await asyncio.wait_for(first, timeout=5))
+            while True:
+                received.append(await asyncio.wait_for(stream.__anext__(), timeout=0.5))
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            await stream.aclose()
+        return [json.loads(chunk.split("data: ", 1)[1]) for chunk in received if chunk.startswith("event:")]
+
+    return asyncio.run(listen())
+
+
+def test_customers_only_see_their_own_entries(client, make_user, make_venue, auth):
+    staff = make_user("staff", role="staff")
+    venue = make_venue(staff)
+    alice = make_user("alice")
+    bob = make_user("bob")
+
+    def join(customer):
+        return lambda: client.post("/api/waitlist", json={"venue_id": venue.id}, headers=auth(customer)).raise_for_status()
+
+    events = read_events(venue.id, alice.id, False, [join(bob), join(alice)])
+
+    assert [event["event"] for event in events] == ["joined"]
+    assert [entry["user_id"] for entry in events[0]["entries"]] == [alice.id]
+
+
+def test_staff_see_every_entry(client, make_user, make_venue, auth):
+    staff = make_user("staff", role="staff")
+    venue = make_venue(staff)
+    customers = [make_user(f"customer_{i}") for i in range(2)]
+
+    def join(customer):
+        return lambda: client.post("/api/waitlist", json={"venue_id": venue.id}, headers=auth(customer)).raise_for_status()
+
+    events = read_events(venue.id, staff.id, True, [join(customer) for customer in customers])
+
+    assert [entry["user_id"] for event in events for entry in event["entries"]] == [c.id for c in customers]
+
+
+def test_brokers_implement_the_whole_interface():
+    class Incomplete(Broker):
+        def publish(self, channel: str, message: dict):
+            pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+class SlowNotifyBroker(PostgresNotifyBroker):
+    # No Postgres here: the listener is skipped and each NOTIFY is a slow write
+
+    def __init__(self):
+        self.sent = []
+        super().__init__(uri="postgresql+psycopg2://queuemate:secret@db:5432/queuemate")
+
+    def _listen(self):
+        pass
+
+    def _notify(self, channel: str, message: dict):
+        time.sleep(0.05)
+        self.sent.append((channel, message["event"], threading.current_thread().name))
+
+
+def test_postgres_publish_does_not_wait_for_the_notify():
+    broker = SlowNotifyBroker()
+
+    started = time.monotonic()
+    for i in range(10):
+        broker.publish("venue_1", {"venue_id": 1, "event": f"event_{i}", "entries": []})
+    assert time.monotonic() - started < 0.05
+
+    broker.close()
+    # psycopg2 gets a plain libpq URI
+    assert broker._dsn == "postgresql://queuemate:secret@db:5432/queuemate"
+    assert [event for _, event, _ in broker.sent] == [f"event_{i}" for i in range(10)]
+    assert {thread for _, _, thread in broker.sent} == {"queue-broker-sender"}
@@ -0,0 +1,75 @@
+# recalc_queue_positions_and_eta renumbers the waiting queue with one UPDATE
+# and hands back only the entries that moved.
+
+from datetime import datetime
+import pytest
+from controllers.waitlistEntry import recalc_queue_positions_and_eta
+from models.waitlistEntry import WaitlistEntryModel
+from services.service_time import service_time_estimator
+
+
+@pytest.fixture(autouse=True)
+def configured_service_time(monkeypatch):
+    # ETAs from the venue's avg_service_time, not whatever earlier seats taught the estimator
+    monkeypatch.setattr(service_time_estimator, "estimate", lambda venue_id: None)
+
+
+def fill_queue(db, make_user, venue, size: int):
+    now = datetime.utcnow()
+    entries = [
+        WaitlistEntryModel(
+            user_id=make_user(f"customer_{i}").id, venue_id=venue.id, status="waiting", position=i,
+            estimated_wait_time=(i - 1) * 10, timestamp=now, approved_at=now, approved_position=i
+        )
+        for i in range(1, size + 1)
+    ]
+    db.add_all(entries)
+    db.commit()
+    return [entry.id for entry in entries]
+
+
+def waiting(db, venue):
+    db.expire_all()
+    return db.query(WaitlistEntryModel.id, WaitlistEntryModel.position, WaitlistEntryModel.estimated_wait_time).filter(
+        WaitlistEntryModel.venue_id == venue.id,
+        WaitlistEntryModel.status == "waiting"
+    ).order_by(WaitlistEntryModel.position).all()
+
+
+def test_only_entries_behind_the_gap_move(db, make_user, make_venue):
+    venue = make_venue(make_user("staff", role="staff"))
+    ids = fill_queue(db, make_user, venue, 6)
+
+    db.query(WaitlistEntryModel).filter(WaitlistEntryModel.id == ids[1]).update({"status": "seated"})
+    db.commit()
+
+    shifted = recalc_queue_positions_and_eta(db, venue.id, removed_position=2)
+
+    assert sorted(row.id for row in shifted) == ids[2:]
+    assert [(row.position, row.estimated_wait_time) for row in waiting(db, venue)] == [(p, (p - 1) * 10) for p in range(1, 6)]
+    # Already numbered: nothing to rewrite
+    assert recalc_queue_positions_and_eta(db, venue.id) == []
+
+
+def test_removing_the_last_entry_renumbers_nothing(db, make_user, make_venue):
+    venue = make_venue(make_user("staff", role="staff"))
+    ids = fill_queue(db, make_user, venue, 3)
+
+    db.query(WaitlistEntryModel).filter(WaitlistEntryModel.id == ids[-1]).update({"status": "cancelled"})
+    db.commit()
+
+    assert recalc_queue_positions_and_eta(db, venue.id, removed_position=3) == []
+    assert [row.position for row in waiting(db, venue)] == [1, 2]
+
+
+def test_seating_through_the_api_closes_the_gap(client, db, make_user, make_venue, auth):
+    staff = make_user("staff", role="staff")
+    venue = make_venue(staff)
+    ids = fill_queue(db, make_user, venue, 4)
+
+    seated = client.put(f"/api/waitlist/{ids[0]}/seated", params={"strict": True}, headers=auth(staff))
+
+    assert seated.json()["status"] == "seated"
+    assert [(row.id, row.position, row.estimated_wait_time) for row in waiting(db, venue)] == [
+        (ids[1], 1, 0), (ids[2], 2, 10), (ids[3], 3, 20)
+    ]
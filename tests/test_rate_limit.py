@@ -0,0 +1,55 @@
+# Token buckets and load shedding (services/rate_limit.py).
+
+from services.rate_limit import InMemoryBackend, Limit, load_shedder
+
+
+def test_bucket_refuses_past_its_burst_and_says_when_to_retry():
+    backend = InMemoryBackend(max_keys=10)
+    limit = Limit.parse("2/minute")
+
+    assert backend.take("ip:1", limit, now=0.0) == 0
+    assert backend.take("ip:1", limit, now=0.0) == 0
+    # One token every 30 s
+    assert backend.take("ip:1", limit, now=0.0) == 30
+    assert backend.take("ip:1", limit, now=30.0) == 0
+
+
+def test_least_recently_used_bucket_is_evicted_past_capacity():
+    backend = InMemoryBackend(max_keys=3)
+    limit = Limit.parse("5/minute")
+
+    for key in ("a", "b", "c"):
+        backend.take(key, limit, now=0.0)
+    # "a" is used again, so "b" is now the oldest
+    backend.take("a", limit, now=1.0)
+    backend.take("d", limit, now=2.0)
+
+    assert list(backend._buckets) == ["c", "a", "d"]
+    assert backend.stats() == {"keys": 3, "evicted": 1}
+
+
+def test_refilled_buckets_at_the_front_are_dropped():
+    backend = InMemoryBackend(max_keys=100)
+    limit = Limit.parse("1/second")
+
+    backend.take("old", limit, now=0.0)
+    backend.take("recent", limit, now=5.0)
+    # "old" has been full again since t=1; "recent" will be until t=6
+    backend.take("new", limit, now=5.5)
+
+    assert list(backend._buckets) == ["recent", "new"]
+    assert backend.stats()["evicted"] == 1
+
+
+def test_shed_responses_carry_cors_headers(client, monkeypatch):
+    # Saturated: as many requests in flight as the threshold allows
+    monkeypatch.setattr(load_shedder, "max_queue_depth", 1)
+    monkeypatch.setattr(load_shedder, "queue_depth", 1)
+
+    response = client.get("/api/venue", headers={"Origin": "http://127.0.0.1:5173"})
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert response.headers["access-control-allow-origin"] == "http://127.0.0.1:5173"
+    # Monitoring keeps working while the app sheds
+    assert client.get("/metrics").status_code == 200
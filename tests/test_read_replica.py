@@ -0,0 +1,68 @@
+# Routes that opt into get_read_db read from the replica; writes, and reads
+# that must see them, stay on the primary. The replica is a second SQLite
+# database holding different rows, so each response shows where it came from.
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+import database
+from migrations import run_migrations
+from models.base import Base
+from models.notification import NotificationModel
+from models.venue import VenueModel
+from models.venueQueueStats import VenueQueueStatsModel
+from models.waitlistEntry import WaitlistEntryModel
+
+
+@pytest.fixture
+def replica(monkeypatch, tmp_path):
+    replica_engine = create_engine(f"sqlite:///{tmp_path}/replica.db")
+    Base.metadata.create_all(bind=replica_engine)
+    run_migrations(replica_engine)
+
+    ReplicaSession = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+    monkeypatch.setattr(database, "ReadSessionLocal", ReplicaSession)
+    session = ReplicaSession()
+    yield session
+    session.close()
+    replica_engine.dispose()
+
+
+def test_reads_use_the_replica_and_writes_the_primary(client, db, replica, make_user, make_venue, auth):
+    staff = make_user("staff", role="staff")
+    customer = make_user("customer")
+    primary_venue = make_venue(staff, name="Primary Venue")
+
+    # Rows the replica has not caught up with, in place of the primary's
+    replica.add(VenueModel(id=primary_venue.id, name="Replica Venue", location="Manama", max_capacity=50, avg_service_time=10, owner_id=staff.id))
+    replica.add(VenueQueueStatsModel(venue_id=primary_venue.id, waiting_count=7, pending_count=0))
+    replica.add(WaitlistEntryModel(user_id=customer.id, venue_id=primary_venue.id, status="seated", position=1))
+    replica.add(NotificationModel(user_id=customer.id, venue_id=primary_venue.id, status="seated", message="replica"))
+    replica.commit()
+
+    assert client.get("/api/venue").json()[0]["name"] == "Replica Venue"
+    assert client.get(f"/api/venue/{primary_venue.id}").json()["name"] == "Replica Venue"
+    assert client.get(f"/api/waitlist/venue/count/{primary_venue.id}").json()["waiting_count"] == 7
+
+    history = client.get("/api/waitlist/my", headers=auth(customer)).json()
+    assert [entry["status"] for entry in history] == ["seated"]
+    notifications = client.get("/api/notifications", headers=auth(customer)).json()
+    assert [n["message"] for n in notifications] == ["replica"]
+
+    # The badge is read from the primary, which has no notifications
+    assert client.get("/api/notifications/unread-count", headers=auth(customer)).json()["unread"] == 0
+
+    # Writes land on the primary only
+    joined = client.post("/api/waitlist", json={"venue_id": primary_venue.id}, headers=auth(customer))
+    assert joined.status_code == 200
+    assert db.query(WaitlistEntryModel).filter(WaitlistEntryModel.status == "pending").count() == 1
+    assert replica.query(WaitlistEntryModel).filter(WaitlistEntryModel.status == "pending").count() == 0
+
+    # The staff's own venues come from the primary
+    mine = client.get("/api/venue/my", headers=auth(staff)).json()
+    assert [venue["name"] for venue in mine] == ["Primary Venue"]
+
+
+def test_without_a_replica_reads_share_the_primary():
+    # READ_DATABASE_URL is unset in the tests, so no second engine is built
+    assert database.read_engine is database.engine
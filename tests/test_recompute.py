@@ -0,0 +1,95 @@
+# The coalescing recompute scheduler: seats within one window share a single
+# renumbering per venue, and the queue still ends up numbered 1..N.
+
+import threading
+from datetime import datetime
+from models.waitlistEntry import WaitlistEntryModel
+from services.recompute import RecomputeScheduler, recompute_scheduler
+
+
+def recording_scheduler(window: float):
+    scheduler = RecomputeScheduler(window=window)
+    calls = []
+    done = threading.Event()
+
+    def handler(venue_id, removed_position):
+        calls.append((venue_id, removed_position))
+        done.set()
+
+    scheduler.handler = handler
+    return scheduler, calls, done
+
+
+def test_transitions_in_one_window_coalesce():
+    scheduler, calls, done = recording_scheduler(window=0.2)
+    scheduler.start()
+    try:
+        assert scheduler.defer(1, 5)
+        assert scheduler.defer(1, 3)
+        assert scheduler.defer(2, None)
+        assert scheduler.defer(2, 4)
+        assert done.wait(5)
+    finally:
+        scheduler.stop()
+
+    # From the earliest gap; a full renumbering wins
+    assert sorted(calls) == [(1, 3), (2, None)]
+    assert scheduler.stats()["coalesced"] == 2
+
+
+def test_strict_requests_and_a_stopped_scheduler_renumber_inline():
+    scheduler, calls, _ = recording_scheduler(window=0.2)
+    assert not scheduler.defer(1, 1)
+
+    scheduler.start()
+    try:
+        assert not scheduler.defer(1, 1, strict=True)
+    finally:
+        scheduler.stop()
+
+    assert calls == []
+    assert scheduler.stats()["inline"] == 2
+
+
+def test_stop_runs_what_is_pending():
+    scheduler, calls, _ = recording_scheduler(window=60)
+    scheduler.start()
+    scheduler.defer(7, 2)
+    scheduler.stop()
+
+    assert calls == [(7, 2)]
+
+
+def test_a_seat_rush_leaves_the_queue_gapless(client, db, monkeypatch, make_user, make_venue, auth):
+    staff = make_user("staff", role="staff")
+    venue = make_venue(staff)
+    now = datetime.utcnow()
+    entries = [
+        WaitlistEntryModel(
+            user_id=make_user(f"customer_{i}").id, venue_id=venue.id, status="waiting", position=i,
+            estimated_wait_time=(i - 1) * 10, timestamp=now, approved_at=now, approved_position=i
+        )
+        for i in range(1, 11)
+    ]
+    db.add_all(entries)
+    db.commit()
+
+    # Long enough that the whole rush lands in one window
+    monkeypatch.setattr(recompute_scheduler, "window", 1.0)
+    recompute_scheduler.start()
+    before = recompute_scheduler.stats()
+    try:
+        for entry in entries[:4]:
+            client.put(f"/api/waitlist/{entry.id}/seated", headers=auth(staff)).raise_for_status()
+    finally:
+        recompute_scheduler.stop()
+    after = recompute_scheduler.stats()
+
+    assert after["inline"] == before["inline"]
+    assert after["executed"] - before["executed"] == 1
+    db.expire_all()
+    positions = [p for p, in db.query(WaitlistEntryModel.position).filter(
+        WaitlistEntryModel.venue_id == venue.id,
+        WaitlistEntryModel.status == "waiting"
+    ).order_by(WaitlistEntryModel.position)]
+    assert positions == list(range(1, 7))
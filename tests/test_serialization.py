@@ -0,0 +1,34 @@
+# The column-tuple fast path must produce the same JSON as the response_model
+# path it replaces, with or without orjson.
+
+from datetime import datetime
+import pytest
+from fastapi.encoders import jsonable_encoder
+from dependencies import pagination
+from models.waitlistEntry import WaitlistEntryModel
+from serializers.waitListEntry import WaitlistEntryResponseSchema
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_fast_path_matches_the_schema(client, db, monkeypatch, make_user, make_venue, auth, use_orjson):
+    if use_orjson and pagination.orjson is None:
+        pytest.skip("orjson is not installed")
+    if not use_orjson:
+        monkeypatch.setattr(pagination, "orjson", None)
+
+    staff = make_user("staff", role="staff")
+    venue = make_venue(staff)
+    customer = make_user("customer")
+    db.add_all([
+        WaitlistEntryModel(user_id=customer.id, venue_id=venue.id, status="seated", position=1, estimated_wait_time=None, timestamp=datetime(2024, 1, 1, 18, 0)),
+        WaitlistEntryModel(user_id=customer.id, venue_id=venue.id, status="waiting", position=1, estimated_wait_time=15, timestamp=datetime(2024, 1, 1, 18, 30, 5, 123456)),
+    ])
+    db.commit()
+
+    fast = client.get(f"/api/waitlist/venue/{venue.id}", headers=auth(staff)).json()
+
+    expected = [
+        jsonable_encoder(WaitlistEntryResponseSchema.model_validate(entry, from_attributes=True))
+        for entry in db.query(WaitlistEntryModel).order_by(WaitlistEntryModel.id)
+    ]
+    assert fast == expected
@@ -0,0 +1,98 @@
+# The learned service time (services/service_time.py) persisted from several
+# workers at once: each persists increments, so no worker's samples are lost.
+
+from datetime import datetime, timedelta
+import pytest
+from models.venueServiceStats import VenueServiceStatsModel
+from models.waitlistEntry import WaitlistEntryModel
+from services.service_time import ServiceTimeEstimator
+
+
+def worker() -> ServiceTimeEstimator:
+    return ServiceTimeEstimator(half_life_hours=72, min_weight=1, persist_interval=60)
+
+
+def seat(estimator, venue_id: int, minutes_per_place: float, at: datetime, position: int = 2):
+    estimator.observe(venue_id, at - timedelta(minutes=minutes_per_place * position), at, position)
+
+
+@pytest.fixture
+def venue(make_user, make_venue):
+    return make_venue(make_user("owner", role="staff"))
+
+
+def test_persists_from_two_workers_are_merged(db, venue):
+    now = datetime.utcnow().replace(microsecond=0)
+    first, second = worker(), worker()
+    seat(first, venue.id, 10, now)
+    seat(second, venue.id, 20, now)
+    seat(second, venue.id, 20, now)
+
+    first.persist(db)
+    db.commit()
+    second.persist(db)
+    db.commit()
+
+    row = db.query(VenueServiceStatsModel).filter(VenueServiceStatsModel.venue_id == venue.id).one()
+    assert row.weight_total == pytest.approx(3.0)
+    assert row.weighted_sum == pytest.approx(50.0)
+
+    # The last writer now knows about the first worker's sample too
+    assert second.estimate(venue.id) == 17
+    # A worker starting up reads the merged state
+    fresh = worker()
+    fresh.load(db)
+    assert fresh.estimate(venue.id) == 17
+
+
+def test_increments_are_written_once(db, venue):
+    now = datetime.utcnow().replace(microsecond=0)
+    estimator = worker()
+    seat(estimator, venue.id, 10, now)
+    estimator.persist(db)
+    # Nothing new since the last persist
+    estimator.persist(db)
+    seat(estimator, venue.id, 10, now)
+    estimator.persist(db)
+
+    row = db.query(VenueServiceStatsModel).filter(VenueServiceStatsModel.venue_id == venue.id).one()
+    assert row.weight_total == pytest.approx(2.0)
+    assert estimator.stats()["persisted"] == 2
+
+
+def test_older_state_is_decayed_before_merging(db, venue):
+    now = datetime.utcnow().replace(microsecond=0)
+    first, second = worker(), worker()
+    seat(first, venue.id, 10, now - timedelta(hours=72))
+    seat(second, venue.id, 30, now)
+    first.persist(db)
+    second.persist(db)
+
+    row = db.query(VenueServiceStatsModel).filter(VenueServiceStatsModel.venue_id == venue.id).one()
+    # One half-life apart: the older sample counts half
+    assert row.weight_total == pytest.approx(1.5)
+    assert row.weighted_sum == pytest.approx(35.0)
+    assert row.updated_at == now
+
+
+def test_rebuild_from_history_replaces_the_stored_row(db, venue, make_user):
+    now = datetime.utcnow().replace(microsecond=0)
+    live = worker()
+    seat(live, venue.id, 10, now)
+    live.persist(db)
+
+    customer = make_user("customer")
+    db.add(WaitlistEntryModel(
+        user_id=customer.id, venue_id=venue.id, status="seated", position=1, timestamp=now,
+        approved_at=now - timedelta(minutes=40), approved_position=2, seated_at=now
+    ))
+    db.commit()
+
+    rebuilt = worker()
+    assert rebuilt.recompute_from_history(db) == 1
+    rebuilt.persist(db)
+
+    # The history is the whole truth; the live sample is not added on top
+    row = db.query(VenueServiceStatsModel).filter(VenueServiceStatsModel.venue_id == venue.id).one()
+    assert row.weight_total == pytest.approx(1.0, abs=0.01)
+    assert row.weighted_sum / row.weight_total == pytest.approx(20.0)
@@ -0,0 +1,88 @@
+# POST /waitlist/venue/{venue_id}/batch applies many staff transitions in one
+# transaction, reporting the actions it could not apply instead of failing.
+
+from collections import Counter
+from models.waitlistEntry import WaitlistEntryModel
+from services.metrics import request_metrics
+
+
+def join(client, venue, customers, auth):
+    return [
+        client.post("/api/waitlist", json={"venue_id": venue.id}, headers=auth(c)).json()["id"]
+        for c in customers
+    ]
+
+
+def test_batch_applies_what_it_can(client, db, make_user, make_venue, auth):
+    staff = make_user("staff", role="staff")
+    venue = make_venue(staff)
+    other_venue = make_venue(make_user("other", role="staff"), name="Other")
+    entries = join(client, venue, [make_user(f"customer_{i}") for i in range(4)], auth)
+    elsewhere = join(client, other_venue, [make_user("elsewhere")], auth)[0]
+
+    actions = [
+        {"entry_id": entries[0], "action": "approve"},
+        {"entry_id": entries[1], "action": "approve"},
+        {"entry_id": entries[2], "action": "approve"},
+        {"entry_id": entries[0], "action": "seat"},
+        {"entry_id": entries[3], "action": "reject"},
+        # Not waiting, another venue's entry, no such entry
+        {"entry_id": entries[3], "action": "seat"},
+        {"entry_id": elsewhere, "action": "approve"},
+        {"entry_id": 9999, "action": "approve"},
+    ]
+    response = client.post(
+        f"/api/waitlist/venue/{venue.id}/batch", params={"strict": True}, json={"actions": actions}, headers=auth(staff)
+    )
+
+    results = response.json()
+    assert [result["ok"] for result in results] == [True] * 5 + [False] * 3
+    assert results[5]["detail"] == "Only waiting users can be marked as seated"
+    assert results[6]["detail"] == results[7]["detail"] == "Waitlist entry not found"
+
+    db.expire_all()
+    rows = {e.id: e for e in db.query(WaitlistEntryModel).filter(WaitlistEntryModel.venue_id == venue.id)}
+    assert Counter(e.status for e in rows.values()) == {"waiting": 2, "seated": 1, "rejected": 1}
+    # The seated entry's place is taken by the queue behind it
+    assert [rows[entries[1]].position, rows[entries[2]].position] == [1, 2]
+    assert db.query(WaitlistEntryModel.status).filter(WaitlistEntryModel.id == elsewhere).scalar() == "pending"
+
+
+def test_batch_requires_the_venue_owner(client, make_user, make_venue, auth):
+    venue = make_venue(make_user("owner", role="staff"))
+    entries = join(client, venue, [make_user("customer")], auth)
+
+    response = client.post(
+        f"/api/waitlist/venue/{venue.id}/batch",
+        json={"actions": [{"entry_id": entries[0], "action": "approve"}]},
+        headers=auth(make_user("other", role="staff"))
+    )
+
+    assert response.status_code == 403
+
+
+def test_batch_statement_count_does_not_grow_with_its_size(client, db, monkeypatch, make_user, make_venue, auth):
+    counts = []
+    observe = request_metrics.observe
+
+    def record(method, route, status, seconds, stats):
+        if route == "/api/waitlist/venue/{venue_id}/batch":
+            counts.append(stats.statements)
+        observe(method, route, status, seconds, stats)
+
+    monkeypatch.setattr(request_metrics, "observe", record)
+    staff = make_user("staff", role="staff")
+    venue = make_venue(staff)
+    # Warm the user cache so every measured request authenticates the same way
+    client.get(f"/api/waitlist/venue/{venue.id}/staff", headers=auth(staff)).raise_for_status()
+
+    for size in (2, 20):
+        entries = join(client, venue, [make_user(f"customer_{size}_{i}") for i in range(size)], auth)
+        actions = [{"entry_id": e, "action": "approve"} for e in entries]
+        actions += [{"entry_id": e, "action": "seat"} for e in entries[:size // 2]]
+        client.post(
+            f"/api/waitlist/venue/{venue.id}/batch", params={"strict": True}, json={"actions": actions}, headers=auth(staff)
+        ).raise_for_status()
+
+    small, large = counts
+    assert small == large
@@ -0,0 +1,71 @@
+# The staff waitlist view loads in a fixed number of statements however long
+# the queue is: one joined query instead of a users lookup per entry.
+
+from datetime import datetime
+import pytest
+from models.waitlistEntry import WaitlistEntryModel
+from services.metrics import request_metrics
+
+STAFF_ROUTE = "/api/waitlist/venue/{venue_id}/staff"
+
+
+@pytest.fixture
+def statements(monkeypatch):
+    # Statements per request, as counted by the metrics middleware
+    counts = []
+    observe = request_metrics.observe
+
+    def record(method, route, status, seconds, stats):
+        if route == STAFF_ROUTE:
+            counts.append(stats.statements)
+        observe(method, route, status, seconds, stats)
+
+    monkeypatch.setattr(request_metrics, "observe", record)
+    return counts
+
+
+def fill_queue(db, make_user, venue, size: int, start: int = 0):
+    now = datetime.utcnow()
+    for i in range(start, start + size):
+        customer = make_user(f"customer_{i}")
+        db.add_all([
+            WaitlistEntryModel(user_id=customer.id, venue_id=venue.id, status="waiting", position=i + 1, timestamp=now),
+            WaitlistEntryModel(user_id=customer.id, venue_id=venue.id, status="seated", position=i + 1, timestamp=now),
+        ])
+    db.commit()
+
+
+@pytest.mark.parametrize("include_history", [False, True])
+def test_staff_view_statement_count_is_constant(client, db, make_user, make_venue, auth, statements, include_history):
+    staff = make_user("staff", role="staff")
+    venue = make_venue(staff)
+    url = f"/api/waitlist/venue/{venue.id}/staff"
+    params = {"include_history": include_history}
+
+    # Warm the user cache so every measured request authenticates the same way
+    client.get(url, params=params, headers=auth(staff)).raise_for_status()
+
+    fill_queue(db, make_user, venue, 3)
+    short = client.get(url, params=params, headers=auth(staff))
+    fill_queue(db, make_user, venue, 50, start=3)
+    long = client.get(url, params=params, headers=auth(staff))
+
+    assert len(short.json()) == (6 if include_history else 3)
+    assert len(long.json()) == (106 if include_history else 53)
+    assert all(row["username"].startswith("customer_") for row in long.json())
+
+    _, short_count, long_count = statements
+    assert short_count == long_count
+    # The ownership check and the joined query
+    assert long_count <= 2
+
+
+def test_staff_view_hides_history_by_default(client, db, make_user, make_venue, auth):
+    staff = make_user("staff", role="staff")
+    venue = make_venue(staff)
+    fill_queue(db, make_user, venue, 2)
+
+    rows = client.get(f"/api/waitlist/venue/{venue.id}/staff", headers=auth(staff)).json()
+
+    assert [row["status"] for row in rows] == ["waiting", "waiting"]
+    assert [row["position"] for row in rows] == [1, 2]
@@ -0,0 +1,49 @@
+# The authenticated-user cache behind get_current_user.
+
+import time
+from models.user import UserModel
+from services.user_cache import TTLCache, user_cache
+
+
+def test_entries_expire_and_the_least_recent_is_evicted(monkeypatch):
+    cache = TTLCache(maxsize=2, ttl=10)
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    # "b" was the least recently used
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+
+    now[0] += 11
+    assert cache.get("a") is None
+    assert cache.stats() == {"size": 1, "hits": 2, "misses": 2}
+
+
+def test_repeat_requests_are_served_from_the_cache(client, make_user, make_venue, auth):
+    customer = make_user("customer")
+    venue = make_venue(make_user("staff", role="staff"))
+    before = user_cache.stats()
+
+    for _ in range(3):
+        client.get("/api/waitlist/my", headers=auth(customer)).raise_for_status()
+    client.post("/api/waitlist", json={"venue_id": venue.id}, headers=auth(customer)).raise_for_status()
+
+    after = user_cache.stats()
+    assert after["misses"] - before["misses"] == 1
+    assert after["hits"] - before["hits"] == 3
+
+
+def test_role_changes_take_effect_immediately(client, db, make_user, make_venue, auth):
+    user = make_user("customer")
+    venue = make_venue(make_user("staff", role="staff"))
+    client.get("/api/waitlist/my", headers=auth(user)).raise_for_status()
+
+    db.query(UserModel).filter(UserModel.id == user.id).one().role = "staff"
+    db.commit()
+
+    joined = client.post("/api/waitlist", json={"venue_id": venue.id}, headers=auth(user))
+    assert joined.status_code == 403
@@ -0,0 +1,72 @@
+# The venue catalog cache behind GET /venue and GET /venue/{id}.
+
+import asyncio
+import threading
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from database import engine
+from services.venue_catalog import VenueCatalog
+
+
+def test_concurrent_async_refreshes_do_not_block_the_event_loop(make_user, make_venue):
+    # In async mode the catalog is read through run_sync, on the event loop
+    # thread, while its queries await on that same loop
+    owner = make_user("owner", role="staff")
+    for i in range(3):
+        make_venue(owner, name=f"Venue {i}")
+
+    catalog = VenueCatalog(check_interval=0)
+    async_engine = create_async_engine(engine.url.set(drivername="sqlite+aiosqlite"))
+
+    async def fetch():
+        async with AsyncSession(async_engine) as session:
+            return await session.run_sync(catalog.get)
+
+    async def requests():
+        try:
+            # A cold catalog, then a stale one every request wants to refresh
+            first = await asyncio.gather(*[fetch() for _ in range(20)])
+            second = await asyncio.gather(*[fetch() for _ in range(20)])
+            return first + second
+        finally:
+            await async_engine.dispose()
+
+    result = {}
+    # A deadlocked loop never returns, so it runs on a thread the test can give up on
+    loop_thread = threading.Thread(target=lambda: result.update(snapshots=asyncio.run(requests())), daemon=True)
+    loop_thread.start()
+    loop_thread.join(timeout=30)
+
+    assert not loop_thread.is_alive(), "concurrent catalog refreshes deadlocked the event loop"
+    assert all(len(snapshot.venues) == 3 for snapshot in result["snapshots"])
+    assert catalog.stats()["venues"] == 3
+
+
+def test_write_then_invalidate_is_seen_immediately(db, make_user, make_venue):
+    owner = make_user("owner", role="staff")
+    make_venue(owner, name="First")
+    catalog = VenueCatalog(check_interval=60)
+    assert [venue["name"] for venue in catalog.get(db).venues] == ["First"]
+
+    make_venue(owner, name="Second")
+    assert [venue["name"] for venue in catalog.get(db).venues] == ["First"]
+
+    catalog.invalidate()
+    assert [venue["name"] for venue in catalog.get(db).venues] == ["First", "Second"]
+
+
+def test_conditional_gets_revalidate_against_the_catalog_version(client, make_user, make_venue, auth):
+    owner = make_user("owner", role="staff")
+    venue = make_venue(owner, name="First")
+
+    listing = client.get("/api/venue")
+    detail = client.get(f"/api/venue/{venue.id}")
+    assert listing.headers["ETag"] != detail.headers["ETag"]
+
+    assert client.get("/api/venue", headers={"If-None-Match": listing.headers["ETag"]}).status_code == 304
+    assert client.get("/api/venue", headers={"If-Modified-Since": listing.headers["Last-Modified"]}).status_code == 304
+
+    # A write through the API moves the version on
+    client.post("/api/venue", json={"name": "Second", "location": "Manama", "max_capacity": 20}, headers=auth(owner)).raise_for_status()
+    changed = client.get("/api/venue", headers={"If-None-Match": listing.headers["ETag"]})
+    assert changed.status_code == 200
+    assert [row["name"] for row in changed.json()] == ["First", "Second"]
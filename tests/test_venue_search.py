@@ -0,0 +1,72 @@
+# GET /venue/search: word-prefix matching on name and location, ranked by
+# where the words hit, paged with keyset cursors. On SQLite it runs on the
+# in-memory index built from the venue catalog.
+
+import pytest
+from dependencies.pagination import NEXT_CURSOR_HEADER
+from models.venueQueueStats import VenueQueueStatsModel
+
+
+@pytest.fixture
+def venues(make_user, make_venue):
+    owner = make_user("owner", role="staff")
+    return {
+        name: make_venue(owner, name=name, location=location).id
+        for name, location in [
+            ("Cafe Aroma", "Manama"),
+            ("The Cafe", "Muharraq"),
+            ("Seef Grill", "Cafe Street, Manama"),
+            ("Burger Barn", "Riffa"),
+        ]
+    }
+
+
+def search(client, q: str, **params):
+    return client.get("/api/venue/search", params={"q": q, **params})
+
+
+def test_results_rank_by_where_the_words_match(client, venues):
+    names = [venue["name"] for venue in search(client, "caf").json()]
+
+    # Name starts with it, then name contains it, then only the location does
+    assert names == ["Cafe Aroma", "The Cafe", "Seef Grill"]
+
+
+def test_every_word_must_match_the_start_of_a_word(client, venues):
+    assert [venue["name"] for venue in search(client, "caf man").json()] == ["Cafe Aroma", "Seef Grill"]
+    assert search(client, "afe").json() == []
+
+
+def test_waiting_order_and_counts(client, db, venues):
+    db.add_all([
+        VenueQueueStatsModel(venue_id=venues["The Cafe"], waiting_count=5, pending_count=0),
+        VenueQueueStatsModel(venue_id=venues["Seef Grill"], waiting_count=2, pending_count=0),
+    ])
+    db.commit()
+
+    results = search(client, "cafe", order="waiting").json()
+
+    assert [(venue["name"], venue["waiting_count"]) for venue in results] == [
+        ("The Cafe", 5), ("Seef Grill", 2), ("Cafe Aroma", 0)
+    ]
+
+
+def test_pages_follow_the_cursor(client, venues):
+    first = search(client, "caf", limit=2)
+    second = search(client, "caf", limit=2, cursor=first.headers[NEXT_CURSOR_HEADER])
+
+    assert [venue["name"] for venue in first.json()] == ["Cafe Aroma", "The Cafe"]
+    assert [venue["name"] for venue in second.json()] == ["Seef Grill"]
+    assert NEXT_CURSOR_HEADER not in second.headers
+
+
+def test_new_venues_are_found_right_away(client, make_user, auth, venues):
+    assert search(client, "bistro").json() == []
+
+    staff = make_user("staff", role="staff")
+    created = client.post(
+        "/api/venue", json={"name": "Bistro Nine", "location": "Juffair", "max_capacity": 20}, headers=auth(staff)
+    )
+    created.raise_for_status()
+
+    assert [venue["name"] for venue in search(client, "bistro").json()] == ["Bistro Nine"]
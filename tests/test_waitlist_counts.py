@@ -0,0 +1,64 @@
+# /waitlist/venue/count/{venue_id} and /waitlist/counts read the counters in
+# venue_queue_stats, which every transition adjusts in its own transaction.
+
+from datetime import datetime
+from models.venueQueueStats import VenueQueueStatsModel
+from models.waitlistEntry import WaitlistEntryModel
+from services.queue_counts import count_queue
+
+
+def counters(db, venue_id: int) -> dict:
+    db.expire_all()
+    stats = db.query(VenueQueueStatsModel).filter(VenueQueueStatsModel.venue_id == venue_id).one()
+    return {"waiting_count": stats.waiting_count, "pending_count": stats.pending_count}
+
+
+def test_counters_follow_every_transition(client, db, make_user, make_venue, auth):
+    staff = make_user("staff", role="staff")
+    venue = make_venue(staff)
+    customers = [make_user(f"customer_{i}") for i in range(4)]
+
+    entries = [
+        client.post("/api/waitlist", json={"venue_id": venue.id}, headers=auth(c)).json()["id"]
+        for c in customers
+    ]
+    assert counters(db, venue.id) == {"waiting_count": 0, "pending_count": 4}
+
+    for entry_id in entries[:3]:
+        client.put(f"/api/waitlist/{entry_id}/approve", headers=auth(staff)).raise_for_status()
+    client.put(f"/api/waitlist/{entries[3]}/reject", headers=auth(staff)).raise_for_status()
+    client.put(f"/api/waitlist/{entries[0]}/seated", headers=auth(staff)).raise_for_status()
+    client.put(f"/api/waitlist/my/{entries[1]}/cancel", headers=auth(customers[1])).raise_for_status()
+
+    assert counters(db, venue.id) == {"waiting_count": 1, "pending_count": 0}
+    assert counters(db, venue.id) == count_queue(db, [venue.id])[venue.id]
+    assert client.get(f"/api/waitlist/venue/count/{venue.id}").json() == {"venue_id": venue.id, "waiting_count": 1}
+
+
+def test_venues_without_a_stats_row_are_counted(client, db, make_user, make_venue):
+    staff = make_user("staff", role="staff")
+    busy = make_venue(staff, name="Busy")
+    quiet = make_venue(staff, name="Quiet")
+    # Entries from before the counters existed: no stats row for either venue
+    db.add_all([
+        WaitlistEntryModel(user_id=make_user(f"customer_{i}").id, venue_id=busy.id, status="waiting", position=i + 1, timestamp=datetime.utcnow())
+        for i in range(2)
+    ])
+    db.commit()
+
+    counts = client.get("/api/waitlist/counts", params={"venue_ids": [busy.id, quiet.id]}).json()
+
+    assert counts == [{"venue_id": busy.id, "waiting_count": 2}, {"venue_id": quiet.id, "waiting_count": 0}]
+
+
+def test_a_missing_stats_row_is_rebuilt_on_the_next_transition(client, db, make_user, make_venue, auth):
+    staff = make_user("staff", role="staff")
+    venue = make_venue(staff)
+    customer = make_user("customer")
+    entry_id = client.post("/api/waitlist", json={"venue_id": venue.id}, headers=auth(customer)).json()["id"]
+
+    db.query(VenueQueueStatsModel).delete()
+    db.commit()
+    client.put(f"/api/waitlist/{entry_id}/approve", headers=auth(staff)).raise_for_status()
+
+    assert counters(db, venue.id) == {"waiting_count": 1, "pending_count": 0}